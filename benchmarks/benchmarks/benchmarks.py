@@ -29,3 +29,18 @@ def time_quantity_array_conversion():
 
 def time_quantity_ufunc_sin():
     np.sin(YTArray(np.arange(10000), "degree"))
+
+
+def time_quantity_array_multiply():
+    YTArray(np.arange(1000), "g/cm**3") * YTArray(np.arange(1000), "cm**3")
+
+
+def time_quantity_array_divide_power():
+    YTArray(np.arange(1000), "erg") / YTArray(np.arange(1000), "cm")**2
+
+
+def time_quantity_small_array_ops():
+    a = YTArray(np.arange(16), "km/s")
+    b = YTArray(np.arange(16), "s")
+    for i in range(100):
+        (a * b / a)**2
@@ -139,9 +139,17 @@ cython_extensions = [
     Extension("yt.utilities.lib.pixelization_routines",
               ["yt/utilities/lib/pixelization_routines.pyx",
                "yt/utilities/lib/pixelization_constants.c"],
-              include_dirs=["yt/utilities/lib/"],
+              include_dirs=["yt/utilities/lib/",
+                            "yt/geometry/"],
+              extra_compile_args=omp_args,
+              extra_link_args=omp_args,
               libraries=std_libs,
               depends=["yt/utilities/lib/pixelization_constants.h"]),
+    Extension("yt.utilities.lib.image_utilities",
+              ["yt/utilities/lib/image_utilities.pyx"],
+              extra_compile_args=omp_args,
+              extra_link_args=omp_args,
+              libraries=std_libs),
     Extension("yt.utilities.lib.primitives",
               ["yt/utilities/lib/primitives.pyx"],
               libraries=std_libs),
@@ -182,7 +190,7 @@ cython_extensions = [
 
 lib_exts = [
     "particle_mesh_operations", "depth_first_octree", "fortran_reader",
-    "interpolators", "misc_utilities", "basic_octree", "image_utilities",
+    "interpolators", "misc_utilities", "basic_octree",
     "points_in_volume", "quad_tree", "mesh_utilities",
     "amr_kdtools", "lenses", "distance_queue", "allocation_container"
 ]
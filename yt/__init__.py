@@ -119,7 +119,8 @@ import yt.visualization.volume_rendering.api as volume_rendering
 #    off_axis_projection
 
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
-    parallel_objects, enable_parallelism, communication_system
+    parallel_objects, enable_parallelism, communication_system, \
+    parallel_processes
 
 from yt.convenience import \
     load, simulation
@@ -0,0 +1,185 @@
+"""
+Reading the data of many halo spheres at once
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+from collections import defaultdict
+
+from yt.fields.derived_field import \
+    ValidateGridType, \
+    ValidateParameter, \
+    ValidateSpatial
+from yt.units.yt_array import \
+    uconcatenate
+
+def sphere_members(pos, dds, centers, radii, ds):
+    r"""
+    Find the points at *pos* selected by each of the spheres with *centers*
+    and *radii*, all in code units, in the same way a sphere data container
+    selects them.  If *dds* is given, the points are the centers of cells of
+    those widths, and a sphere also selects the cell its center lies in.
+
+    Returns a list of the index of each sphere that selects any of the
+    points and the indices of the points it selects.
+    """
+    DLE = ds.domain_left_edge.in_units("code_length").d
+    DRE = ds.domain_right_edge.in_units("code_length").d
+    DW = DRE - DLE
+    periodic = ds.periodicity
+    if pos.shape[0] == 0:
+        return []
+    pmin = pos.min(axis=0)
+    pmax = pos.max(axis=0)
+    if dds is not None:
+        pmin = pmin - 0.5 * dds.max(axis=0)
+        pmax = pmax + 0.5 * dds.max(axis=0)
+    members = []
+    for j, (center, radius) in enumerate(zip(centers, radii)):
+        check_box = (center - radius >= DLE) & (center + radius <= DRE)
+        # Spheres that wrap around the domain are always checked.
+        if check_box.all() and \
+           (np.any(center + radius < pmin) or np.any(center - radius > pmax)):
+            continue
+        selected = np.ones(pos.shape[0], dtype="bool")
+        dist2 = np.zeros(pos.shape[0], dtype="float64")
+        for i in range(3):
+            if check_box[i]:
+                selected &= (pos[:, i] >= center[i] - radius) & \
+                            (pos[:, i] <= center[i] + radius)
+            rel = pos[:, i] - center[i]
+            if periodic[i]:
+                rel[rel > DW[i] * 0.5] -= DW[i]
+                rel[rel < -DW[i] * 0.5] += DW[i]
+            dist2 += rel * rel
+        selected &= dist2 <= radius * radius
+        if dds is not None:
+            in_cell = np.all((pos - 0.5 * dds <= center) &
+                             (center <= pos + 0.5 * dds), axis=1)
+            selected |= in_cell
+        ind = np.where(selected)[0]
+        if ind.size > 0:
+            members.append((j, ind))
+    return members
+
+class HaloSphereBatch(object):
+    r"""
+    The spheres of a group of neighboring halos, whose field data is read in
+    a single pass over the chunks of their union, with every cell and
+    particle handed to each of the spheres selecting it.
+
+    Parameters
+    ----------
+    ds : Dataset
+        The dataset the spheres were made from.
+    halos : list of Halo objects
+        Halos whose ``data_object`` is a sphere.
+    """
+    def __init__(self, ds, halos):
+        self.ds = ds
+        self.halos = halos
+        self.spheres = [halo.data_object for halo in halos]
+        self.centers = np.array([sp.center.in_units("code_length").d
+                                 for sp in self.spheres])
+        self.radii = np.array([sp.radius.in_units("code_length").d
+                               for sp in self.spheres])
+        self._index = dict((id(halo), j) for j, halo in enumerate(halos))
+
+    def owns(self, halo):
+        """
+        Whether *halo* still has the sphere this batch was made with.
+        """
+        j = self._index.get(id(halo))
+        return j is not None and halo.data_object is self.spheres[j]
+
+    def _split_fields(self, fields):
+        # Fields that do not depend on field parameters are the same in every
+        # sphere, so they are read from the union; the rest are generated
+        # from them in each sphere.  Fields that need grids or ghost zones
+        # cannot be made from loose cells, so we give up on those.
+        sp = self.spheres[0]
+        fields = sp._determine_fields(fields)
+        to_read, to_generate = [], []
+        for field in sp._determine_fields(sp._identify_dependencies(fields)):
+            finfo = self.ds._get_field_info(*field)
+            if any(isinstance(v, (ValidateSpatial, ValidateGridType))
+                   for v in finfo.validators):
+                return None
+            fd = self.ds.field_dependencies.get(finfo.name)
+            if any(isinstance(v, ValidateParameter)
+                   for v in finfo.validators) or \
+               (fd is not None and len(fd.requested_parameters) > 0):
+                to_generate.append(field)
+            elif field not in to_read:
+                to_read.append(field)
+        return fields, to_read, to_generate
+
+    def _positions(self, chunk, ftype, particle):
+        if particle:
+            pos = np.column_stack([
+                chunk[ftype, "particle_position_%s" % ax].in_units(
+                    "code_length").d for ax in "xyz"])
+            return pos, None
+        pos = np.column_stack([chunk["index", ax].in_units("code_length").d
+                               for ax in "xyz"])
+        dds = np.column_stack([chunk["index", "d%s" % ax].in_units(
+            "code_length").d for ax in "xyz"])
+        return pos, dds
+
+    def get_field_data(self, fields):
+        r"""
+        Read *fields* for every halo in the batch.
+
+        Returns a list of dicts of the values of each field in the sphere of
+        each halo, or None if some field can only be made by each sphere on
+        its own.
+        """
+        split = self._split_fields(fields)
+        if split is None:
+            return None
+        fields, to_read, to_generate = split
+        groups = defaultdict(list)
+        for field in to_read:
+            finfo = self.ds._get_field_info(*field)
+            groups[field[0] if finfo.particle_type else None].append(field)
+        values = [defaultdict(list) for halo in self.halos]
+        units = {}
+        union = self.ds.union(self.spheres)
+        for chunk in union.chunks(to_read, "io"):
+            for ftype, gfields in groups.items():
+                pos, dds = self._positions(chunk, ftype, ftype is not None)
+                members = sphere_members(pos, dds, self.centers,
+                                         self.radii, self.ds)
+                for field in gfields:
+                    v = chunk[field]
+                    units[field] = v.units
+                    for j, ind in members:
+                        values[j][field].append(v[ind])
+        field_data = []
+        for j, sp in enumerate(self.spheres):
+            # A fresh sphere to generate the remaining fields in, so that
+            # nothing is left in the field data of the halo's own sphere.
+            tmp = self.ds.sphere(sp.center, sp.radius)
+            for key, value in sp.field_parameters.items():
+                tmp.set_field_parameter(key, value)
+            for field in to_read:
+                if len(values[j][field]) > 0:
+                    tmp.field_data[field] = uconcatenate(values[j][field])
+                else:
+                    tmp.field_data[field] = self.ds.arr(
+                        np.empty(0, dtype="float64"), units.get(field, ""))
+            if to_generate:
+                tmp._generate_fields(to_generate)
+            field_data.append(dict((f, tmp.field_data[f]) for f in fields))
+        return field_data
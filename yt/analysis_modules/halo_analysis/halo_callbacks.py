@@ -20,6 +20,8 @@ import os
 from yt.analysis_modules.cosmological_observation.light_ray.light_ray import \
     periodic_distance
 from yt.data_objects.profiles import \
+    ProfileChunkData, \
+    ProfileExtremaReader, \
     create_profile
 from yt.frontends.ytdata.utilities import \
     _hdf5_yt_array, \
@@ -38,19 +40,28 @@ from yt.utilities.parallel_tools.parallel_analysis_interface import \
 from yt.visualization.profile_plotter import \
     PhasePlot
 
+from .halo_batch import \
+    HaloSphereBatch
+
 callback_registry = OperatorRegistry()
     
-def add_callback(name, function):
-    callback_registry[name] =  HaloCallback(function)
+def add_callback(name, function, batch_function=None):
+    callback_registry[name] =  HaloCallback(function,
+                                            batch_function=batch_function)
 
 class HaloCallback(object):
     r"""
     A HaloCallback is a function that minimally takes in a Halo object 
     and performs some analysis on it.  This function may attach attributes 
     to the Halo object, write out data, etc, but does not return anything.
+
+    If given, *batch_function* does the same for a list of neighboring
+    halos at once, taking the same arguments.
     """
-    def __init__(self, function, args=None, kwargs=None):
+    def __init__(self, function, args=None, kwargs=None,
+                 batch_function=None):
         self.function = function
+        self.batch_function = batch_function
         self.args = args
         if self.args is None: self.args = []
         self.kwargs = kwargs
@@ -60,6 +71,14 @@ class HaloCallback(object):
         self.function(halo, *self.args, **self.kwargs)
         return True
 
+    def call_batch(self, halos):
+        if self.batch_function is None:
+            for halo in halos:
+                self(halo)
+        else:
+            self.batch_function(halos, *self.args, **self.kwargs)
+        return True
+
 def halo_sphere(halo, radius_field="virial_radius", factor=1.0, 
                 field_parameters=None):
     r"""
@@ -104,7 +123,23 @@ def halo_sphere(halo, radius_field="virial_radius", factor=1.0,
             sphere.set_field_parameter(field, value)
     halo.data_object = sphere
 
-add_callback("sphere", halo_sphere)
+def halo_sphere_batch(halos, radius_field="virial_radius", factor=1.0,
+                      field_parameters=None):
+    r"""
+    Create the spheres of a list of halos, as halo_sphere does, and group
+    them so that callbacks reading their data can read it all at once.
+    """
+
+    for halo in halos:
+        halo_sphere(halo, radius_field=radius_field, factor=factor,
+                    field_parameters=field_parameters)
+    halos = [halo for halo in halos if halo.data_object is not None]
+    if len(halos) == 0: return
+    batch = HaloSphereBatch(halos[0].halo_catalog.data_ds, halos)
+    for halo in halos:
+        halo.sphere_batch = batch
+
+add_callback("sphere", halo_sphere, halo_sphere_batch)
 
 def sphere_field_max_recenter(halo, field):
     r"""
@@ -229,7 +264,9 @@ def profile(halo, bin_fields, profile_fields, n_bins=32, extrema=None, logs=None
     my_profile = create_profile(halo.data_object, bin_fields, profile_fields, n_bins=n_bins,
                                 extrema=extrema, logs=logs, units=units, weight_field=weight_field,
                                 accumulation=accumulation, fractional=fractional)
-                  
+    _store_profile(halo, my_profile, bin_fields, storage)
+
+def _store_profile(halo, my_profile, bin_fields, storage):
     prof_store = dict([(field, my_profile[field]) \
                        for field in my_profile.field_data])
     prof_store[my_profile.x_field] = my_profile.x
@@ -257,7 +294,54 @@ def profile(halo, bin_fields, profile_fields, n_bins=32, extrema=None, logs=None
             setattr(halo, variance_storage, halo_variance_store)
         halo_variance_store.update(variance_store)
 
-add_callback("profile", profile)
+def profile_batch(halos, bin_fields, profile_fields, n_bins=32, extrema=None,
+                  logs=None, units=None, weight_field="cell_mass",
+                  accumulation=False, fractional=False, storage="profiles",
+                  output_dir="."):
+    r"""
+    Create profiles of a list of halos, as profile does.  The data of the
+    halos whose spheres were made together is read in a single pass and
+    then binned for each halo.
+    """
+
+    kwargs = dict(n_bins=n_bins, extrema=extrema, logs=logs, units=units,
+                  weight_field=weight_field, accumulation=accumulation,
+                  fractional=fractional)
+    bin_fields = ensure_list(bin_fields)
+    batches = []
+    for halo in halos:
+        batch = halo.sphere_batch
+        if batch is not None and batch.owns(halo) and batch not in batches:
+            batches.append(batch)
+    done = set()
+    for batch in batches:
+        my_halos = [halo for halo in halos if batch.owns(halo)]
+        sp = my_halos[0].data_object
+        my_bin_fields = sp._determine_fields(bin_fields)
+        fields = my_bin_fields + sp._determine_fields(
+            ensure_list(profile_fields))
+        if weight_field is not None:
+            fields += sp._determine_fields(weight_field)
+        field_data = batch.get_field_data(fields)
+        if field_data is None: continue
+        for halo in my_halos:
+            mylog.info("Calculating 1D profile for halo %d." %
+                       halo.quantities["particle_identifier"])
+            data = field_data[batch.halos.index(halo)]
+            reader = ProfileExtremaReader(halo.data_object, my_bin_fields,
+                                          fields, np.inf)
+            reader.process_chunk(0, ProfileChunkData(batch.ds, data))
+            my_profile = create_profile(halo.data_object, bin_fields,
+                                        profile_fields,
+                                        _extrema_reader=reader, **kwargs)
+            _store_profile(halo, my_profile, bin_fields, storage)
+            done.add(id(halo))
+    for halo in halos:
+        if id(halo) not in done:
+            profile(halo, bin_fields, profile_fields, storage=storage,
+                    output_dir=output_dir, **kwargs)
+
+add_callback("profile", profile, profile_batch)
 
 @parallel_root_only
 def save_profiles(halo, storage="profiles", filename=None,
@@ -21,6 +21,8 @@ from yt.frontends.ytdata.utilities import \
 from yt.funcs import \
     ensure_dir, \
     mylog
+from yt.utilities.lib.geometry_utils import \
+    get_morton_indices
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     ParallelAnalysisInterface, \
     parallel_blocking_call, \
@@ -299,7 +301,8 @@ class HaloCatalog(ParallelAnalysisInterface):
         halo_recipe = recipe_registry.find(recipe, *args, **kwargs)
         halo_recipe(self)
 
-    def create(self, save_halos=False, save_catalog=True, njobs=-1, dynamic=False):
+    def create(self, save_halos=False, save_catalog=True, njobs=-1, dynamic=False,
+               batch_size=None):
         r"""
         Create the halo catalog given the callbacks, quantities, and filters that
         have been provided.
@@ -326,15 +329,24 @@ class HaloCatalog(ParallelAnalysisInterface):
             If False, halo analysis is divided evenly between all available processors.
             If True, parallelism is performed via a task queue.
             Default: False
+        batch_size : int
+            If not None, halos are analyzed in groups of this many neighboring
+            halos, each action being performed on every halo of a group
+            before moving on to the next.  Callbacks that support it, such
+            as sphere and profile, then read the data of a whole group in a
+            single pass.
+            Default: None
 
         See Also
         --------
         load
 
         """
-        self._run(save_halos, save_catalog, njobs=njobs, dynamic=dynamic)
+        self._run(save_halos, save_catalog, njobs=njobs, dynamic=dynamic,
+                  batch_size=batch_size)
 
-    def load(self, save_halos=True, save_catalog=False, njobs=-1, dynamic=False):
+    def load(self, save_halos=True, save_catalog=False, njobs=-1, dynamic=False,
+             batch_size=None):
         r"""
         Load a previously created halo catalog.
 
@@ -361,16 +373,25 @@ class HaloCatalog(ParallelAnalysisInterface):
             If False, halo analysis is divided evenly between all available processors.
             If True, parallelism is performed via a task queue.
             Default: False
+        batch_size : int
+            If not None, halos are analyzed in groups of this many neighboring
+            halos, each action being performed on every halo of a group
+            before moving on to the next.  Callbacks that support it, such
+            as sphere and profile, then read the data of a whole group in a
+            single pass.
+            Default: None
 
         See Also
         --------
         create
 
         """
-        self._run(save_halos, save_catalog, njobs=njobs, dynamic=dynamic)
+        self._run(save_halos, save_catalog, njobs=njobs, dynamic=dynamic,
+                  batch_size=batch_size)
 
     @parallel_blocking_call
-    def _run(self, save_halos, save_catalog, njobs=-1, dynamic=False):
+    def _run(self, save_halos, save_catalog, njobs=-1, dynamic=False,
+             batch_size=None):
         r"""
         Run the requested halo analysis.
 
@@ -390,6 +411,13 @@ class HaloCatalog(ParallelAnalysisInterface):
             If False, halo analysis is divided evenly between all available processors.
             If True, parallelism is performed via a task queue.
             Default: False
+        batch_size : int
+            If not None, halos are analyzed in groups of this many neighboring
+            halos, each action being performed on every halo of a group
+            before moving on to the next.  Callbacks that support it, such
+            as sphere and profile, then read the data of a whole group in a
+            single pass.
+            Default: None
 
         See Also
         --------
@@ -419,40 +447,68 @@ class HaloCatalog(ParallelAnalysisInterface):
             self.add_default_quantities('all')
 
         my_index = np.argsort(self.data_source["all", "particle_identifier"])
-        for i in parallel_objects(my_index, njobs=njobs, dynamic=dynamic):
-            new_halo = Halo(self)
-            halo_filter = True
-            for action_type, action in self.actions:
-                if action_type == "callback":
-                    action(new_halo)
-                elif action_type == "filter":
-                    halo_filter = action(new_halo)
-                    if not halo_filter: break
-                elif action_type == "quantity":
-                    key, quantity = action
-                    if quantity in self.halos_ds.field_info:
-                        new_halo.quantities[key] = \
-                          self.data_source[quantity][int(i)]
-                    elif callable(quantity):
-                        new_halo.quantities[key] = quantity(new_halo)
-                else:
-                    raise RuntimeError(
-                        "Action must be a callback, filter, or quantity.")
-
-            if halo_filter:
-                for quantity in new_halo.quantities.values():
-                    quantity.convert_to_base()
-                self.catalog.append(new_halo.quantities)
-
-            if save_halos and halo_filter:
-                self.halo_list.append(new_halo)
-            else:
-                del new_halo
+        if batch_size is None:
+            for i in parallel_objects(my_index, njobs=njobs, dynamic=dynamic):
+                self._run_halos([i], save_halos, batched=False)
+        else:
+            batches = self._spatial_batches(my_index, batch_size)
+            for batch in parallel_objects(batches, njobs=njobs,
+                                          dynamic=dynamic):
+                self._run_halos(batch, save_halos, batched=True)
 
         self.catalog.sort(key=lambda a:a['particle_identifier'].to_ndarray())
         if save_catalog:
             self.save_catalog()
 
+    def _spatial_batches(self, my_index, batch_size):
+        # Halos are ordered along a Morton curve so that the halos of each
+        # batch are close together and share as much data as possible.
+        ds = self.data_source.ds
+        pos = np.column_stack([
+            self.data_source["all", "particle_position_%s" % ax].in_units(
+                "code_length").d for ax in "xyz"])
+        DLE = ds.domain_left_edge.in_units("code_length").d
+        DW = ds.domain_width.in_units("code_length").d
+        left_index = np.clip((pos - DLE) / DW * (1 << 20), 0, (1 << 20) - 1)
+        morton = get_morton_indices(left_index.astype("uint64"))
+        my_index = my_index[np.argsort(morton[my_index], kind="mergesort")]
+        return [my_index[i:i + batch_size]
+                for i in range(0, my_index.size, batch_size)]
+
+    def _run_halos(self, indices, save_halos, batched=False):
+        # Perform the actions on the halos at *indices*, one action at a time.
+        halos = [(Halo(self), i) for i in indices]
+        for action_type, action in self.actions:
+            if action_type == "callback":
+                if batched:
+                    action.call_batch([halo for halo, i in halos])
+                else:
+                    for halo, i in halos:
+                        action(halo)
+            elif action_type == "filter":
+                halos = [(halo, i) for halo, i in halos if action(halo)]
+            elif action_type == "quantity":
+                key, quantity = action
+                for halo, i in halos:
+                    if quantity in self.halos_ds.field_info:
+                        halo.quantities[key] = \
+                          self.data_source[quantity][int(i)]
+                    elif callable(quantity):
+                        halo.quantities[key] = quantity(halo)
+            else:
+                raise RuntimeError(
+                    "Action must be a callback, filter, or quantity.")
+            if len(halos) == 0: break
+
+        for halo, i in halos:
+            for quantity in halo.quantities.values():
+                quantity.convert_to_base()
+            self.catalog.append(halo.quantities)
+            # Let go of the data read for the whole batch.
+            halo.sphere_batch = None
+            if save_halos:
+                self.halo_list.append(halo)
+
     def save_catalog(self):
         "Write out hdf5 file with all halo quantities."
 
@@ -15,6 +15,7 @@ Halo object.
 
 class Halo(object):
     particles = None
+    sphere_batch = None
     def __init__(self, halo_catalog):
         self.halo_catalog = halo_catalog
         self.quantities = {}
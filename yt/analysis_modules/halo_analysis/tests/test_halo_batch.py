@@ -0,0 +1,110 @@
+import numpy as np
+import shutil
+import tempfile
+
+from yt.analysis_modules.halo_analysis.halo_batch import \
+    HaloSphereBatch
+from yt.analysis_modules.halo_analysis.halo_callbacks import \
+    profile, \
+    profile_batch
+from yt.analysis_modules.halo_analysis.halo_catalog import \
+    HaloCatalog
+from yt.analysis_modules.halo_analysis.halo_object import \
+    Halo
+from yt.frontends.stream.api import \
+    load_particles
+from yt.testing import \
+    assert_equal, \
+    assert_rel_equal, \
+    fake_amr_ds
+
+class FakeHaloCatalog(object):
+    output_dir = "."
+    def __init__(self, ds):
+        self.data_ds = ds
+
+_centers = [(0.1, 0.5, 0.5), (0.97, 0.02, 0.5), (0.5, 0.5, 0.5),
+            (0.55, 0.45, 0.5)]
+_radii = [0.1, 0.15, 0.05, 0.2]
+
+def _make_halos(ds):
+    hc = FakeHaloCatalog(ds)
+    halos = []
+    for i, (center, radius) in enumerate(zip(_centers, _radii)):
+        halo = Halo(hc)
+        halo.quantities["particle_identifier"] = i
+        halo.data_object = ds.sphere(center, radius)
+        halos.append(halo)
+    return halos
+
+def test_sphere_batch_field_data():
+    ds = fake_amr_ds(fields=["Density"])
+    halos = _make_halos(ds)
+    batch = HaloSphereBatch(ds, halos)
+    # radius depends on the center of each sphere, so it is generated
+    # separately for each of them
+    fields = [("stream", "Density"), ("index", "cell_volume"),
+              ("index", "radius")]
+    field_data = batch.get_field_data(fields)
+    for halo, data in zip(halos, field_data):
+        sp = ds.sphere(halo.data_object.center, halo.data_object.radius)
+        for field in fields:
+            assert_equal(np.sort(data[field]), np.sort(sp[field]))
+        assert_equal(len(halo.data_object.field_data), 0)
+
+def test_profile_batch():
+    ds = fake_amr_ds(fields=["Density"])
+    halos = _make_halos(ds)
+    batch = HaloSphereBatch(ds, halos)
+    for halo in halos:
+        halo.sphere_batch = batch
+    # The last halo has been recentered, so it is profiled on its own
+    halos[-1].data_object = ds.sphere(_centers[-1], _radii[-1])
+    profile_batch(halos, ["radius"], [("stream", "Density")],
+                  weight_field="cell_volume", accumulation=True)
+    expected = _make_halos(ds)
+    for halo, ehalo in zip(halos, expected):
+        profile(ehalo, ["radius"], [("stream", "Density")],
+                weight_field="cell_volume", accumulation=True)
+        used = ehalo.profiles["used"]
+        assert_equal(halo.profiles["used"], used)
+        for field in ehalo.profiles:
+            if field == "used": continue
+            assert_rel_equal(halo.profiles[field][used],
+                             ehalo.profiles[field][used], 12)
+
+def _halo_profiles(halos_ds, data_ds, output_dir, batch_size):
+    hc = HaloCatalog(halos_ds=halos_ds, data_ds=data_ds,
+                     output_dir=output_dir)
+    hc.add_callback("sphere")
+    hc.add_callback("profile", ["radius"], [("stream", "Density")],
+                    weight_field="cell_volume", accumulation=True)
+    hc.create(save_halos=True, save_catalog=False, batch_size=batch_size)
+    return dict((int(halo.quantities["particle_identifier"]), halo.profiles)
+                for halo in hc.halo_list)
+
+def test_batched_catalog():
+    ds = fake_amr_ds(fields=["Density"])
+    centers = np.array(_centers)
+    n = len(_radii)
+    data = {("halos", "particle_identifier"): np.arange(n, dtype="float64"),
+            ("halos", "particle_mass"): (np.ones(n), "g"),
+            ("halos", "virial_radius"): (np.array(_radii), "cm")}
+    for i, ax in enumerate("xyz"):
+        data["halos", "particle_position_%s" % ax] = (centers[:, i], "cm")
+    halos_ds = load_particles(data, bbox=np.array([[0.0, 1.0]] * 3))
+    tmpdir = tempfile.mkdtemp()
+    try:
+        expected = _halo_profiles(halos_ds, ds, tmpdir, None)
+        profiles = _halo_profiles(halos_ds, ds, tmpdir, 3)
+    finally:
+        shutil.rmtree(tmpdir)
+    assert_equal(sorted(profiles), list(range(n)))
+    assert_equal(sorted(expected), list(range(n)))
+    for i in range(n):
+        used = expected[i]["used"]
+        assert_equal(profiles[i]["used"], used)
+        for field in expected[i]:
+            if field == "used": continue
+            assert_rel_equal(profiles[i][field][used],
+                             expected[i][field][used], 12)
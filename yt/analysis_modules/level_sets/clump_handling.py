@@ -35,6 +35,7 @@ from .clump_info_items import \
 from .clump_validators import \
     clump_validator_registry
 from .contour_finder import \
+    JoinTree, \
     identify_contours
 
 def add_contour_field(ds, contour_key):
@@ -57,16 +58,25 @@ def add_contour_field(ds, contour_key):
 
 class Clump(TreeContainer):
     children = None
+    # The join tree of the base clump, the node of it this clump is the
+    # subtree of and the threshold it was found at, if it was found from it.
+    _join_tree = None
+    _tree_node = None
+    _tree_threshold = None
     def __init__(self, data, field, parent=None,
                  clump_info=None, validators=None,
                  base=None, contour_key=None,
-                 contour_id=None):
+                 contour_id=None, min_val=None, max_val=None):
         self.data = data
         self.field = field
         self.parent = parent
         self.quantities = data.quantities
-        self.min_val = self.data[field].min()
-        self.max_val = self.data[field].max()
+        if min_val is None:
+            min_val = self.data[field].min()
+        if max_val is None:
+            max_val = self.data[field].max()
+        self.min_val = min_val
+        self.max_val = max_val
         self.info = {}
 
         # is this the parent clump?
@@ -159,6 +169,10 @@ class Clump(TreeContainer):
             mylog.info("Wiping out existing children clumps: %d.",
                        len(self.children))
         self.children = []
+        if max_val is None and \
+          (self._join_tree is not None or self.base is self):
+            self._find_children_in_tree(min_val)
+            return
         if max_val is None: max_val = self.max_val
         nj, cids = identify_contours(self.data, self.field, min_val, max_val)
         # Here, cids is the set of slices and values, keyed by the
@@ -186,6 +200,39 @@ class Clump(TreeContainer):
                                        contour_key=contour_key,
                                        contour_id=cid))
 
+    def _find_children_in_tree(self, min_val):
+        # The join tree of the base clump already knows how every clump
+        # splits up, so nothing is read after it has been built.
+        if self._join_tree is None:
+            self._join_tree = JoinTree(self.data, self.field)
+        tree = self._join_tree
+        threshold = float(min_val)
+        if self._tree_threshold is not None:
+            threshold = max(threshold, self._tree_threshold)
+        nodes, cells, contour_ids, mins, maxs = \
+          tree.components(threshold, self._tree_node)
+        cids = tree.contour_slices(cells, contour_ids)
+        contour_key = uuid.uuid4().hex
+        base_object = getattr(self.data, 'base_object', self.data)
+        ds = base_object.ds
+        add_contour_field(ds, contour_key)
+        for i, node in enumerate(nodes):
+            cid = i + 1
+            new_clump = base_object.cut_region(
+                    ["obj['contours_%s'] == %s" % (contour_key, cid)],
+                    {('contour_slices_%s' % contour_key): cids})
+            child = Clump(new_clump, self.field, parent=self,
+                          validators=self.validators,
+                          base=self.base,
+                          contour_key=contour_key,
+                          contour_id=cid,
+                          min_val=ds.quan(mins[i], tree.units),
+                          max_val=ds.quan(maxs[i], tree.units))
+            child._join_tree = tree
+            child._tree_node = node
+            child._tree_threshold = threshold
+            self.children.append(child)
+
     def __iter__(self):
         yield self
         if self.children is None:
@@ -20,7 +20,8 @@ from collections import defaultdict
 from yt.funcs import mylog, get_pbar
 from yt.utilities.lib.contour_finding import \
     ContourTree, TileContourTree, link_node_contours, \
-    update_joins
+    update_joins, link_node_cells, build_join_tree, \
+    order_join_tree
 from yt.utilities.lib.partitioned_grid import \
     PartitionedGrid
 
@@ -78,3 +79,173 @@ def identify_contours(data_source, field, min_val, max_val,
     # checking if no cells match or doing an expensive operation checking for
     # the unique set of final join values.
     return final_joins.size, rv
+
+# Offsets to half of the 26 neighbors of a cell; the other half are found
+# from the other side.
+_neighbor_offsets = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                     for k in (-1, 0, 1) if (i, j, k) > (0, 0, 0)]
+
+def _tile_joins(ids):
+    # Pairs of neighboring cells within a tile, given the index of each cell
+    # or -1 for cells that are left out.
+    joins = []
+    for off in _neighbor_offsets:
+        s1 = tuple(slice(max(0, -o), n - max(0, o))
+                   for o, n in zip(off, ids.shape))
+        s2 = tuple(slice(max(0, o), n - max(0, -o))
+                   for o, n in zip(off, ids.shape))
+        a = ids[s1].ravel()
+        b = ids[s2].ravel()
+        ok = (a > -1) & (b > -1)
+        joins.append(np.column_stack([a[ok], b[ok]]))
+    return np.concatenate(joins)
+
+class JoinTree(object):
+    r"""
+    The join tree of a field over the cells of a data source: how the
+    connected regions above a threshold split apart as the threshold is
+    raised.  The cells are sorted and swept through once, from the highest
+    value to the lowest, so that the contours of any threshold within any
+    of those regions can then be found without reading the data again.
+
+    Cells are neighbors in the same way as for identify_contours.
+
+    Parameters
+    ----------
+    data_source : YTSelectionContainer3D
+        The cells to build the tree over.
+    field : tuple of strings
+        The field whose values are thresholded.
+    """
+    def __init__(self, data_source, field):
+        self.tiles = []
+        starts = []
+        values = []
+        valid = []
+        joins = []
+        contours = {}
+        node_ids = []
+        ncells = 0
+        self.units = None
+        DLE = data_source.ds.domain_left_edge
+        masks = dict((g.id, m) for g, m in data_source.blocks)
+        for (g, node, (sl, dims, gi)) in data_source.tiles.slice_traverse():
+            node.node_ind = len(node_ids)
+            nid = node.node_id
+            node_ids.append(nid)
+            vals = g[field][sl]
+            if self.units is None:
+                self.units = vals.units
+            vals = vals.d.astype("float64")
+            mask = masks[g.id][sl].astype("uint8")
+            ids = np.arange(ncells, ncells + vals.size,
+                            dtype="int64").reshape(vals.shape)
+            ids[(mask == 0) | np.isnan(vals)] = -1
+            joins.append(_tile_joins(ids))
+            LE = (DLE + g.dds * gi).in_units("code_length").ndarray_view()
+            RE = LE + (dims * g.dds).in_units("code_length").ndarray_view()
+            pg = PartitionedGrid(g.id, [ids.view("float64")], mask,
+                                 LE, RE, dims.astype("int64"))
+            contours[nid] = (g.Level, node.node_ind, pg, sl)
+            self.tiles.append((g.id, sl, vals.shape))
+            starts.append(ncells)
+            values.append(vals.ravel())
+            valid.append(ids[ids > -1])
+            ncells += vals.size
+        self.tile_starts = np.array(starts, dtype="int64")
+        if ncells == 0:
+            self.values = np.empty(0, dtype="float64")
+            valid = np.empty(0, dtype="int64")
+        else:
+            self.values = np.concatenate(values)
+            trunk = data_source.tiles.tree.trunk
+            joins.append(link_node_cells(
+                trunk, contours, np.array(node_ids, dtype="int64")))
+            valid = np.concatenate(valid)
+        joins = np.concatenate(joins) if joins else \
+            np.empty((0, 2), dtype="int64")
+        mylog.info("Building join tree of %s cells.", valid.size)
+        # Both directions of every pair, sorted by the first cell
+        a = np.concatenate([joins[:, 0], joins[:, 1]])
+        b = np.concatenate([joins[:, 1], joins[:, 0]])
+        neighbors = b[np.argsort(a, kind="mergesort")]
+        offsets = np.zeros(ncells + 1, dtype="int64")
+        np.cumsum(np.bincount(a, minlength=ncells), out=offsets[1:])
+        order = valid[np.argsort(-self.values[valid], kind="mergesort")]
+        self.cell_node, self.node_parent, self.node_value = \
+            build_join_tree(self.values, order, offsets, neighbors)
+        self._order_nodes(valid)
+
+    def _order_nodes(self, valid):
+        # Number the nodes so that every subtree is a contiguous range, and
+        # sort the cells in the same way.
+        pre, size = order_join_tree(self.node_parent)
+        self.node_pre = pre
+        self.node_end = pre + size
+        self.nodes_by_pre = np.empty_like(pre)
+        self.nodes_by_pre[pre] = np.arange(pre.size)
+        cell_pre = pre[self.cell_node[valid]]
+        ind = np.argsort(cell_pre, kind="mergesort")
+        self.cells_by_pre = valid[ind]
+        self.cell_pre = cell_pre[ind]
+
+    def components(self, threshold, node=None):
+        r"""
+        Find the contours of the cells with values of at least *threshold*,
+        among the cells of the subtree of *node*, or all of them if *node* is
+        None.
+
+        Returns the node of the tree each contour is the subtree of, the
+        indices of the cells above the threshold and the contour, numbered
+        from 1, each belongs to, and the smallest and largest value in each
+        contour.  Contours are numbered in the order they are first met when
+        traversing the data.
+        """
+        if node is None:
+            lo, hi = 0, self.node_parent.size
+        else:
+            lo, hi = self.node_pre[node], self.node_end[node]
+        nodes = self.nodes_by_pre[lo:hi]
+        parent = self.node_parent[nodes]
+        parent_value = np.where(parent > -1, self.node_value[parent], -np.inf)
+        alive = nodes[(self.node_value[nodes] >= threshold) &
+                      (parent_value < threshold)]
+        c0, c1 = np.searchsorted(self.cell_pre, [lo, hi])
+        cells = self.cells_by_pre[c0:c1]
+        keep = self.values[cells] >= threshold
+        cells = cells[keep]
+        ind = np.searchsorted(self.node_pre[alive], self.cell_pre[c0:c1][keep],
+                              side="right") - 1
+        first = np.empty(alive.size, dtype="int64")
+        first[:] = self.values.size
+        np.minimum.at(first, ind, cells)
+        rank = np.empty(alive.size, dtype="int64")
+        rank[np.argsort(first)] = np.arange(alive.size)
+        vals = self.values[cells]
+        mins = np.empty(alive.size, dtype="float64")
+        mins[:] = np.inf
+        maxs = np.empty(alive.size, dtype="float64")
+        maxs[:] = -np.inf
+        np.minimum.at(mins, rank[ind], vals)
+        np.maximum.at(maxs, rank[ind], vals)
+        return alive[np.argsort(first)], cells, rank[ind] + 1, mins, maxs
+
+    def contour_slices(self, cells, contour_ids):
+        r"""
+        Lay out the *contour_ids* of *cells* as identify_contours does: a
+        list of slices and arrays of contour ids, or -1, keyed by grid id.
+        """
+        tile = np.searchsorted(self.tile_starts, cells, side="right") - 1
+        order = np.argsort(tile, kind="mergesort")
+        tile = tile[order]
+        cells = cells[order]
+        contour_ids = contour_ids[order]
+        bounds = np.searchsorted(tile, np.unique(tile))
+        rv = defaultdict(list)
+        for i0, i1 in zip(bounds, list(bounds[1:]) + [tile.size]):
+            grid_id, sl, shape = self.tiles[tile[i0]]
+            ff = np.zeros(shape, dtype="int64") - 1
+            ff.flat[cells[i0:i1] - self.tile_starts[tile[i0]]] = \
+                contour_ids[i0:i1]
+            rv[grid_id].append((sl, ff))
+        return dict(rv)
@@ -81,6 +81,53 @@ def test_clump_finding():
     assert_equal(master_clump.children[1]["density"][0], ad["density"].max())
     assert_equal(master_clump.children[1]["particle_mass"].size, 0)
 
+def test_clump_join_tree():
+    n_c = 16
+    dims = (n_c, n_c, n_c)
+
+    density = np.ones(dims)
+    # one enhancement with two peaks in it, and one with a single peak
+    density[2:7, 2:7, 2:7] = 5.
+    density[3, 3, 3] = 50.
+    density[5, 5, 5] = 50.
+    density[9:13, 9:13, 9:13] = 5.
+    density[11, 11, 11] = 50.
+
+    # split into several grids, so that clumps cross grid boundaries
+    ds = load_uniform_grid({"density": density}, dims, nprocs=8)
+    ad = ds.all_data()
+    field = ("gas", "density")
+
+    master_clump = Clump(ad, field)
+    master_clump.add_validator("min_cells", 1)
+    find_clumps(master_clump, 0.5, 100., 2.)
+
+    assert_equal(len(master_clump.children), 2)
+    sizes = sorted(c["density"].size for c in master_clump.children)
+    assert_equal(sizes, [64, 125])
+    # the single peak never splits off from its enhancement
+    leaf_clumps = get_lowest_clumps(master_clump)
+    assert_equal(len(leaf_clumps), 3)
+    sizes = sorted(c["density"].size for c in leaf_clumps)
+    assert_equal(sizes, [1, 1, 64])
+
+    # the clumps found from the tree are those found by searching the
+    # data of each clump again
+    for min_val in [2., 10.]:
+        tree_clump = Clump(ad, field)
+        tree_clump.find_children(min_val)
+        data_clump = Clump(ad, field)
+        data_clump.find_children(min_val, ad[field].max())
+        assert_equal(len(tree_clump.children), len(data_clump.children))
+        c1 = sorted(tuple(np.sort(c["index", "morton_index"]))
+                    for c in tree_clump.children)
+        c2 = sorted(tuple(np.sort(c["index", "morton_index"]))
+                    for c in data_clump.children)
+        assert_equal(c1, c2)
+        for c in tree_clump.children:
+            assert_equal(c.min_val, c["density"].min())
+            assert_equal(c.max_val, c["density"].max())
+
 i30 = "IsolatedGalaxy/galaxy0030/galaxy0030"
 @requires_file(i30)
 def test_clump_tree_save():
@@ -42,6 +42,8 @@ ytcfg_defaults = dict(
     maximumstoreddatasets = '500',
     skip_dataset_cache = 'True',
     loadfieldplugins = 'True',
+    cache_field_dependencies = 'True',
+    field_dependency_cache_dir = '',
     pluginfilename = 'my_plugins.py',
     parallel_traceback = 'False',
     pasteboard_repo = '',
@@ -67,6 +69,24 @@ ytcfg_defaults = dict(
     thread_field_detection = 'False',
     ignore_invalid_unit_operation_errors = 'False',
     chunk_size = '1000',
+    io_prefetch_threads = '0',
+    io_prefetch_memory = '512',
+    ghost_zone_cache_size = '128',
+    brick_cache_size = '256',
+    grid_tree_selection = 'True',
+    profile_cache_memory = '1024',
+    projection_cache = 'False',
+    projection_cache_dir = '',
+    cache_particle_ids = 'True',
+    cache_particle_index = 'True',
+    particle_index_nprocs = '1',
+    particle_index_memory = '1024',
+    particle_index_spill_dir = '',
+    sph_kernel_pixelization = 'True',
+    ramses_use_mmap = 'False',
+    cache_enzo_hierarchy = 'True',
+    cache_ramses_offsets = 'True',
+    ramses_offset_nprocs = '1',
     xray_data_dir = '/does/not/exist',
     supp_data_dir = '/does/not/exist',
     default_colormap = 'arbre',
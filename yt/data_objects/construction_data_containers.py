@@ -15,6 +15,7 @@ Data containers that require processing before they can be utilized.
 #-----------------------------------------------------------------------------
 
 import numpy as np
+from collections import deque
 from functools import wraps
 import fileinput
 import io
@@ -23,6 +24,7 @@ from tempfile import NamedTemporaryFile, TemporaryFile
 import os
 import sys
 import zipfile
+from multiprocessing.pool import ThreadPool
 
 from yt.config import ytcfg
 from yt.data_objects.data_containers import \
@@ -31,10 +33,13 @@ from yt.data_objects.data_containers import \
     YTSelectionContainer3D
 from yt.data_objects.field_data import \
     YTFieldData
+from yt.data_objects.projection_store import \
+    ProjectionStore
 from yt.funcs import \
     ensure_list, \
     mylog, \
     get_memory_usage, \
+    get_num_threads, \
     iterable, \
     only_on_root
 from yt.utilities.exceptions import \
@@ -44,7 +49,8 @@ from yt.utilities.exceptions import \
 from yt.fields.field_exceptions import \
     NeedsGridType
 from yt.utilities.lib.quad_tree import \
-    QuadTree
+    QuadTree, \
+    merge_quadtrees
 from yt.utilities.lib.interpolators import \
     ghost_zone_interpolate
 from yt.utilities.lib.misc_utilities import \
@@ -64,6 +70,7 @@ from yt.fields.field_exceptions import \
 from yt.frontends.stream.api import load_uniform_grid
 from yt.units.yt_array import YTArray
 import yt.extern.six as six
+from yt.extern.six.moves import queue
 
 class YTStreamline(YTSelectionContainer1D):
     """
@@ -209,6 +216,10 @@ class YTQuadTreeProj(YTSelectionContainer2D):
     field_parameters : dict of items
         Values to be passed as field parameters that can be
         accessed by generated fields.
+    num_threads : int, optional
+        If greater than one, the chunks of the data source are added to this
+        many quadtrees by as many threads, and the trees are then merged.
+        If None, the ``numthreads`` configuration option is used.  Default: 1
 
     Examples
     --------
@@ -224,8 +235,12 @@ class YTQuadTreeProj(YTSelectionContainer2D):
     def __init__(self, field, axis, weight_field = None,
                  center = None, ds = None, data_source = None,
                  style = None, method = "integrate",
-                 field_parameters = None, max_level = None):
+                 field_parameters = None, max_level = None,
+                 num_threads = 1):
         YTSelectionContainer2D.__init__(self, axis, ds, field_parameters)
+        if num_threads is None:
+            num_threads = int(get_num_threads())
+        self.num_threads = max(num_threads, 1)
         # Style is deprecated, but if it is set, then it trumps method
         # keyword.  TODO: Remove this keyword and this check at some point in
         # the future.
@@ -326,22 +341,98 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         fields = self._determine_fields(ensure_list(fields))
         # We need a new tree for every single set of fields we add
         if len(fields) == 0: return
+        # Fields projected before are read back from the projection store,
+        # and new ones reuse the refinement of the stored tree.
+        store = ProjectionStore.for_dataset(self.ds)
+        refined = None
+        if store is not None:
+            refined, fields = store.restore(self, fields)
+            if len(fields) == 0: return
+        tree = self._start_projection(fields, refined)
+        with self.data_source._field_parameter_state(self.field_parameters):
+            chunks = parallel_objects(self.data_source.chunks(
+                                      [], "io", local_only = True))
+            if self.num_threads > 1:
+                self._project_chunks_threaded(chunks, fields, tree)
+            else:
+                for chunk in chunks:
+                    self._project_chunk(chunk, fields, tree)
+        self._finish_projection(fields, tree)
+        if store is not None:
+            store.save(self, fields)
+
+    def _start_projection(self, fields, refined=None):
+        # Set up the tree that the chunks of the data source are projected
+        # onto, one at a time, by _project_chunk.  If *refined* is given, the
+        # tree starts out with that refinement, as written by tobuffer.
         tree = self._get_tree(len(fields))
+        self._units_initialized = False
+        if refined is not None:
+            tree.frombuffer(refined,
+                            np.zeros((refined.size, len(fields)), "float64"),
+                            np.zeros(refined.size, "float64"), self.method)
         # This only needs to be done if we are in parallel; otherwise, we can
         # safely build the mesh as we go.
-        if communication_system.communicators[-1].size > 1:
+        elif communication_system.communicators[-1].size > 1:
             for chunk in self.data_source.chunks([], "io", local_only = False):
                 self._initialize_chunk(chunk, tree)
-        _units_initialized = False
-        with self.data_source._field_parameter_state(self.field_parameters):
-            for chunk in parallel_objects(self.data_source.chunks(
-                                          [], "io", local_only = True)):
+        return tree
+
+    def _project_chunk(self, chunk, fields, tree):
+        mylog.debug("Adding chunk (%s) to tree (%0.3e GB RAM)",
+                    chunk.ires.size, get_memory_usage()/1024.)
+        if self._units_initialized is False:
+            self._initialize_projected_units(fields, chunk)
+            self._units_initialized = True
+        self._handle_chunk(chunk, fields, tree)
+
+    def _project_chunks_threaded(self, chunks, fields, tree):
+        # The chunks are read here, one after another, and their values are
+        # added to num_threads trees by a pool of threads; adding to a tree
+        # releases the GIL.  The trees are then merged into tree pairwise,
+        # with the pairs of each round also merged at the same time.
+        nthreads = self.num_threads
+        free_trees = queue.Queue()
+        free_trees.put(tree)
+        for i in range(nthreads - 1):
+            free_trees.put(self._get_tree(len(fields)))
+        def add_to_tree(args):
+            t = free_trees.get()
+            try:
+                t.add_chunk_to_tree(*args)
+            finally:
+                free_trees.put(t)
+        merge_style = -1 if self.method == "mip" else 1
+        def merge(pair):
+            merge_quadtrees(pair[0], pair[1], merge_style)
+        pool = ThreadPool(nthreads)
+        pending = deque()
+        try:
+            for chunk in chunks:
                 mylog.debug("Adding chunk (%s) to tree (%0.3e GB RAM)",
                             chunk.ires.size, get_memory_usage()/1024.)
-                if _units_initialized is False:
+                if self._units_initialized is False:
                     self._initialize_projected_units(fields, chunk)
-                    _units_initialized = True
-                self._handle_chunk(chunk, fields, tree)
+                    self._units_initialized = True
+                args = self._get_chunk_values(chunk, fields)
+                # Don't read more than a couple of chunks per thread ahead
+                # of the trees.
+                while len(pending) >= 2 * nthreads:
+                    pending.popleft().get()
+                pending.append(pool.apply_async(add_to_tree, (args,)))
+            while pending:
+                pending.popleft().get()
+            trees = [free_trees.get() for i in range(nthreads)]
+            # tree goes first, so that everything ends up merged into it.
+            trees.sort(key = lambda t: t is not tree)
+            while len(trees) > 1:
+                pool.map(merge, list(zip(trees[::2], trees[1::2])))
+                trees = trees[::2]
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _finish_projection(self, fields, tree):
         # if there's less than nprocs chunks, units won't be initialized
         # on all processors, so sync with _projected_units on rank 0
         projected_units = self.comm.mpi_bcast(self._projected_units)
@@ -433,6 +524,11 @@ class YTQuadTreeProj(YTSelectionContainer2D):
                 self._projected_units[field] = field_unit
 
     def _handle_chunk(self, chunk, fields, tree):
+        tree.add_chunk_to_tree(*self._get_chunk_values(chunk, fields))
+
+    def _get_chunk_values(self, chunk, fields):
+        # The positions, levels, values and weights of the cells of a chunk,
+        # as they are added to a tree.
         if self.method == "mip" or self._sum_only:
             dl = self.ds.quan(1.0, "")
         else:
@@ -461,7 +557,7 @@ class YTQuadTreeProj(YTSelectionContainer2D):
         i1 = icoords[:,xax]
         i2 = icoords[:,yax]
         ilevel = chunk.ires * self.ds.ires_factor
-        tree.add_chunk_to_tree(i1, i2, ilevel, v, w)
+        return i1, i2, ilevel, v, w
 
     def to_pw(self, fields=None, center='c', width=None, origin='center-window'):
         r"""Create a :class:`~yt.visualization.plot_window.PWViewerMPL` from this
@@ -683,8 +779,81 @@ class YTCoveringGrid(YTSelectionContainer3D):
         for p in part:
             self[p] = self._data_source[p]
 
+    def _ghost_zone_key(self, field):
+        # Only the on-disk fields of a grid's ghost zones are cached, as
+        # nothing else goes into them.
+        if self._base_grid is None or field not in self.ds.field_list:
+            return None
+        return (self._base_grid.id, field, self._num_ghost_zones,
+                self.level, self._type_name)
+
+    def _cache_ghost_zones(self, fields):
+        cache = getattr(self.index, "ghost_zone_cache", None)
+        if cache is None: return
+        for field in fields:
+            key = self._ghost_zone_key(field)
+            if key is not None:
+                cache.set(key, self.field_data[field].d.copy())
+
+    def _fill_fields_fast(self, fields):
+        # Fill in what we can without a selection over the whole region:
+        # first from the cache of ghost zones, and then, if grids on our own
+        # level cover all of our cells, by copying straight out of them.
+        # Returns the fields that are left to fill.
+        cache = getattr(self.index, "ghost_zone_cache", None)
+        if cache is None or len(fields) == 0:
+            return fields
+        remaining = []
+        for field in fields:
+            key = self._ghost_zone_key(field)
+            arr = None if key is None else cache.get(key)
+            if arr is None:
+                remaining.append(field)
+            else:
+                fi = self.ds._get_field_info(*field)
+                self[field] = self.ds.arr(arr.copy(), fi.units)
+        fields = remaining
+        disk_fields = [f for f in fields if f in self.ds.field_list]
+        if len(disk_fields) == 0 or self.ds.dimensionality != 3:
+            return fields
+        if np.any(self.ActiveDimensions - 2*self._num_ghost_zones <= 1):
+            # Our cells are not those of self.level along flat axes.
+            return fields
+        start = self.global_startindex
+        end = start + self.ActiveDimensions
+        neighbors = self.index._same_level_neighbors(self.level, start, end)
+        if neighbors is None:
+            return fields
+        for field in disk_fields:
+            fi = self.ds._get_field_info(*field)
+            output = np.empty(self.ActiveDimensions, dtype="float64")
+            for grid, gstart, lo, hi in neighbors:
+                data = self._neighbor_data(cache, grid, field, fi.units)
+                output[tuple(slice(l, h) for l, h in
+                             zip(lo - start, hi - start))] = \
+                    data[tuple(slice(l, h) for l, h in
+                               zip(lo - gstart, hi - gstart))]
+            self[field] = self.ds.arr(output, fi.units)
+        self._cache_ghost_zones(disk_fields)
+        return [f for f in fields if f not in disk_fields]
+
+    def _neighbor_data(self, cache, grid, field, units):
+        # The data of a neighboring grid is kept in the cache rather than on
+        # the grid, so that it is bounded in size but read only once as we
+        # go from one grid to the next.
+        key = (grid.id, field)
+        data = cache.get(key)
+        if data is None:
+            loaded = field in grid.field_data
+            data = grid[field].in_units(units).d
+            if not loaded:
+                grid.field_data.pop(field)
+            cache.set(key, data)
+        return data
+
     def _fill_fields(self, fields):
         fields = [f for f in fields if f not in self.field_data]
+        fields = self._fill_fields_fast(fields)
         if len(fields) == 0: return
         output_fields = [np.zeros(self.ActiveDimensions, dtype="float64")
                          for field in fields]
@@ -704,6 +873,7 @@ class YTCoveringGrid(YTSelectionContainer3D):
         for name, v in zip(fields, output_fields):
             fi = self.ds._get_field_info(*name)
             self[name] = self.ds.arr(v, fi.units)
+        self._cache_ghost_zones(fields)
 
     def _generate_container_field(self, field):
         rv = self.ds.arr(np.ones(self.ActiveDimensions, dtype="float64"),
@@ -969,6 +1139,7 @@ class YTSmoothedCoveringGrid(YTCoveringGrid):
 
     def _fill_fields(self, fields):
         fields = [f for f in fields if f not in self.field_data]
+        fields = self._fill_fields_fast(fields)
         if len(fields) == 0: return
         ls = self._initialize_level_state(fields)
         min_level = self._compute_minimum_level()
@@ -1003,6 +1174,7 @@ class YTSmoothedCoveringGrid(YTCoveringGrid):
                 v = v[1:-1, 1:-1, 1:-1]
             fi = self.ds._get_field_info(*name)
             self[name] = self.ds.arr(v, fi.units)
+        self._cache_ghost_zones(fields)
 
     def _initialize_level_state(self, fields):
         ls = LevelState()
@@ -0,0 +1,155 @@
+"""
+Parsing of the conditionals used by cut regions.
+
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import ast
+import numbers
+import operator
+
+from yt.extern.six import string_types
+
+# Comparisons that can be checked against the extrema of a field, along with
+# the comparison they become when the operands are swapped.
+_comparisons = {
+    ast.Lt: (operator.lt, ast.Gt),
+    ast.LtE: (operator.le, ast.GtE),
+    ast.Gt: (operator.gt, ast.Lt),
+    ast.GtE: (operator.ge, ast.LtE),
+}
+
+# Conditionals are parsed once per session, however many cut regions use them.
+_parsed_conditionals = {}
+
+class CutCondition(object):
+    """
+    A single condition of a cut region, evaluated on a data object to give a
+    boolean mask.
+    """
+    def __init__(self, source):
+        self.source = source
+
+    def evaluate(self, obj, namespace):
+        raise NotImplementedError
+
+class CompiledCondition(CutCondition):
+    """
+    An arbitrary conditional, compiled once and evaluated with ``obj`` bound
+    to the data object.
+    """
+    def __init__(self, source, node=None):
+        super(CompiledCondition, self).__init__(source)
+        if node is None:
+            self.code = compile(source.strip(), "<cut_region>", "eval")
+        else:
+            expr = ast.fix_missing_locations(ast.Expression(body=node))
+            self.code = compile(expr, "<cut_region>", "eval")
+
+    def evaluate(self, obj, namespace):
+        return eval(self.code, namespace, {"obj": obj})
+
+class FieldThreshold(CutCondition):
+    """
+    A comparison of a single field against a number, such as
+    ``obj['temperature'] < 1e3``.  Whether any cell of an object can pass it
+    can be decided from the extrema of the field alone.
+    """
+    def __init__(self, source, field, op, value):
+        super(FieldThreshold, self).__init__(source)
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def evaluate(self, obj, namespace):
+        return self.op(obj[self.field], self.value)
+
+    def may_pass(self, fmin, fmax):
+        """
+        Return whether any value between *fmin* and *fmax* satisfies the
+        threshold.
+        """
+        if self.op in (operator.lt, operator.le):
+            return self.op(fmin, self.value)
+        return self.op(fmax, self.value)
+
+def _field_name(node):
+    # obj['density'] or obj['gas', 'density']
+    if not isinstance(node, ast.Subscript):
+        return None
+    if not isinstance(node.value, ast.Name) or node.value.id != "obj":
+        return None
+    key = node.slice
+    if type(key).__name__ == "Index":
+        # Python < 3.9 wraps subscripts in an Index node
+        key = key.value
+    try:
+        field = ast.literal_eval(key)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(field, string_types):
+        return field
+    if isinstance(field, tuple) and len(field) == 2 and \
+       all(isinstance(f, string_types) for f in field):
+        return field
+    return None
+
+def _number(node):
+    try:
+        value = ast.literal_eval(node)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return None
+    return value
+
+def _threshold(source, node):
+    if not isinstance(node, ast.Compare) or len(node.ops) != 1:
+        return None
+    op = type(node.ops[0])
+    if op not in _comparisons:
+        return None
+    left, right = node.left, node.comparators[0]
+    field, value = _field_name(left), _number(right)
+    if field is None or value is None:
+        # Try it the other way around, as in 1e3 > obj['temperature']
+        field, value = _field_name(right), _number(left)
+        if field is None or value is None:
+            return None
+        op = _comparisons[op][1]
+    return FieldThreshold(source, field, _comparisons[op][0], value)
+
+def _split_and(node):
+    # (a) & (b) & (c) is split into its terms, which are ANDed together.
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+        return _split_and(node.left) + _split_and(node.right)
+    return [node]
+
+def parse_conditional(source):
+    """
+    Parse a cut region conditional into a list of CutConditions, all of
+    which must hold for a cell to be selected.
+    """
+    if source in _parsed_conditionals:
+        return _parsed_conditionals[source]
+    tree = ast.parse(source.strip(), mode="eval")
+    terms = _split_and(tree.body)
+    if len(terms) == 1:
+        conditions = [_threshold(source, terms[0]) or
+                      CompiledCondition(source)]
+    else:
+        conditions = [_threshold(source, term) or
+                      CompiledCondition(source, term)
+                      for term in terms]
+    _parsed_conditionals[source] = conditions
+    return conditions
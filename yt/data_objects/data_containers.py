@@ -1201,6 +1201,25 @@ class YTSelectionContainer(YTDataContainer, ParallelAnalysisInterface):
             self.field_parameters.update(data_source.field_parameters)
         self.quantities = DerivedQuantityCollection(self)
 
+    def batch(self):
+        """
+        Return a QueryBatch, to which derived quantities, profiles and
+        projections of this data container can be added and then computed
+        together in a single pass over its chunks.
+
+        Examples
+        --------
+
+        >>> ds = load("DD0046/DD0046")
+        >>> ad = ds.all_data()
+        >>> with ad.batch() as batch:
+        ...     ex = batch.quantities.extrema(("gas", "density"))
+        ...     mass = batch.quantities.total_mass()
+        >>> print (ex.value, mass.value)
+        """
+        from .query_batch import QueryBatch
+        return QueryBatch(self)
+
     @property
     def selector(self):
         if self._selector is not None: return self._selector
@@ -46,9 +46,21 @@ class RegisteredDerivedQuantity(type):
         if name != "DerivedQuantity":
             derived_quantity_registry[name] = cls
 
+class DeferredQuantityCall(Exception):
+    """
+    Raised by a derived quantity being planned for a query batch, once it
+    has recorded the arguments it processes its chunks with.
+    """
+    pass
+
 @add_metaclass(RegisteredDerivedQuantity)
 class DerivedQuantity(ParallelAnalysisInterface):
     num_vals = -1
+    # Used by QueryBatch: while planning, the arguments process_chunk will be
+    # called with are recorded in _batch_calls; afterwards, the per-chunk
+    # results gathered by the batch are taken from _batch_storage.
+    _batch_calls = None
+    _batch_storage = None
 
     def __init__(self, data_source):
         self.data_source = data_source
@@ -61,10 +73,16 @@ class DerivedQuantity(ParallelAnalysisInterface):
         # create the index if it doesn't exist yet
         self.data_source.ds.index
         self.count_values(*args, **kwargs)
-        chunks = self.data_source.chunks([], chunking_style="io")
-        storage = {}
-        for sto, ds in parallel_objects(chunks, -1, storage = storage):
-            sto.result = self.process_chunk(ds, *args, **kwargs)
+        if self._batch_calls is not None:
+            self._batch_calls.append((args, kwargs))
+            raise DeferredQuantityCall
+        if self._batch_storage:
+            storage = self._batch_storage.pop(0)
+        else:
+            chunks = self.data_source.chunks([], chunking_style="io")
+            storage = {}
+            for sto, ds in parallel_objects(chunks, -1, storage = storage):
+                sto.result = self.process_chunk(ds, *args, **kwargs)
         # Now storage will have everything, and will be done via pickling, so
         # the units will be preserved.  (Credit to Nathan for this
         # idea/implementation.)
@@ -202,14 +220,16 @@ class TotalMass(TotalQuantity):
     def __call__(self):
         self.data_source.ds.index
         fi = self.data_source.ds.field_info
-        if ("gas", "cell_mass") in fi:
-            gas = super(TotalMass, self).__call__([('gas', 'cell_mass')])
-        else:
-            gas = self.data_source.ds.arr([0], 'g')
-        if ("all", "particle_mass") in fi:
-            part = super(TotalMass, self).__call__([('all', 'particle_mass')])
-        else:
-            part = self.data_source.ds.arr([0], 'g')
+        fields = [f for f in [("gas", "cell_mass"), ("all", "particle_mass")]
+                  if f in fi]
+        # Both masses are summed in the same pass over the data.
+        masses = {}
+        if len(fields) > 0:
+            rv = super(TotalMass, self).__call__(fields)
+            masses = dict(zip(fields, ensure_list(rv)))
+        gas = masses.get(("gas", "cell_mass"), self.data_source.ds.arr([0], 'g'))
+        part = masses.get(("all", "particle_mass"),
+                          self.data_source.ds.arr([0], 'g'))
         return self.data_source.ds.arr([gas, part])
 
 class CenterOfMass(DerivedQuantity):
@@ -263,7 +263,7 @@ class AMRGridPatch(YTSelectionContainer):
             level = self.index.max_level + 1
         kwargs = {'dims': self.ActiveDimensions + 2*n_zones,
                   'num_ghost_zones':n_zones,
-                  'use_pbar':False, 'fields':fields}
+                  'use_pbar':False}
         # This should update the arguments to set the field parameters to be
         # those of this grid.
         field_parameters = {}
@@ -277,7 +277,10 @@ class AMRGridPatch(YTSelectionContainer):
             cube = self.ds.covering_grid(level, new_left_edge,
                 field_parameters = field_parameters,
                 **kwargs)
+        # The fields are only read once we know which grid this is, so that
+        # they can come from the index's cache of ghost zones.
         cube._base_grid = self
+        cube.get_data(fields)
         return cube
 
     def get_vertex_centered_data(self, fields, smoothed=True, no_ghost=False):
@@ -388,16 +391,35 @@ class AMRGridPatch(YTSelectionContainer):
         mask = self._get_selector_mask(selector)
         yield self, mask
 
+    def _get_tree_selection(self, selector):
+        # The selection the index made of all of the grids of a data object
+        # with this selector, if it includes this grid.
+        selections = getattr(self.index, "_tree_selections", None)
+        if selections is None:
+            return None
+        selection = selections.get(hash(selector))
+        if selection is None or \
+           not selection.contains(self.id - self._id_offset):
+            return None
+        return selection
+
     def _get_selector_mask(self, selector):
         if self._cache_mask and hash(selector) == self._last_selector_id:
             mask = self._last_mask
         else:
-            mask = selector.fill_mask(self)
+            selection = self._get_tree_selection(selector)
+            if selection is not None:
+                mask = selection.grid_mask(self.id - self._id_offset)
+            else:
+                mask = selector.fill_mask(self)
             if self._cache_mask:
                 self._last_mask = mask
             self._last_selector_id = hash(selector)
             if mask is None:
                 self._last_count = 0
+            elif selection is not None:
+                self._last_count = selection.grid_count(
+                    self.id - self._id_offset)
             else:
                 self._last_count = mask.sum()
         return mask
@@ -0,0 +1,209 @@
+"""
+An index of where each particle of a dataset is, by particle ID.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import hashlib
+import numpy as np
+import os
+
+from yt.config import ytcfg
+from yt.funcs import mylog
+from yt.utilities.on_demand_imports import _h5py as h5py
+
+# Bump this whenever the layout of the stored index changes.
+_index_version = 1
+
+_run_arrays = ("run_ids", "run_lengths", "run_chunks", "run_offsets")
+
+class ParticleIDIndex(object):
+    r"""
+    Where the particles of a dataset are, by their ID.  The IDs are kept as
+    sorted runs of consecutive IDs stored next to each other, each with the
+    number of the io chunk of ``ds.all_data()`` it is read from (a data file
+    for particle datasets, a group of grids for grid datasets) and the
+    offset of its first particle among that chunk's particles.  Particle IDs
+    are assumed to be unique.
+
+    Building the index reads the IDs of every particle once.  If the
+    ``cache_particle_ids`` option is on, it is saved to a sidecar
+    ``.particle_ids_<ptype>.h5`` file next to the dataset and read back from
+    there afterwards.
+
+    Parameters
+    ----------
+    ds : Dataset
+        The dataset to index.
+    id_field : tuple of strings
+        The field holding the particle IDs, such as
+        ``("all", "particle_index")``.
+    """
+    def __init__(self, ds, id_field):
+        self.ds = ds
+        self.id_field = id_field
+        for name in _run_arrays:
+            setattr(self, name, None)
+
+    @classmethod
+    def for_dataset(cls, ds, id_field):
+        """
+        Return the index of *id_field* in *ds*, building or loading it if it
+        has not been used before.
+        """
+        if not hasattr(ds, "_particle_id_indexes"):
+            ds._particle_id_indexes = {}
+        indexes = ds._particle_id_indexes
+        if id_field not in indexes:
+            index = cls(ds, id_field)
+            if not index.load():
+                index.build()
+                index.save()
+            indexes[id_field] = index
+        return indexes[id_field]
+
+    @property
+    def filename(self):
+        """
+        The sidecar file the index is saved to, or None if it is not saved.
+        """
+        if not ytcfg.getboolean("yt", "cache_particle_ids"):
+            return None
+        fn = self.ds.parameter_filename
+        if not os.path.isfile(fn):
+            return None
+        return "%s.particle_ids_%s.h5" % (fn, self.id_field[0])
+
+    def _chunks(self):
+        return self.ds.all_data().chunks([], "io")
+
+    def _cache_key(self):
+        # The offsets are only good for the same chunks, so they are part of
+        # the key along with the dataset and its parameter file.
+        st = os.stat(self.ds.parameter_filename)
+        key = [_index_version, self.ds._hash(), self.id_field,
+               st.st_size, int(st.st_mtime)]
+        key.append([len(chunk._current_chunk.objs)
+                    for chunk in self._chunks()])
+        return hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+    def build(self):
+        """
+        Read the IDs of every particle and sort them into runs.
+        """
+        mylog.info("Building particle ID index of %s for %s.",
+                   self.id_field, self.ds)
+        runs = []
+        for ci, chunk in enumerate(self._chunks()):
+            ids = chunk[self.id_field].d.astype("int64")
+            if ids.size == 0:
+                continue
+            order = np.argsort(ids, kind="mergesort")
+            sids = ids[order]
+            # A run ends wherever either the IDs or their offsets skip.
+            breaks = np.where((np.diff(sids) != 1) |
+                              (np.diff(order) != 1))[0] + 1
+            starts = np.concatenate([[0], breaks])
+            lengths = np.diff(np.concatenate([starts, [ids.size]]))
+            runs.append((sids[starts], lengths,
+                         np.zeros(starts.size, dtype="int64") + ci,
+                         order[starts]))
+        if len(runs) == 0:
+            runs = [tuple(np.empty(0, dtype="int64") for name in _run_arrays)]
+        runs = [np.concatenate(arrays).astype("int64")
+                for arrays in zip(*runs)]
+        order = np.argsort(runs[0], kind="mergesort")
+        for name, arr in zip(_run_arrays, runs):
+            setattr(self, name, arr[order])
+
+    def load(self):
+        """
+        Read the index from its sidecar file.  Returns False if there is
+        none, or it is out of date.
+        """
+        fn = self.filename
+        if fn is None or not os.path.isfile(fn):
+            return False
+        try:
+            with h5py.File(fn, "r") as f:
+                key = f.attrs.get("cache_key")
+                if isinstance(key, bytes):
+                    key = key.decode("utf-8")
+                if key != self._cache_key():
+                    mylog.info("Particle ID index %s is out of date, "
+                               "rebuilding.", fn)
+                    return False
+                for name in _run_arrays:
+                    setattr(self, name, f[name][:])
+        except (IOError, OSError, KeyError) as e:
+            mylog.debug("Could not read particle ID index %s (%s)", fn, e)
+            return False
+        return True
+
+    def save(self):
+        """
+        Write the index to its sidecar file, if it has one.
+        """
+        fn = self.filename
+        if fn is None or self.ds.index.comm.rank > 0:
+            return
+        try:
+            with h5py.File(fn, "w") as f:
+                f.attrs["cache_key"] = self._cache_key()
+                for name in _run_arrays:
+                    f.create_dataset(name, data=getattr(self, name),
+                                     compression="lzf")
+        except (IOError, OSError) as e:
+            mylog.debug("Could not write particle ID index %s (%s)", fn, e)
+
+    def locate(self, ids):
+        """
+        Find the particles with *ids*.  Returns the number of the chunk each
+        of them is in and its offset among that chunk's particles, both -1
+        for IDs that are not in the dataset.
+        """
+        ids = np.asarray(ids, dtype="int64")
+        run = np.searchsorted(self.run_ids, ids, side="right") - 1
+        found = run > -1
+        found[found] = ids[found] < self.run_ids[run[found]] + \
+          self.run_lengths[run[found]]
+        chunks = np.zeros(ids.size, dtype="int64") - 1
+        offsets = np.zeros(ids.size, dtype="int64") - 1
+        run = run[found]
+        chunks[found] = self.run_chunks[run]
+        offsets[found] = self.run_offsets[run] + ids[found] - self.run_ids[run]
+        return chunks, offsets
+
+    def read(self, fields, chunks, offsets):
+        """
+        Read *fields* for the particles at *chunks* and *offsets*, as found
+        by ``locate``, reading only the chunks they are in.  Returns a dict
+        of arrays of the values of each field, in the same order.
+        """
+        rv = {}
+        if chunks.size == 0:
+            for field in fields:
+                rv[field] = np.empty(0, dtype="float64")
+            return rv
+        order = np.argsort(chunks, kind="mergesort")
+        needed, starts = np.unique(chunks[order], return_index=True)
+        ends = list(starts[1:]) + [chunks.size]
+        dd = self.ds.all_data()
+        to_read = dd.chunks([], "io", chunk_ind=[int(ci) for ci in needed])
+        for chunk, start, end in zip(to_read, starts, ends):
+            ind = order[start:end]
+            for field in fields:
+                vals = chunk[field].d
+                if field not in rv:
+                    rv[field] = np.empty(chunks.size, dtype=vals.dtype)
+                rv[field][ind] = vals[offsets[ind]]
+        return rv
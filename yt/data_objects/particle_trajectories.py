@@ -12,7 +12,8 @@ from __future__ import print_function
 #-----------------------------------------------------------------------------
 
 from yt.data_objects.field_data import YTFieldData
-from yt.utilities.lib.particle_mesh_operations import CICSample_3
+from yt.data_objects.particle_id_index import ParticleIDIndex
+from yt.utilities.point_sampling import PointSampler
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     parallel_root_only
 from yt.funcs import mylog, get_pbar
@@ -42,6 +43,13 @@ class ParticleTrajectories(object):
     suppress_logging : boolean
         Suppress yt's logging when iterating over the simulation time
         series. Default: False
+    use_id_index : boolean
+        Find the particles in each dataset with a
+        :class:`~yt.data_objects.particle_id_index.ParticleIDIndex`, so that
+        their fields are only read from the chunks of the dataset they are
+        in.  The index is built the first time each dataset is used and,
+        if the ``cache_particle_ids`` option is on, saved next to it.
+        Default: True
 
     Examples
     --------
@@ -58,7 +66,8 @@ class ParticleTrajectories(object):
     >>> for t in trajs :
     >>>     print t["particle_velocity_x"].max(), t["particle_velocity_x"].min()
     """
-    def __init__(self, outputs, indices, fields=None, suppress_logging=False):
+    def __init__(self, outputs, indices, fields=None, suppress_logging=False,
+                 use_id_index=True):
 
         indices.sort() # Just in case the caller wasn't careful
         self.field_data = YTFieldData()
@@ -66,6 +75,8 @@ class ParticleTrajectories(object):
         self.masks = []
         self.sorts = []
         self.array_indices = []
+        self.locations = []
+        self.use_id_index = use_id_index
         self.indices = indices
         self.num_indices = len(indices)
         self.num_steps = len(outputs)
@@ -83,24 +94,37 @@ class ParticleTrajectories(object):
         ds_first = self.data_series[0]
         dd_first = ds_first.all_data()
         idx_field = dd_first._determine_fields("particle_index")[0]
+        self._index_field = idx_field
         for field in ("particle_position_%s" % ax for ax in "xyz"):
             fds[field] = dd_first._determine_fields(field)[0]
 
         my_storage = {}
         pbar = get_pbar("Constructing trajectory information", len(self.data_series))
         for i, (sto, ds) in enumerate(self.data_series.piter(storage=my_storage)):
-            dd = ds.all_data()
-            newtags = dd[idx_field].d.astype("int64")
-            mask = np.in1d(newtags, indices, assume_unique=True)
-            sort = np.argsort(newtags[mask])
-            array_indices = np.where(np.in1d(indices, newtags, assume_unique=True))[0]
-            self.array_indices.append(array_indices)
-            self.masks.append(mask)
-            self.sorts.append(sort)
-
             pfields = {}
-            for field in ("particle_position_%s" % ax for ax in "xyz"):
-                pfields[field] = dd[fds[field]].ndarray_view()[mask][sort]
+            if self.use_id_index:
+                id_index = ParticleIDIndex.for_dataset(ds, idx_field)
+                chunks, offsets = id_index.locate(indices)
+                array_indices = np.where(chunks > -1)[0]
+                location = (chunks[array_indices], offsets[array_indices])
+                self.array_indices.append(array_indices)
+                self.locations.append(location)
+                pos = id_index.read(
+                    [fds[field] for field in fds], *location)
+                for field in fds:
+                    pfields[field] = pos[fds[field]]
+            else:
+                dd = ds.all_data()
+                newtags = dd[idx_field].d.astype("int64")
+                mask = np.in1d(newtags, indices, assume_unique=True)
+                sort = np.argsort(newtags[mask])
+                array_indices = np.where(np.in1d(indices, newtags, assume_unique=True))[0]
+                self.array_indices.append(array_indices)
+                self.masks.append(mask)
+                self.sorts.append(sort)
+
+                for field in ("particle_position_%s" % ax for ax in "xyz"):
+                    pfields[field] = dd[fds[field]].ndarray_view()[mask][sort]
 
             sto.result_id = ds.parameter_filename
             sto.result = (ds.current_time, array_indices, pfields)
@@ -229,35 +253,37 @@ class ParticleTrajectories(object):
         my_storage = {}
         
         for i, (sto, ds) in enumerate(self.data_series.piter(storage=my_storage)):
-            mask = self.masks[i]
-            sort = self.sorts[i]
             pfield = {}
 
-            if new_particle_fields:  # there's at least one particle field
+            if new_particle_fields and self.use_id_index:
+                id_index = ParticleIDIndex.for_dataset(
+                    ds, self._index_field)
+                values = id_index.read(
+                    [fds[field] for field in new_particle_fields],
+                    *self.locations[i])
+                for field in new_particle_fields:
+                    pfield[field] = values[fds[field]]
+            elif new_particle_fields:  # there's at least one particle field
+                mask = self.masks[i]
+                sort = self.sorts[i]
                 dd = ds.all_data()
                 for field in new_particle_fields:
                     # This is easy... just get the particle fields
                     pfield[field] = dd[fds[field]].d[mask][sort]
 
             if grid_fields:
-                # This is hard... must loop over grids
-                for field in grid_fields:
-                    pfield[field] = np.zeros(self.num_indices)
-                x = self["particle_position_x"][:,step].d
-                y = self["particle_position_y"][:,step].d
-                z = self["particle_position_z"][:,step].d
-                particle_grids, particle_grid_inds = ds.index._find_points(x,y,z)
-
-                # This will fail for non-grid index objects
-                for grid in particle_grids:
-                    cube = grid.retrieve_ghost_zones(1, grid_fields)
-                    for field in grid_fields:
-                        CICSample_3(x, y, z, pfield[field],
-                                    self.num_indices,
-                                    cube[fds[field]],
-                                    np.array(grid.LeftEdge).astype(np.float64),
-                                    np.array(grid.ActiveDimensions).astype(np.int32),
-                                    grid.dds[0])
+                # Interpolate to the particles that are in this dataset
+                ind = self.array_indices[i]
+                pos = []
+                for ax in "xyz":
+                    p = self["particle_position_%s" % ax]
+                    pos.append(ds.arr(p[ind, step].d, str(p.units)))
+                pos = ds.arr(np.column_stack(pos), pos[0].units)
+                sampler = PointSampler(ds, method="cic")
+                values = sampler.sample([fds[field] for field in grid_fields],
+                                        pos)
+                for field, v in zip(grid_fields, values):
+                    pfield[field] = v.d
             sto.result_id = ds.parameter_filename
             sto.result = (self.array_indices[i], pfield)
             pbar.update(step)
@@ -15,6 +15,7 @@ Profile classes, to deal with generating and obtaining profiles
 
 import numpy as np
 
+from yt.config import ytcfg
 from yt.fields.derived_field import DerivedField
 from yt.frontends.ytdata.utilities import \
     save_as_dataset
@@ -37,6 +38,7 @@ from yt.utilities.lib.misc_utilities import \
     new_bin_profile3d
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     ParallelAnalysisInterface, parallel_objects
+from yt.utilities.physical_ratios import HUGE
 from yt.utilities.lib.particle_mesh_operations import \
     CICDeposit_2, \
     NGPDeposit_2
@@ -84,8 +86,94 @@ class ProfileFieldAccumulator(object):
         self.used = np.zeros(size, dtype='bool')
         self.weight_values = np.zeros(size, dtype="float64")
 
+class ProfileChunkData(object):
+    """
+    The field data of one chunk of a data source, kept in memory so that it
+    can be binned without being read again.
+    """
+    def __init__(self, ds, field_data):
+        self.ds = ds
+        self.field_data = field_data
+
+    def __getitem__(self, field):
+        return self.field_data[field]
+
+    def get_data(self, fields):
+        # Everything is in memory already.
+        pass
+
+class ProfileChunkCache(object):
+    """
+    Chunks read while finding the extrema of the bin fields, by their index
+    among the chunks this processor handles.  If *complete* is False, some
+    chunks did not fit in memory and have to be read again.
+    """
+    def __init__(self, fields):
+        self.fields = set(fields)
+        self.chunks = {}
+        self.nbytes = 0
+        self.complete = True
+
+class ProfileExtremaReader(object):
+    """
+    Finds the extrema of the bin fields of a profile from the chunks of its
+    data source as they are handed to it, along with those of their positive
+    values for logged bins.  Up to *max_bytes* of the data of *fields* is
+    kept so that the profile can then be binned without reading it again.
+    """
+    def __init__(self, data_source, bin_fields, fields, max_bytes):
+        self.data_source = data_source
+        self.bin_fields = bin_fields
+        self.units = [data_source.ds.field_info[f].output_units
+                      for f in bin_fields]
+        # The first row is over all values, the second over positive ones.
+        self.mins = np.empty((2, len(bin_fields)), dtype="float64")
+        self.maxs = np.empty((2, len(bin_fields)), dtype="float64")
+        self.mins[:] = HUGE
+        self.maxs[:] = -HUGE
+        self.max_bytes = max_bytes
+        self.cache = ProfileChunkCache(fields)
+
+    def process_chunk(self, index, chunk):
+        """
+        Take in the chunk *chunk*, the *index*-th one this processor handles.
+        """
+        cache = self.cache
+        if cache.complete:
+            chunk.get_data(list(cache.fields))
+        for j, f in enumerate(self.bin_fields):
+            fd = chunk[f]
+            for k, vals in enumerate((fd, fd[fd > 0.0])):
+                if vals.size == 0: continue
+                self.mins[k, j] = min(self.mins[k, j],
+                                      vals.min().in_units(self.units[j]).d)
+                self.maxs[k, j] = max(self.maxs[k, j],
+                                      vals.max().in_units(self.units[j]).d)
+        if not cache.complete: return
+        data = dict((f, chunk[f]) for f in cache.fields)
+        nbytes = sum(v.nbytes for v in data.values())
+        if cache.nbytes + nbytes > self.max_bytes:
+            cache.complete = False
+            return
+        cache.chunks[index] = ProfileChunkData(chunk.ds, data)
+        cache.nbytes += nbytes
+
+    def finalize(self, logs):
+        """
+        Return the extrema of each bin field, of only its positive values if
+        it is logged, and the cache of chunks.
+        """
+        comm = self.data_source.comm
+        mins = comm.mpi_allreduce(self.mins, op="min")
+        maxs = comm.mpi_allreduce(self.maxs, op="max")
+        ds = self.data_source.ds
+        ex = [ds.arr([mins[int(bool(l)), j], maxs[int(bool(l)), j]], u)
+              for j, (l, u) in enumerate(zip(logs, self.units))]
+        return ex, self.cache
+
 class ProfileND(ParallelAnalysisInterface):
     """The profile object class"""
+    _chunk_cache = None
     def __init__(self, data_source, weight_field = None):
         self.data_source = data_source
         self.ds = data_source.ds
@@ -122,9 +210,22 @@ been deprecated, use profile.standard_deviation instead."""
         for f in fields:
             self.field_info[f] = self.data_source.ds.field_info[f]
         temp_storage = ProfileFieldAccumulator(len(fields), self.size)
-        citer = self.data_source.chunks([], "io")
-        for chunk in parallel_objects(citer):
-            self._bin_chunk(chunk, fields, temp_storage)
+        # Chunks kept from finding the extrema in create_profile are only
+        # used once, and only if they hold everything we need.
+        cache, self._chunk_cache = self._chunk_cache, None
+        needed = set(fields) | set(self.bin_fields)
+        if self.weight_field is not None:
+            needed.add(self.weight_field)
+        if cache is not None and not needed.issubset(cache.fields):
+            cache = None
+        if cache is not None:
+            for i in sorted(cache.chunks):
+                self._bin_chunk(cache.chunks[i], fields, temp_storage)
+        if cache is None or not cache.complete:
+            citer = self.data_source.chunks([], "io")
+            for i, chunk in enumerate(parallel_objects(citer)):
+                if cache is not None and i in cache.chunks: continue
+                self._bin_chunk(chunk, fields, temp_storage)
         self._finalize_storage(fields, temp_storage)
 
     def set_field_unit(self, field, new_unit):
@@ -899,7 +1000,7 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
                    extrema=None, logs=None, units=None,
                    weight_field="cell_mass",
                    accumulation=False, fractional=False,
-                   deposition='ngp'):
+                   deposition='ngp', _extrema_reader=None):
     r"""
     Create a 1, 2, or 3D profile object.
 
@@ -1029,9 +1130,30 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
         else:
             logs_list.append(data_source.ds.field_info[bin_field].take_log)
     logs = logs_list
+    # A QueryBatch hands us a reader that has already seen all of the data.
+    reader = _extrema_reader
+    if reader is None and extrema is None:
+        max_bytes = ytcfg.getfloat("yt", "profile_cache_memory") * 1024**2
+        if max_bytes > 0:
+            # Read everything once, finding the extrema and keeping the
+            # data for binning.
+            cached_fields = list(bin_fields) + list(fields)
+            if weight_field is not None:
+                cached_fields += data_source._determine_fields(weight_field)
+            reader = ProfileExtremaReader(data_source, bin_fields,
+                                          cached_fields, max_bytes)
+            citer = data_source.chunks(list(bin_fields), "io")
+            for i, chunk in enumerate(parallel_objects(citer)):
+                reader.process_chunk(i, chunk)
+    chunk_cache = None
+    if reader is not None:
+        reader_ex, chunk_cache = reader.finalize(logs)
     if extrema is None:
-        ex = [data_source.quantities["Extrema"](f, non_zero=l)
-              for f, l in zip(bin_fields, logs)]
+        if reader is not None:
+            ex = reader_ex
+        else:
+            ex = [data_source.quantities["Extrema"](f, non_zero=l)
+                  for f, l in zip(bin_fields, logs)]
         # pad extrema by epsilon so cells at bin edges are not excluded
         for i, (mi, ma) in enumerate(ex):
             mi = mi - np.spacing(mi)
@@ -1089,6 +1211,7 @@ def create_profile(data_source, bin_fields, fields, n_bins=64,
     if cls is ParticleProfile:
         kwargs['deposition'] = deposition
     obj = cls(*args, **kwargs)
+    obj._chunk_cache = chunk_cache
     setattr(obj, "accumulation", accumulation)
     setattr(obj, "fractional", fractional)
     if fields is not None:
@@ -0,0 +1,148 @@
+"""
+A persistent store of quadtree projections.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import hashlib
+import numpy as np
+import os
+
+from yt.config import ytcfg, CONFIG_DIR
+from yt.funcs import mylog
+from yt.utilities.on_demand_imports import _h5py as h5py
+
+# Bump this whenever the layout of the stored projections changes.
+_store_version = 1
+
+_container_fields = ("px", "py", "pdx", "pdy", "weight_field")
+
+def _field_name(field):
+    if isinstance(field, tuple):
+        return "*".join(field)
+    return field
+
+def projection_key(proj):
+    """
+    Identify a projection by everything other than its fields that its
+    values depend on: its axis, weight field and method, the data source it
+    projects and the field parameters it was made with.
+    """
+    dobj = proj.data_source
+    params = sorted((k, repr(v)) for k, v in proj.field_parameters.items())
+    key = (_store_version, proj.axis, repr(proj.weight_field), proj.method,
+           proj._sum_only, dobj._hash(), getattr(dobj, "max_level", None),
+           params)
+    return hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+class ProjectionStore(object):
+    """
+    Projections of one dataset, kept in an HDF5 file.  Each projection keeps
+    the refinement of its quadtree, its positions and weights, and the
+    values of every field projected so far, so that projecting a field again
+    reads nothing from the dataset, and projecting a new one reuses the
+    refinement of the tree.
+
+    Projections are only stored if the ``projection_cache`` option is on.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+    @classmethod
+    def for_dataset(cls, ds):
+        """
+        Return the store for *ds*, or None if the store is turned off.
+        """
+        if not ytcfg.getboolean("yt", "projection_cache"):
+            return None
+        store_dir = ytcfg.get("yt", "projection_cache_dir")
+        if not store_dir:
+            store_dir = os.path.join(CONFIG_DIR, "projections")
+        return cls(os.path.join(store_dir, "%s.h5" % ds._hash()))
+
+    def restore(self, proj, fields):
+        """
+        Fill in the stored values of *fields* in *proj*.  Returns the
+        refinement of its stored tree, or None, and the fields that still
+        have to be projected.
+        """
+        if not os.path.exists(self.filename):
+            return None, fields
+        key = projection_key(proj)
+        try:
+            with h5py.File(self.filename, "r") as f:
+                if key not in f:
+                    return None, fields
+                g = f[key]
+                refined = g["refined"][:]
+                missing = []
+                for field in fields:
+                    name = _field_name(field)
+                    if name not in g["fields"]:
+                        missing.append(field)
+                        continue
+                    units = g["fields"][name].attrs["units"]
+                    if not isinstance(units, str):
+                        units = units.decode("utf-8")
+                    proj[field] = proj.ds.arr(g["fields"][name][:], units)
+                    proj._projected_units[field] = proj[field].units
+                if len(missing) < len(fields):
+                    for name in _container_fields:
+                        if name in ("px", "py", "pdx", "pdy"):
+                            proj[name] = proj.ds.arr(
+                                g[name][:], proj.ds.domain_width.units)
+                        else:
+                            proj[name] = g[name][:]
+        except (IOError, OSError, KeyError) as e:
+            mylog.debug("Could not read projection store %s (%s)",
+                        self.filename, e)
+            return None, fields
+        if len(missing) < len(fields):
+            mylog.info("Using stored projections of %s", [
+                f for f in fields if f not in missing])
+        return refined, missing
+
+    def save(self, proj, fields):
+        """
+        Store the newly projected *fields* of *proj*.
+        """
+        if proj.comm.rank > 0:
+            return
+        key = projection_key(proj)
+        refined = proj.tree.tobuffer()[0]
+        try:
+            if not os.path.isdir(os.path.dirname(self.filename)):
+                os.makedirs(os.path.dirname(self.filename))
+            with h5py.File(self.filename, "a") as f:
+                if key in f and \
+                   f[key]["refined"].shape != refined.shape:
+                    # The tree has changed, so the old values are no use.
+                    del f[key]
+                if key not in f:
+                    g = f.create_group(key)
+                    g.create_dataset("refined", data=refined,
+                                     compression="lzf")
+                    for name in _container_fields:
+                        g.create_dataset(name, data=np.asarray(proj[name]),
+                                         compression="lzf")
+                    g.create_group("fields")
+                g = f[key]["fields"]
+                for field in fields:
+                    name = _field_name(field)
+                    if name in g:
+                        del g[name]
+                    g.create_dataset(name, data=proj[field].d,
+                                     compression="lzf")
+                    g[name].attrs["units"] = str(proj[field].units)
+        except (IOError, OSError) as e:
+            mylog.debug("Could not write projection store %s (%s)",
+                        self.filename, e)
@@ -0,0 +1,292 @@
+"""
+Batches of queries on a data container that are answered together, in a
+single pass over its chunks.
+
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+from yt.config import ytcfg
+from yt.funcs import \
+    camelcase_to_underscore, \
+    ensure_list
+from yt.utilities.parallel_tools.parallel_analysis_interface import \
+    parallel_objects
+from .derived_quantities import \
+    DeferredQuantityCall, \
+    derived_quantity_registry
+from .profiles import \
+    ProfileExtremaReader, \
+    create_profile
+
+class BatchResult(object):
+    """
+    The eventual result of a query added to a QueryBatch, available as
+    ``value`` once the batch has been run.
+    """
+    def __init__(self, description):
+        self.description = description
+        self._value = None
+        self._done = False
+
+    def _set(self, value):
+        self._value = value
+        self._done = True
+
+    @property
+    def value(self):
+        if not self._done:
+            raise RuntimeError(
+                "The query batch holding %s has not been run yet." %
+                self.description)
+        return self._value
+
+    def __repr__(self):
+        if self._done:
+            return "BatchResult(%s): %s" % (self.description, self._value)
+        return "BatchResult(%s): pending" % self.description
+
+class BatchQuantityCollection(object):
+    """
+    The derived quantities of a QueryBatch.  Calling one of them adds it to
+    the batch and returns a BatchResult rather than its value.
+    """
+    def __init__(self, batch):
+        self.batch = batch
+        for f in self.keys():
+            setattr(self, camelcase_to_underscore(f), self[f])
+
+    def __getitem__(self, key):
+        if key not in derived_quantity_registry:
+            raise KeyError(key)
+        def add_quantity(*args, **kwargs):
+            return self.batch.add_quantity(key, *args, **kwargs)
+        return add_quantity
+
+    def keys(self):
+        return derived_quantity_registry.keys()
+
+class BatchConsumer(object):
+    # A query in a batch.  start is called before the chunks are traversed;
+    # if the consumer is still active, it is handed every chunk and may
+    # return something to be kept for it, and finish then receives a dict of
+    # everything it returned, keyed by chunk.
+    active = True
+
+    def __init__(self, data_source, result):
+        self.data_source = data_source
+        self.result = result
+
+    def start(self):
+        pass
+
+    def process_chunk(self, index, chunk):
+        return None
+
+    def finish(self, storage):
+        pass
+
+class QuantityConsumer(BatchConsumer):
+    def __init__(self, data_source, result, name, args, kwargs):
+        super(QuantityConsumer, self).__init__(data_source, result)
+        self.quantity = derived_quantity_registry[name](data_source)
+        self.args = args
+        self.kwargs = kwargs
+
+    def start(self):
+        # Calling the quantity in planning mode stops it just before it
+        # iterates over the chunks, leaving behind the arguments its chunks
+        # are to be processed with.
+        q = self.quantity
+        q._batch_calls = []
+        try:
+            value = q(*self.args, **self.kwargs)
+        except DeferredQuantityCall:
+            self.chunk_args, self.chunk_kwargs = q._batch_calls[0]
+        else:
+            # It did not need to look at any data.
+            self.result._set(value)
+            self.active = False
+        finally:
+            q._batch_calls = None
+
+    def process_chunk(self, index, chunk):
+        return self.quantity.process_chunk(
+            chunk, *self.chunk_args, **self.chunk_kwargs)
+
+    def finish(self, storage):
+        q = self.quantity
+        q._batch_storage = [storage]
+        try:
+            self.result._set(q(*self.args, **self.kwargs))
+        finally:
+            q._batch_storage = None
+
+class ProfileConsumer(BatchConsumer):
+    def __init__(self, data_source, result, bin_fields, fields, kwargs):
+        super(ProfileConsumer, self).__init__(data_source, result)
+        self.bin_fields = bin_fields
+        self.fields = fields
+        self.kwargs = kwargs
+
+    def start(self):
+        dobj = self.data_source
+        bin_fields = dobj._determine_fields(ensure_list(self.bin_fields))
+        cached_fields = bin_fields + dobj._determine_fields(
+            ensure_list(self.fields))
+        weight_field = self.kwargs.get("weight_field", "cell_mass")
+        if weight_field is not None:
+            cached_fields += dobj._determine_fields(weight_field)
+        max_bytes = ytcfg.getfloat("yt", "profile_cache_memory") * 1024**2
+        self.reader = ProfileExtremaReader(dobj, bin_fields, cached_fields,
+                                           max_bytes)
+
+    def process_chunk(self, index, chunk):
+        self.reader.process_chunk(index, chunk)
+
+    def finish(self, storage):
+        self.result._set(create_profile(
+            self.data_source, self.bin_fields, self.fields,
+            _extrema_reader=self.reader, **self.kwargs))
+
+class ProjectionConsumer(BatchConsumer):
+    def __init__(self, data_source, result, field, axis, kwargs):
+        super(ProjectionConsumer, self).__init__(data_source, result)
+        self.field = field
+        self.axis = axis
+        self.kwargs = kwargs
+
+    def start(self):
+        ds = self.data_source.ds
+        # Without any fields, the projection is set up but reads nothing.
+        prj = ds.proj([], self.axis, data_source=self.data_source,
+                      **self.kwargs)
+        if not hasattr(prj, "_start_projection"):
+            # Projections that are not built on a quadtree make their own
+            # pass over the data.
+            self.result._set(ds.proj(self.field, self.axis,
+                                     data_source=self.data_source,
+                                     **self.kwargs))
+            self.active = False
+            return
+        self.projection = prj
+        self.fields = prj._determine_fields(ensure_list(self.field))
+        self.tree = prj._start_projection(self.fields)
+
+    def process_chunk(self, index, chunk):
+        prj = self.projection
+        with self.data_source._field_parameter_state(prj.field_parameters):
+            prj._project_chunk(chunk, self.fields, self.tree)
+
+    def finish(self, storage):
+        self.projection._finish_projection(self.fields, self.tree)
+        self.result._set(self.projection)
+
+class QueryBatch(object):
+    """
+    A set of derived quantities, profiles and projections of a data
+    container that are computed together, reading each chunk of the
+    container once and handing it to every one of them.
+
+    Queries are added to the batch, each returning a BatchResult whose
+    ``value`` is available once the batch has been run, either by calling
+    ``run`` or by leaving a ``with`` block around the batch.
+
+    Parameters
+    ----------
+    data_source : YTSelectionContainer
+        The data container the queries are made of.
+
+    Examples
+    --------
+
+    >>> ds = load("DD0046/DD0046")
+    >>> ad = ds.all_data()
+    >>> with ad.batch() as batch:
+    ...     ex = batch.quantities.extrema(("gas", "density"))
+    ...     mass = batch.quantities.total_mass()
+    ...     prof = batch.profile([("gas", "density")],
+    ...                          [("gas", "temperature")])
+    ...     prj = batch.proj(("gas", "density"), "z")
+    >>> print (ex.value, mass.value)
+    >>> print (prof.value["gas", "temperature"])
+    """
+    def __init__(self, data_source):
+        self.data_source = data_source
+        self.quantities = BatchQuantityCollection(self)
+        self._consumers = []
+        self._done = False
+
+    def _add(self, consumer):
+        if self._done:
+            raise RuntimeError("This query batch has already been run.")
+        self._consumers.append(consumer)
+        return consumer.result
+
+    def add_quantity(self, name, *args, **kwargs):
+        """
+        Add the derived quantity *name*, called with *args* and *kwargs*,
+        to the batch.
+        """
+        result = BatchResult(name)
+        return self._add(QuantityConsumer(
+            self.data_source, result, name, args, kwargs))
+
+    def profile(self, bin_fields, fields, **kwargs):
+        """
+        Add a profile to the batch.  The arguments are those of
+        ``create_profile``.
+        """
+        result = BatchResult("profile of %s" % (ensure_list(fields),))
+        return self._add(ProfileConsumer(
+            self.data_source, result, bin_fields, fields, kwargs))
+
+    def proj(self, field, axis, weight_field=None, method="integrate"):
+        """
+        Add a projection of *field* along *axis* through the data
+        container to the batch.
+        """
+        result = BatchResult("projection of %s" % (field,))
+        kwargs = dict(weight_field=weight_field, method=method)
+        return self._add(ProjectionConsumer(
+            self.data_source, result, field, axis, kwargs))
+
+    def run(self):
+        """
+        Compute every query in the batch in a single pass over the chunks
+        of the data container.
+        """
+        if self._done:
+            raise RuntimeError("This query batch has already been run.")
+        self._done = True
+        # create the index if it doesn't exist yet
+        self.data_source.ds.index
+        for consumer in self._consumers:
+            consumer.start()
+        active = [c for c in self._consumers if c.active]
+        if len(active) == 0: return
+        storage = {}
+        # Fields read by one consumer stay in the field data of the chunk
+        # for the rest of them.
+        chunks = self.data_source.chunks([], "io")
+        for i, (sto, chunk) in enumerate(
+                parallel_objects(chunks, -1, storage = storage)):
+            sto.result = [c.process_chunk(i, chunk) for c in active]
+        for j, consumer in enumerate(active):
+            consumer.finish(dict((key, storage[key][j]) for key in storage))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
@@ -16,15 +16,26 @@ Data containers based on geometric selection
 
 import numpy as np
 
+from yt.data_objects.cut_region_conditionals import \
+    FieldThreshold, \
+    parse_conditional
 from yt.data_objects.data_containers import \
     YTSelectionContainer0D, YTSelectionContainer1D, \
     YTSelectionContainer2D, YTSelectionContainer3D
+from yt.data_objects.grid_patch import \
+    AMRGridPatch
+from yt.data_objects.octree_subset import \
+    OctreeSubset
+from yt.fields.derived_field import \
+    ValidateParameter
 from yt.funcs import \
     ensure_list, \
     iterable, \
     validate_width_tuple, \
     fix_length, \
     fix_axis
+from yt.geometry.geometry_handler import \
+    YTDataChunk
 from yt.geometry.selection_routines import \
     points_in_cells
 from yt.units.yt_array import \
@@ -800,6 +811,9 @@ class YTCutRegion(YTSelectionContainer3D):
         self.base_object = data_source
         self._selector = None
         self._particle_mask = {}
+        self._conditions = None
+        self._cond_ind_cache = None
+        self._threshold_fields = None
         # Need to interpose for __getitem__, fwidth, fcoords, icoords, iwidth,
         # ires and get_data
 
@@ -809,6 +823,8 @@ class YTCutRegion(YTSelectionContainer3D):
         for chunk in self.index._chunk(self.base_object,
                                        chunking_style,
                                        **kwargs):
+            chunk = self._prune_chunk(chunk)
+            if chunk is None: continue
             with self.base_object._chunked_read(chunk):
                 with self._chunked_read(chunk):
                     self.get_data(fields)
@@ -827,6 +843,10 @@ class YTCutRegion(YTSelectionContainer3D):
             else:
                 self.field_data[field] = self.base_object[field][ind]
 
+    def set_field_parameter(self, name, val):
+        super(YTCutRegion, self).set_field_parameter(name, val)
+        self._cond_ind_cache = None
+
     @property
     def blocks(self):
         # We have to take a slightly different approach here.  Note that all
@@ -834,25 +854,131 @@ class YTCutRegion(YTSelectionContainer3D):
         for obj, m in self.base_object.blocks:
             m = m.copy()
             with obj._field_parameter_state(self.field_parameters):
-                for cond in self.conditionals:
-                    ss = eval(cond)
+                for cond in self._get_conditions():
+                    ss = cond.evaluate(obj, globals())
                     m = np.logical_and(m, ss, m)
             if not np.any(m): continue
             yield obj, m
 
+    def _get_conditions(self):
+        # The conditionals are parsed once, into a list of conditions that
+        # are ANDed together.
+        if self._conditions is None:
+            self._conditions = []
+            for cond in self.conditionals:
+                self._conditions.extend(parse_conditional(cond))
+        return self._conditions
+
     @property
     def _cond_ind(self):
+        # The mask is kept for as long as the base object is on the same
+        # chunk, as it is asked for by get_data, icoords, fcoords and so on.
+        chunk = self.base_object._current_chunk
+        if self._cond_ind_cache is not None and \
+           self._cond_ind_cache[0] is chunk:
+            return self._cond_ind_cache[1]
         ind = None
         obj = self.base_object
         with obj._field_parameter_state(self.field_parameters):
-            for cond in self.conditionals:
-                res = eval(cond)
+            for cond in self._get_conditions():
+                res = cond.evaluate(obj, globals())
                 if ind is None: ind = res
                 if ind.shape != res.shape:
                     raise YTIllDefinedCutRegion(self.conditionals)
                 np.logical_and(res, ind, ind)
+            self._record_extrema(chunk)
+        self._cond_ind_cache = (chunk, ind)
         return ind
 
+    def _get_threshold_fields(self):
+        # The thresholds whose fields do not depend on field parameters, so
+        # that their extrema in an object can be remembered and used to skip
+        # that object the next time it comes up.
+        if self._threshold_fields is not None:
+            return self._threshold_fields
+        self._threshold_fields = []
+        if isinstance(self.base_object, YTCutRegion):
+            return self._threshold_fields
+        for cond in self._get_conditions():
+            if not isinstance(cond, FieldThreshold): continue
+            field = self._determine_fields(cond.field)[0]
+            finfo = self.ds._get_field_info(*field)
+            if any(isinstance(v, ValidateParameter)
+                   for v in finfo.validators):
+                continue
+            fd = self.ds.field_dependencies.get(finfo.name)
+            if fd is not None and len(fd.requested_parameters) > 0:
+                continue
+            self._threshold_fields.append((field, cond))
+        return self._threshold_fields
+
+    @property
+    def _extrema_store(self):
+        # Shared by all cut regions of this dataset, keyed by the selector of
+        # the base object, the field and the grid or oct subset.
+        store = getattr(self.index, "_cut_region_extrema", None)
+        if store is None:
+            store = self.index._cut_region_extrema = {}
+        return store
+
+    def _record_extrema(self, chunk):
+        if chunk is None or len(self._get_threshold_fields()) == 0:
+            return
+        # Only io and single object chunks are read in the order of their
+        # objects, which we need to split the values among them.
+        if chunk.chunk_type != "io" and len(chunk.objs) != 1:
+            return
+        obj = self.base_object
+        keys = [_chunk_obj_key(o) for o in chunk.objs]
+        if None in keys:
+            return
+        counts = [_selected_count(o, obj) for o in chunk.objs]
+        sel_hash = hash(obj.selector)
+        store = self._extrema_store
+        for field, cond in self._get_threshold_fields():
+            values = obj[field]
+            if values.ndim != 1 or values.size != sum(counts):
+                continue
+            values = values.d
+            offset = 0
+            for key, count in zip(keys, counts):
+                v = values[offset:offset + count]
+                offset += count
+                v = v[~np.isnan(v)]
+                if v.size == 0:
+                    # Nothing here can pass any threshold.
+                    ext = (np.inf, -np.inf)
+                else:
+                    ext = (v.min(), v.max())
+                store[sel_hash, field, key] = ext
+
+    def _prune_chunk(self, chunk):
+        # Drop the grids or oct subsets in which we already know that no
+        # selected cell passes one of the thresholds, so that their data is
+        # never read.
+        thresholds = self._get_threshold_fields()
+        store = getattr(self.index, "_cut_region_extrema", None)
+        if len(thresholds) == 0 or not store:
+            return chunk
+        sel_hash = hash(self.base_object.selector)
+        def _fails(o):
+            key = _chunk_obj_key(o)
+            if key is None: return False
+            for field, cond in thresholds:
+                ext = store.get((sel_hash, field, key))
+                if ext is not None and not cond.may_pass(*ext):
+                    return True
+            return False
+        objs = [o for o in chunk.objs if not _fails(o)]
+        if len(objs) == len(chunk.objs):
+            return chunk
+        if len(objs) == 0:
+            return None
+        counts = [o.count(self.base_object.selector) for o in objs]
+        data_size = sum(counts) if min(counts) >= 0 else None
+        return YTDataChunk(chunk.dobj, chunk.chunk_type, objs, data_size,
+                           field_type=chunk._field_type, cache=chunk._cache)
+
     def _part_ind(self, ptype):
         if self._particle_mask.get(ptype) is None:
             parent = getattr(self, "parent", self.base_object)
@@ -886,6 +1012,22 @@ class YTCutRegion(YTSelectionContainer3D):
     def fwidth(self):
         return self.base_object.fwidth[self._cond_ind,:]
 
+def _chunk_obj_key(obj):
+    # Grids are identified by their id, oct subsets by their domain.  Other
+    # objects, such as grids with ghost zones, are not remembered.
+    if isinstance(obj, AMRGridPatch):
+        return (type(obj).__name__, obj.id)
+    if isinstance(obj, OctreeSubset):
+        return (type(obj).__name__, obj.domain_id)
+    return None
+
+def _selected_count(obj, dobj):
+    count = obj.count(dobj.selector)
+    if count < 0:
+        # Oct subsets do not count their selected cells up front.
+        count = obj.select_ires(dobj).shape[0]
+    return count
+
 class YTIntersectionContainer3D(YTSelectionContainer3D):
     """
     This is a more efficient method of selecting the intersection of multiple
@@ -28,6 +28,8 @@ from yt.extern.six import add_metaclass, string_types
 from yt.config import ytcfg
 from yt.fields.derived_field import \
     DerivedField
+from yt.fields.field_dependency_cache import \
+    FieldDependencyCache
 from yt.funcs import \
     mylog, \
     set_intersection, \
@@ -63,6 +65,8 @@ from yt.data_objects.data_containers import \
     data_object_registry
 from yt.utilities.minimal_representation import \
     MinimalDataset
+from yt.utilities.point_sampling import \
+    PointSampler
 from yt.units.yt_array import \
     YTArray, \
     YTQuantity
@@ -550,6 +554,8 @@ class Dataset(object):
         self.derived_field_list = []
         self.filtered_particle_types = []
         self.field_info = self._field_info_class(self, self.field_list)
+        self.field_info.dependency_cache = \
+            FieldDependencyCache.for_dataset(self)
         self.coordinates.setup_fields(self.field_info)
         self.field_info.setup_fluid_fields()
         for ptype in self.particle_types:
@@ -566,6 +572,8 @@ class Dataset(object):
         self.field_info.load_all_plugins()
         deps, unloaded = self.field_info.check_derived_fields()
         self.field_dependencies.update(deps)
+        if self.field_info.dependency_cache is not None:
+            self.field_info.dependency_cache.save()
         self.fields = FieldTypeContainer(self)
         self.index.field_list = sorted(self.field_list)
         self._last_freq = (None, None)
@@ -823,28 +831,37 @@ class Dataset(object):
         else:
             return ret
 
-    def find_field_values_at_points(self, fields, coords):
+    def find_field_values_at_points(self, fields, coords, method="nearest"):
         """
         Returns the values [field1, field2,...] of the fields at the given
         [(x1, y1, z2), (x2, y2, z2),...] points.  Returns a list of field
         values in the same order as the input *fields*.
 
+        For grid and octree datasets the points are sorted by the grid or io
+        chunk they are in, each of which is read once, and *method* may be
+        "nearest", "trilinear" or "cic"; see
+        :class:`~yt.utilities.point_sampling.PointSampler`.  Points outside
+        of the data get NaN.  Other datasets are sampled one point at a time
+        and only support "nearest".
         """
-        # If an optimized version exists on the Index object we'll use that
-        try:
-            return self.index._find_field_values_at_points(fields, coords)
-        except AttributeError:
-            pass
+        if PointSampler.supports(self):
+            values = PointSampler(self, method=method).sample(fields, coords)
+            if len(ensure_list(fields)) == 1:
+                return values[0]
+            return values
+        if method != "nearest":
+            raise RuntimeError("The %s method is only available for grid "
+                               "and octree datasets." % method)
 
         fields = ensure_list(fields)
         out = []
 
         # This may be slow because it creates a data object for each point
         for field_index, field in enumerate(fields):
-            funit = self._get_field_info[field].units
+            funit = self._get_field_info(field).units
             out.append(self.arr(np.empty((len(coords),)), funit))
             for coord_index, coord in enumerate(coords):
-                out[field_index][coord_index] = self.point(coord)[fields]
+                out[field_index][coord_index] = self.point(coord)[field]
         if len(fields) == 1:
             return out[0]
         else:
@@ -2,7 +2,9 @@ import numpy as np
 
 from yt import \
     load
-from yt.frontends.stream.data_structures import load_particles
+from yt.frontends.stream.data_structures import \
+    load_particles, \
+    load_uniform_grid
 from yt.testing import \
     requires_file, \
     fake_random_ds, \
@@ -89,6 +91,30 @@ def test_smoothed_covering_grid():
                     assert_equal(f, g["density"])
 
 
+def test_ghost_zones_from_neighbors():
+    np.random.seed(0x4d3d3d3)
+    arr = np.random.random((32, 32, 32))
+    ds = load_uniform_grid({"density": arr}, arr.shape, nprocs=64)
+    field = ("stream", "density")
+    cache = ds.index.ghost_zone_cache
+    for smoothed in [True, False]:
+        for g in ds.index.grids:
+            si = g.get_global_startindex()
+            ei = si + g.ActiveDimensions
+            if np.any(si == 0) or np.any(ei == 32):
+                continue
+            gz = g.retrieve_ghost_zones(2, [field], smoothed=smoothed)
+            assert_equal(gz[field].d, arr[si[0]-2:ei[0]+2,
+                                          si[1]-2:ei[1]+2,
+                                          si[2]-2:ei[2]+2])
+            key = (g.id, field, 2, 0, gz._type_name)
+            assert_equal(cache.get(key), gz[field].d)
+            # The second time around the padded grid comes from the cache.
+            gz2 = g.retrieve_ghost_zones(2, [field], smoothed=smoothed)
+            assert_equal(gz2[field], gz[field])
+    ds.index.clear_all_data()
+    assert_equal(cache.nbytes, 0)
+
 def test_arbitrary_grid():
     for ncells in [32, 64]:
         for px in [0.125, 0.25, 0.55519]:
@@ -116,3 +116,28 @@ def test_sample_at_max_field_values():
 
             assert_equal(ad["temperature"][mi], temp)
             assert_equal(ad["velocity_x"][mi], vm)
+
+def test_query_batch():
+    for nprocs in [1, 8]:
+        ds = fake_random_ds(16, nprocs = nprocs, fields = ("density",
+                "velocity_x", "velocity_y", "velocity_z"))
+        for dobj in [ds.all_data(), ds.sphere("c", (0.25, 'unitary'))]:
+            with dobj.batch() as batch:
+                ex = batch.quantities.extrema("density")
+                avg = batch.quantities.weighted_average_quantity(
+                    "velocity_x", "cell_mass")
+                mass = batch.quantities["TotalMass"]()
+                prof = batch.profile("density", "velocity_x",
+                                     weight_field = "cell_mass")
+                prj = batch.proj("density", 2)
+            assert_equal(ex.value, dobj.quantities.extrema("density"))
+            assert_rel_equal(avg.value,
+                dobj.quantities.weighted_average_quantity(
+                    "velocity_x", "cell_mass"), 12)
+            assert_rel_equal(mass.value, dobj.quantities.total_mass(), 12)
+            p = dobj.profile("density", "velocity_x",
+                             weight_field = "cell_mass")
+            assert_equal(prof.value.x, p.x)
+            assert_rel_equal(prof.value["velocity_x"], p["velocity_x"], 12)
+            proj = ds.proj("density", 2, data_source = dobj)
+            assert_rel_equal(prj.value["density"], proj["density"], 12)
@@ -46,3 +46,41 @@ def test_cut_region():
         assert_equal(p2["density"].max() > 0.25, True)
         p2 = ds.proj("density", 2, data_source=cr, weight_field = "density")
         assert_equal(p2["density"].max() > 0.25, True)
+
+def test_cut_region_conditionals():
+    from yt.data_objects.cut_region_conditionals import \
+        CompiledCondition, FieldThreshold, parse_conditional
+    cond, = parse_conditional("obj['temperature'] < 1e3")
+    assert isinstance(cond, FieldThreshold)
+    assert_equal(cond.field, "temperature")
+    assert_equal(cond.may_pass(1e2, 1e4), True)
+    assert_equal(cond.may_pass(1e3, 1e4), False)
+    cond, = parse_conditional("1e3 < obj['gas', 'density']")
+    assert isinstance(cond, FieldThreshold)
+    assert_equal(cond.field, ("gas", "density"))
+    assert_equal(cond.may_pass(1, 1e4), True)
+    assert_equal(cond.may_pass(1, 1e2), False)
+    conds = parse_conditional(
+        "(obj['density'] > 0.5) & (np.abs(obj['velocity_x']) < 0.25)")
+    assert_equal(len(conds), 2)
+    assert isinstance(conds[0], FieldThreshold)
+    assert isinstance(conds[1], CompiledCondition)
+
+def test_cut_region_pruning():
+    ds = fake_random_ds(32, nprocs = 8,
+        fields = ("density", "temperature", "velocity_x"))
+    dd = ds.all_data()
+    t = (dd["x"] < 0.3) & (dd["density"] > 0.5)
+    cr = dd.cut_region(["obj['x'] < 0.3", "obj['density'] > 0.5"])
+    for i in range(2):
+        # The second time around, the grids lying entirely above x = 0.3 are
+        # skipped without being read.
+        ngrids = 0
+        total = 0.0
+        for chunk in cr.chunks([], "io"):
+            ngrids += len(chunk._current_chunk.objs)
+            total += chunk["density"].sum()
+        assert_almost_equal(total, dd["density"][t].sum())
+    assert_equal(ngrids < len(ds.index.grids), True)
+    cr = dd.cut_region(["obj['x'] < 0.3", "obj['density'] > 0.5"])
+    assert_equal(np.sort(cr["density"]), np.sort(dd["density"][t]))
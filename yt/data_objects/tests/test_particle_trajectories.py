@@ -1,8 +1,12 @@
 import glob
+import numpy as np
 import os
 
 from yt.config import ytcfg
+from yt.data_objects.particle_id_index import ParticleIDIndex
 from yt.data_objects.time_series import DatasetSeries
+from yt.frontends.stream.api import load_uniform_grid
+from yt.testing import assert_equal
 from yt.utilities.answer_testing.framework import \
     requires_ds, \
     GenericArrayTest
@@ -43,3 +47,51 @@ def test_etc_traj():
         def field_func(name):
             return traj[field]
         yield GenericArrayTest(ds, field_func, args=[field])
+
+def _particle_id_ds():
+    prng = np.random.RandomState(0x4d3d3d3)
+    n_p = 1000
+    # IDs in long runs, as they often are on disk, with gaps between them,
+    # and neighboring IDs mostly in the same grid
+    ids = np.concatenate([np.arange(0, 400), np.arange(500, 900),
+                          prng.permutation(np.arange(1000, 1200))])
+    data = {"density": np.ones((16, 16, 16)),
+            "number_of_particles": n_p,
+            "particle_index": ids}
+    for ax in "xyz":
+        data["particle_position_%s" % ax] = np.sort(prng.random_sample(n_p))
+        data["particle_velocity_%s" % ax] = prng.random_sample(n_p) - 0.5
+    return load_uniform_grid(data, (16, 16, 16), nprocs=8)
+
+def test_particle_id_index():
+    ds = _particle_id_ds()
+    dd = ds.all_data()
+    id_field = dd._determine_fields("particle_index")[0]
+    id_index = ParticleIDIndex(ds, id_field)
+    id_index.build()
+    assert id_index.run_ids.size < dd[id_field].size
+
+    all_ids = dd[id_field].d.astype("int64")
+    query = np.array([0, 399, 400, 450, 750, 1100, 1199, 5000, -1])
+    chunks, offsets = id_index.locate(query)
+    found = chunks > -1
+    assert_equal(found, np.in1d(query, all_ids))
+    fields = [id_field, dd._determine_fields("particle_position_x")[0]]
+    values = id_index.read(fields, chunks[found], offsets[found])
+    assert_equal(values[id_field], query[found])
+    ind = np.argsort(all_ids)
+    ind = ind[np.searchsorted(all_ids[ind], query[found])]
+    assert_equal(values[fields[1]], dd[fields[1]].d[ind])
+
+def test_particle_trajectories_id_index():
+    ds = _particle_id_ds()
+    indices = np.array([3, 420, 520, 899, 1000, 1150])
+    ts = DatasetSeries([ds])
+    t1 = ts.particle_trajectories(indices.copy(), fields=vfields,
+                                  suppress_logging=True)
+    t2 = ts.particle_trajectories(indices.copy(), fields=vfields,
+                                  suppress_logging=True, use_id_index=False)
+    for field in pfields + vfields:
+        assert_equal(t1[field], t2[field])
+    # the ID that is missing has no trajectory
+    assert np.isnan(t1["particle_position_x"][1, 0])
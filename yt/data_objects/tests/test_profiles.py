@@ -270,3 +270,25 @@ def test_particle_profile_negative_field():
                     'particle_position_z': False},
             weight_field=None, deposition='cic',
             accumulation=True, fractional=True)
+
+def test_profile_chunk_cache():
+    # Profiles binned from the chunks kept while finding the extrema, all or
+    # only some of them, match those read in separate passes.
+    from yt.config import ytcfg
+    ds = fake_random_ds(32, nprocs = 8, fields = _fields, units = _units)
+    dd = ds.all_data()
+    old = ytcfg.get("yt", "profile_cache_memory")
+    profiles = []
+    try:
+        for memory in ["0", "1024", "0.0001"]:
+            ytcfg["yt", "profile_cache_memory"] = memory
+            profiles.append(create_profile(
+                dd, ["density", "temperature"], ["dinosaurs", "tribbles"],
+                weight_field = "dinosaurs"))
+    finally:
+        ytcfg["yt", "profile_cache_memory"] = old
+    for p in profiles[1:]:
+        assert_equal(p.x_bins, profiles[0].x_bins)
+        assert_equal(p.y_bins, profiles[0].y_bins)
+        for field in ["dinosaurs", "tribbles"]:
+            assert_rel_equal(p[field], profiles[0][field], 12)
@@ -5,7 +5,9 @@ from yt.testing import \
     assert_rel_equal, \
     fake_amr_ds
 from yt.units.unit_object import Unit
+from yt.config import ytcfg
 import os
+import shutil
 import tempfile
 
 LENGTH_UNIT = 2.0
@@ -120,3 +122,47 @@ def test_max_level():
 
     proj = ds.proj('Density', 2, method='mip')
     assert proj['grid_level'].max() == ds.index.max_level
+
+def test_threaded_projection():
+    ds = fake_amr_ds(fields=["Density"])
+    for method in ["integrate", "mip"]:
+        for weight_field in [None, "Density"]:
+            if method == "mip" and weight_field is not None:
+                continue
+            p1 = ds.proj("Density", 2, weight_field=weight_field,
+                         method=method)
+            p4 = ds.proj("Density", 2, weight_field=weight_field,
+                         method=method, num_threads=4)
+            for field in ["px", "py", "pdx", "pdy"]:
+                assert_equal(p1[field], p4[field])
+            assert_rel_equal(p1["Density"], p4["Density"], 12)
+
+def test_projection_store():
+    tmpdir = tempfile.mkdtemp()
+    old_dir = ytcfg.get("yt", "projection_cache_dir")
+    old_flag = ytcfg.get("yt", "projection_cache")
+    ytcfg["yt", "projection_cache_dir"] = tmpdir
+    try:
+        ds = fake_amr_ds(fields=["Density", "Temperature"])
+        ytcfg["yt", "projection_cache"] = "False"
+        expected = ds.proj(["Density", "Temperature"], 1,
+                           weight_field="Density")
+        ytcfg["yt", "projection_cache"] = "True"
+        p1 = ds.proj("Density", 1, weight_field="Density")
+        assert_equal(len(os.listdir(tmpdir)), 1)
+        # This one is read back from the store without projecting anything
+        p2 = ds.proj("Density", 1, weight_field="Density")
+        assert "tree" not in p2.__dict__
+        # and this one reuses the stored tree for the new field
+        p3 = ds.proj(["Density", "Temperature"], 1, weight_field="Density")
+        for p in [p1, p2, p3]:
+            for field in ["px", "py", "pdx", "pdy", "Density"]:
+                assert_equal(p[field], expected[field])
+        assert_rel_equal(p3["Temperature"], expected["Temperature"], 12)
+        # A different weight is a different projection
+        p4 = ds.proj("Density", 1)
+        assert "tree" in p4.__dict__
+    finally:
+        ytcfg["yt", "projection_cache_dir"] = old_dir
+        ytcfg["yt", "projection_cache"] = old_flag
+        shutil.rmtree(tmpdir)
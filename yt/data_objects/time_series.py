@@ -401,7 +401,8 @@ class DatasetSeries(object):
         self._dataset_cls = ds.__class__
         return ds
 
-    def particle_trajectories(self, indices, fields=None, suppress_logging=False):
+    def particle_trajectories(self, indices, fields=None, suppress_logging=False,
+                              use_id_index=True):
         r"""Create a collection of particle trajectories in time over a series of
         datasets.
 
@@ -418,6 +419,10 @@ class DatasetSeries(object):
         suppress_logging : boolean
             Suppress yt's logging when iterating over the simulation time
             series. Default: False
+        use_id_index : boolean
+            Find the particles in each dataset with a particle ID index, so
+            that their fields are only read from the chunks they are in.
+            Default: True
 
         Examples
         --------
@@ -434,7 +439,8 @@ class DatasetSeries(object):
         >>> for t in trajs :
         >>>     print t["particle_velocity_x"].max(), t["particle_velocity_x"].min()
         """
-        return ParticleTrajectories(self, indices, fields=fields, suppress_logging=suppress_logging)
+        return ParticleTrajectories(self, indices, fields=fields, suppress_logging=suppress_logging,
+                                    use_id_index=use_id_index)
 
 class TimeSeriesQuantitiesContainer(object):
     def __init__(self, data_object, quantities):
@@ -0,0 +1,212 @@
+"""
+A persistent cache of the dependencies found for derived fields.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import hashlib
+import os
+import re
+
+from yt.config import ytcfg, CONFIG_DIR
+from yt.extern.six.moves import cPickle
+from yt.funcs import mylog
+
+# Bump this whenever the format of the entries changes.
+_cache_version = 1
+
+# Caches that have been read or built in this session, keyed like the files.
+_loaded_caches = {}
+
+class CachedFieldDependencies(object):
+    """
+    This stands in for the FieldDetector of a derived field whose
+    dependencies were read back from the cache, with the same requested
+    fields and parameters.
+    """
+    def __init__(self, requested, requested_parameters):
+        self.requested = set(requested)
+        self.requested_parameters = list(requested_parameters)
+
+def _code_parts(code):
+    # The bytecode, names and constants of a code object, including those of
+    # the functions and lambdas defined inside it.  The constants hold the
+    # names of the fields that a function reads.
+    parts = [hashlib.md5(code.co_code).hexdigest()]
+    parts.extend(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            parts.extend(_code_parts(const))
+        else:
+            parts.append(repr(const))
+    return parts
+
+def _value_parts(value):
+    # Functions are identified by where they are defined and their code, as
+    # their reprs hold their addresses.
+    if hasattr(value, "__code__"):
+        return [getattr(value, "__module__", ""),
+                getattr(value, "__name__", "")] + _code_parts(value.__code__)
+    return [repr(value)]
+
+# Reprs holding an address, such as those of plain objects, differ from one
+# session to the next.
+_address = re.compile(r" at 0x[0-9a-fA-F]+")
+
+def is_cacheable(finfo):
+    """
+    Whether the dependencies of a derived field may be cached.  Only fields
+    whose functions belong to the yt module or one of its submodules are;
+    fields added by users in a session can change from one run to the next.
+    """
+    module = getattr(finfo._function, "__module__", None) or ""
+    return module == "yt" or module.startswith("yt.")
+
+def field_fingerprint(finfo):
+    """
+    Identify the function of a derived field by its name, bytecode,
+    constants, defaults and closure, so that a cache entry is not used once
+    the function has been changed.  Returns None if the function refers to
+    values that cannot be identified across sessions.
+    """
+    func = finfo._function
+    code = getattr(func, "__code__", None)
+    parts = [getattr(func, "__module__", ""),
+             getattr(func, "__name__", type(func).__name__)]
+    if code is not None:
+        parts.extend(_code_parts(code))
+        for value in getattr(func, "__defaults__", None) or ():
+            parts.extend(_value_parts(value))
+        for cell in getattr(func, "__closure__", None) or ():
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                # an empty cell
+                value = None
+            parts.extend(_value_parts(value))
+    elif hasattr(func, "__dict__"):
+        # Callable objects, such as TranslationFunc, are identified by what
+        # they were created with.
+        parts.extend("%s=%s" % kv for kv in sorted(vars(func).items()))
+    fingerprint = "|".join(str(p) for p in parts)
+    if _address.search(fingerprint) is not None:
+        return None
+    return fingerprint
+
+def _cache_key(ds):
+    from yt import __version__
+    from .field_plugin_registry import field_plugins
+    from .local_fields import local_fields
+    plugin_file = None
+    if ytcfg.getboolean("yt", "loadfieldplugins"):
+        fn = os.path.join(CONFIG_DIR, ytcfg.get("yt", "pluginfilename"))
+        if os.path.isfile(fn):
+            plugin_file = (fn, os.stat(fn).st_mtime)
+    key = (_cache_version, __version__,
+           type(ds).__module__, type(ds).__name__,
+           ds._field_info_class.__name__,
+           getattr(ds, "geometry", None), getattr(ds, "dimensionality", None),
+           getattr(ds, "cosmological_simulation", None),
+           str(getattr(ds, "unit_system", None)),
+           sorted(ds.field_list),
+           sorted(ds.particle_types), sorted(ds.particle_types_raw),
+           sorted(field_plugins), sorted(local_fields.keys()), plugin_file)
+    return hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+class FieldDependencyCache(object):
+    """
+    The dependencies of the derived fields of one kind of dataset.  It is
+    keyed by the frontend, the on-disk fields, the particle types, the unit
+    system and the field plugins, so that every dataset sharing these can
+    skip detecting them.  Entries are kept for the session and, if the
+    ``cache_field_dependencies`` option is on, written to
+    ``field_dependency_cache_dir``.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.entries = {}
+        self._dirty = False
+
+    @classmethod
+    def for_dataset(cls, ds):
+        """
+        Return the cache for *ds*, or None if caching is turned off.
+        """
+        if not ytcfg.getboolean("yt", "cache_field_dependencies"):
+            return None
+        key = _cache_key(ds)
+        if key not in _loaded_caches:
+            cache = cls(key)
+            cache._load()
+            _loaded_caches[key] = cache
+        return _loaded_caches[key]
+
+    @property
+    def filename(self):
+        cache_dir = ytcfg.get("yt", "field_dependency_cache_dir")
+        if not cache_dir:
+            cache_dir = os.path.join(CONFIG_DIR, "field_dependencies")
+        return os.path.join(cache_dir, "%s.pkl" % self.key)
+
+    def get(self, field, fingerprint):
+        """
+        Return the dependencies recorded for *field*, None if its detection
+        raised an error, or raise KeyError if there is no valid entry.
+        """
+        entry = self.entries[field]
+        if entry[0] != fingerprint:
+            raise KeyError(field)
+        if entry[1] is None:
+            return None
+        return CachedFieldDependencies(*entry[1])
+
+    def set(self, field, fingerprint, fd):
+        if fd is None:
+            deps = None
+        else:
+            deps = (list(fd.requested), list(fd.requested_parameters))
+        self.entries[field] = (fingerprint, deps)
+        self._dirty = True
+
+    def _load(self):
+        fn = self.filename
+        if not os.path.exists(fn):
+            return
+        try:
+            with open(fn, "rb") as f:
+                self.entries = cPickle.load(f)
+        except Exception as e:
+            mylog.debug("Could not read field dependency cache %s (%s)",
+                        fn, e)
+            self.entries = {}
+
+    def save(self):
+        """
+        Write the cache out if anything has been added to it.
+        """
+        if not self._dirty:
+            return
+        fn = self.filename
+        # Write to a file of our own and then move it into place, so that
+        # several processes saving at once do not trip over each other.
+        tmp = "%s.%s" % (fn, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(fn)):
+                os.makedirs(os.path.dirname(fn))
+            with open(tmp, "wb") as f:
+                cPickle.dump(self.entries, f, protocol=2)
+            os.rename(tmp, fn)
+        except (IOError, OSError) as e:
+            mylog.debug("Could not write field dependency cache %s (%s)",
+                        fn, e)
+            return
+        self._dirty = False
@@ -28,6 +28,9 @@ from .derived_field import \
     TranslationFunc
 from yt.utilities.exceptions import \
     YTFieldNotFound
+from .field_dependency_cache import \
+    field_fingerprint, \
+    is_cacheable
 from .field_plugin_registry import \
     field_plugins
 from .particle_fields import \
@@ -55,6 +58,7 @@ class FieldInfoContainer(dict):
 
     """
     fallback = None
+    dependency_cache = None
     known_other_fields = ()
     known_particle_fields = ()
     extra_union_fields = ()
@@ -358,22 +362,38 @@ class FieldInfoContainer(dict):
         deps = {}
         unavailable = []
         fields_to_check = fields_to_check or list(self.keys())
+        cache = self.dependency_cache
+        if hasattr(self.ds, '_field_test_dataset'):
+            cache = None
         for field in fields_to_check:
             mylog.debug("Checking %s", field)
             if field not in self: raise RuntimeError
             fi = self[field]
+            use_cache = cache is not None and \
+                field not in self._show_field_errors and is_cacheable(fi)
+            if use_cache:
+                fingerprint = field_fingerprint(fi)
+                use_cache = fingerprint is not None
             try:
-                fd = fi.get_dependencies(ds = self.ds)
-            except Exception as e:
-                if field in self._show_field_errors:
-                    raise
-                if type(e) != YTFieldNotFound:
-                    # if we're doing field tests, raise an error
-                    # see yt.fields.tests.test_fields
-                    if hasattr(self.ds, '_field_test_dataset'):
+                if not use_cache: raise KeyError(field)
+                fd = cache.get(field, fingerprint)
+            except KeyError:
+                try:
+                    fd = fi.get_dependencies(ds = self.ds)
+                except Exception as e:
+                    if field in self._show_field_errors:
                         raise
-                    mylog.debug("Raises %s during field %s detection.",
-                                str(type(e)), field)
+                    if type(e) != YTFieldNotFound:
+                        # if we're doing field tests, raise an error
+                        # see yt.fields.tests.test_fields
+                        if hasattr(self.ds, '_field_test_dataset'):
+                            raise
+                        mylog.debug("Raises %s during field %s detection.",
+                                    str(type(e)), field)
+                    fd = None
+                if use_cache:
+                    cache.set(field, fingerprint, fd)
+            if fd is None:
                 self.pop(field)
                 continue
             # This next bit checks that we can't somehow generate everything.
@@ -827,6 +827,13 @@ def add_volume_weighted_smoothed_field(ptype, coord_name, mass_name,
         rv /= hsml.uq**3 / hsml.uq.in_base(unit_system.name).uq**3
         rv = data.apply_units(rv, field_units)
         return rv
+    # The particle fields this is smoothed from, so that images of it can be
+    # made from the particles themselves.
+    if smoothing_length_name is not None:
+        _vol_weight.smoothed_from = dict(
+            ptype=ptype, position=coord_name, mass=mass_name,
+            smoothing_length=smoothing_length_name, density=density_name,
+            field=smoothed_field, kernel_name=kernel_name)
     registry.add_field(field_name, sampling_type="cell", function = _vol_weight,
                        validators = [ValidateSpatial(0)],
                        units = field_units)
@@ -0,0 +1,109 @@
+"""
+Tests for the cache of derived field dependencies.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import shutil
+import tempfile
+
+from yt.config import ytcfg
+from yt.fields import field_dependency_cache
+from yt.fields.field_dependency_cache import \
+    field_fingerprint, \
+    is_cacheable
+from yt.testing import \
+    assert_equal, \
+    fake_random_ds
+
+def _dependencies(ds):
+    return dict((field, (sorted(fd.requested),
+                         sorted(fd.requested_parameters)))
+                for field, fd in ds.field_dependencies.items())
+
+def test_cached_dependencies():
+    tmpdir = tempfile.mkdtemp()
+    old_dir = ytcfg.get("yt", "field_dependency_cache_dir")
+    old_flag = ytcfg.get("yt", "cache_field_dependencies")
+    ytcfg["yt", "field_dependency_cache_dir"] = tmpdir
+    try:
+        ytcfg["yt", "cache_field_dependencies"] = "False"
+        ds = fake_random_ds(16)
+        ds.index
+        expected = _dependencies(ds)
+        expected_fields = sorted(ds.derived_field_list)
+
+        ytcfg["yt", "cache_field_dependencies"] = "True"
+        for i in range(2):
+            # The second pass reads the cache back from disk.
+            field_dependency_cache._loaded_caches.clear()
+            ds = fake_random_ds(16)
+            ds.index
+            assert_equal(_dependencies(ds), expected)
+            assert_equal(sorted(ds.derived_field_list), expected_fields)
+    finally:
+        ytcfg["yt", "field_dependency_cache_dir"] = old_dir
+        ytcfg["yt", "cache_field_dependencies"] = old_flag
+        field_dependency_cache._loaded_caches.clear()
+        shutil.rmtree(tmpdir)
+
+def test_field_fingerprint():
+    class FakeFieldInfo(object):
+        def __init__(self, function):
+            self._function = function
+    def _a(field, data):
+        return data["density"]
+    def _b(field, data):
+        return data["temperature"]
+    assert_equal(field_fingerprint(FakeFieldInfo(_a)),
+                 field_fingerprint(FakeFieldInfo(_a)))
+    assert field_fingerprint(FakeFieldInfo(_a)) != \
+        field_fingerprint(FakeFieldInfo(_b))
+
+def test_field_fingerprint_constants():
+    class FakeFieldInfo(object):
+        def __init__(self, function):
+            self._function = function
+    # The same bytecode and names, reading different fields
+    _a = lambda field, data: data["density"]
+    _b = lambda field, data: data["temperature"]
+    assert field_fingerprint(FakeFieldInfo(_a)) != \
+        field_fingerprint(FakeFieldInfo(_b))
+    # Functions that differ only in the field their closure reads
+    def _make(fname):
+        def _func(field, data):
+            return data[fname]
+        return _func
+    assert_equal(field_fingerprint(FakeFieldInfo(_make("density"))),
+                 field_fingerprint(FakeFieldInfo(_make("density"))))
+    assert field_fingerprint(FakeFieldInfo(_make("density"))) != \
+        field_fingerprint(FakeFieldInfo(_make("temperature")))
+    # Fields defined outside of yt are not cached
+    _a.__module__ = "__main__"
+    assert not is_cacheable(FakeFieldInfo(_a))
+
+def test_field_fingerprint_addresses():
+    class FakeFieldInfo(object):
+        def __init__(self, function):
+            self._function = function
+    def _make(value):
+        def _func(field, data):
+            return data["density"] * value
+        return _func
+    # Functions are identified by their code rather than their repr
+    def _scale(x):
+        return 2 * x
+    fingerprint = field_fingerprint(FakeFieldInfo(_make(_scale)))
+    assert fingerprint is not None
+    assert "0x" not in fingerprint
+    # Objects whose repr holds their address are not identified at all
+    assert field_fingerprint(FakeFieldInfo(_make(object()))) is None
@@ -14,6 +14,7 @@ Data structures for Enzo
 #-----------------------------------------------------------------------------
 
 from yt.utilities.on_demand_imports import _h5py as h5py
+import hashlib
 import weakref
 import numpy as np
 import os
@@ -21,17 +22,19 @@ import stat
 import string
 import time
 import re
+import zipfile
 
 from collections import defaultdict
 from yt.extern.six.moves import zip as izip
 
+from yt.config import ytcfg
 from yt.funcs import \
     ensure_list, \
     ensure_tuple, \
-    get_pbar, \
     setdefaultattr
 from yt.data_objects.grid_patch import \
-    AMRGridPatch
+    AMRGridPatch, \
+    RECONSTRUCT_INDEX
 from yt.geometry.grid_geometry_handler import \
     GridIndex
 from yt.geometry.geometry_handler import \
@@ -160,6 +163,52 @@ class EnzoGridGZ(EnzoGrid):
                 cube.field_data[field] = np.multiply(temp, conv_factor, temp)[sl]
         return cube
 
+def _token_lines(text, token):
+    # The values of every "token = value" line of a hierarchy file, and the
+    # offsets in the text at which they are.  Every line of the text is
+    # expected to start with a newline.
+    pattern = re.compile(r"\n%s[ \t]*=[ \t]*([^\n]*)" % token)
+    values, offsets = [], []
+    for m in pattern.finditer(text):
+        values.append(m.group(1))
+        offsets.append(m.start())
+    return values, np.array(offsets, dtype="int64")
+
+def _token_array(values, n, dtype):
+    # The values of a token every grid has, as an (n, rank) array
+    if len(values) != n:
+        raise RuntimeError("Found %s of %s grids in the hierarchy file." %
+                           (len(values), n))
+    arr = np.array(" ".join(values).split(), dtype=dtype)
+    return arr.reshape(n, -1)
+
+def _pointer_tree(n, grid, kind, target):
+    # The index of the parent of every grid, or -1, and its level, from the
+    # NextGridNextLevel and NextGridThisLevel pointers of the hierarchy (all
+    # indices 0-based, with a target of -1 for no grid).
+    keep = target > -1
+    grid, kind, target = grid[keep], kind[keep], target[keep]
+    parent = np.zeros(n, dtype="int64") - 1
+    down = kind == "Next"
+    parent[target[down]] = grid[down]
+    # The grids of a level under each parent are chained together, and all
+    # of them have the parent of the first; we find it by pointer jumping.
+    first = np.arange(n, dtype="int64")
+    first[target[~down]] = grid[~down]
+    while True:
+        new_first = first[first]
+        if (new_first == first).all():
+            break
+        first = new_first
+    parent = parent[first]
+    level = np.zeros(n, dtype="int64")
+    while True:
+        new_level = np.where(parent > -1, level[parent] + 1, 0)
+        if (new_level == level).all():
+            break
+        level = new_level
+    return parent, level
+
 class EnzoHierarchy(GridIndex):
 
     _strip_path = False
@@ -234,19 +283,7 @@ class EnzoHierarchy(GridIndex):
         else:
             raise NotImplementedError
 
-    # Sets are sorted, so that won't work!
     def _parse_index(self):
-        def _next_token_line(token, f):
-            for line in f:
-                if line.startswith(token):
-                    return line.split()[2:]
-        pattern = r"Pointer: Grid\[(\d*)\]->NextGrid(Next|This)Level = (\d*)\s+$"
-        patt = re.compile(pattern)
-        f = open(self.index_filename, "rt")
-        self.grids = [self.grid(1, self)]
-        self.grids[0].Level = 0
-        si, ei, LE, RE, fn, npart = [], [], [], [], [], []
-        pbar = get_pbar("Parsing Hierarchy ", self.num_grids)
         version = self.dataset.parameters.get("VersionNumber", None)
         params = self.dataset.parameters
         if version is None and "Internal" in params:
@@ -264,39 +301,153 @@ class EnzoHierarchy(GridIndex):
             else:
                 nap = None
                 active_particles = False
-        for grid_id in range(self.num_grids):
-            pbar.update(grid_id)
-            # We will unroll this list
-            si.append(_next_token_line("GridStartIndex", f))
-            ei.append(_next_token_line("GridEndIndex", f))
-            LE.append(_next_token_line("GridLeftEdge", f))
-            RE.append(_next_token_line("GridRightEdge", f))
-            nb = int(_next_token_line("NumberOfBaryonFields", f)[0])
-            fn.append([None])
-            if nb > 0: fn[-1] = _next_token_line("BaryonFileName", f)
-            npart.append(int(_next_token_line("NumberOfParticles", f)[0]))
-            # Below we find out what active particles exist in this grid,
-            # and add their counts individually.
-            if active_particles:
-                ptypes = _next_token_line("PresentParticleTypes", f)
-                counts = [int(c) for c in _next_token_line("ParticleTypeCounts", f)]
+        hierarchy = self._load_hierarchy_cache()
+        if hierarchy is None:
+            hierarchy = self._read_hierarchy(active_particles)
+            self._save_hierarchy_cache(hierarchy)
+        if active_particles:
+            for ptype in self.parameters.get("AppendActiveParticleType", []):
+                nap[ptype] = hierarchy["active_particle_count_%s" % ptype]
+        self._fill_arrays(hierarchy["end_index"], hierarchy["start_index"],
+                          hierarchy["left_edge"], hierarchy["right_edge"],
+                          hierarchy["particle_count"], nap)
+        self.grid_levels[:, 0] = hierarchy["level"]
+        self._parent_index = hierarchy["parent"]
+        self.filenames = hierarchy["filename"]
+
+    def _read_hierarchy(self, active_particles):
+        """
+        Parse the hierarchy file, a whole token at a time, into a dict of
+        arrays of the start and end index, edges, particle count, parent,
+        level and file name of every grid.
+        """
+        mylog.info("Parsing the hierarchy of %s grids", self.num_grids)
+        n = self.num_grids
+        with open(self.index_filename, "rt") as f:
+            text = "\n" + f.read()
+        hierarchy = {}
+        for key, token, dtype in [("start_index", "GridStartIndex", "int64"),
+                                  ("end_index", "GridEndIndex", "int64"),
+                                  ("left_edge", "GridLeftEdge", "float64"),
+                                  ("right_edge", "GridRightEdge", "float64")]:
+            values, _ = _token_lines(text, token)
+            hierarchy[key] = _token_array(values, n, dtype)
+        values, _ = _token_lines(text, "NumberOfBaryonFields")
+        nb = _token_array(values, n, "int64")[:, 0]
+        values, _ = _token_lines(text, "NumberOfParticles")
+        npart = _token_array(values, n, "int64")[:, 0]
+        hierarchy["particle_count"] = npart
+        # The remaining tokens are not written for every grid, so we find
+        # the grid each of them belongs to from where it is in the file.
+        starts = _token_lines(text, "Grid")[1]
+        if starts.size != n:
+            raise RuntimeError("Found %s of %s grids in the hierarchy file." %
+                               (starts.size, n))
+        def _owners(offsets):
+            return np.searchsorted(starts, offsets, side="right") - 1
+        filenames = np.empty(n, dtype="object")
+        # Grids without baryon fields keep their particles in the file named
+        # by ParticleFileName.
+        for token, has_file in [("ParticleFileName", (nb == 0) & (npart > 0)),
+                                ("BaryonFileName", nb > 0)]:
+            values, offsets = _token_lines(text, token)
+            owners = _owners(offsets)
+            for owner, value in zip(owners, values):
+                if has_file[owner]:
+                    filenames[owner] = value.split()[0]
+        hierarchy["filename"] = filenames
+        if active_particles:
+            ptypes, offsets = _token_lines(text, "PresentParticleTypes")
+            counts, _ = _token_lines(text, "ParticleTypeCounts")
+            owners = _owners(offsets)
+            for ptype in self.parameters.get("AppendActiveParticleType", []):
+                hierarchy["active_particle_count_%s" % ptype] = \
+                    np.zeros(n, dtype="int64")
+            for owner, gtypes, gcounts in zip(owners, ptypes, counts):
+                gtypes = gtypes.split()
+                gcounts = gcounts.split()
                 for ptype in self.parameters.get("AppendActiveParticleType", []):
-                    if ptype in ptypes:
-                        nap[ptype].append(counts[ptypes.index(ptype)])
-                    else:
-                        nap[ptype].append(0)
-            if nb == 0 and npart[-1] > 0: fn[-1] = _next_token_line("ParticleFileName", f)
-            for line in f:
-                if len(line) < 2: break
-                if line.startswith("Pointer:"):
-                    vv = patt.findall(line)[0]
-                    self.__pointer_handler(vv)
-        pbar.finish()
-        self._fill_arrays(ei, si, LE, RE, npart, nap)
-        temp_grids = np.empty(self.num_grids, dtype='object')
-        temp_grids[:] = self.grids
-        self.grids = temp_grids
-        self.filenames = fn
+                    if ptype in gtypes:
+                        hierarchy["active_particle_count_%s" % ptype][owner] = \
+                            int(gcounts[gtypes.index(ptype)])
+        pattern = r"\nPointer: Grid\[(\d*)\]->NextGrid(Next|This)Level = (\d*)"
+        pointers = re.findall(pattern, text)
+        del text
+        if len(pointers) > 0:
+            pointers = np.array(pointers)
+            grid = pointers[:, 0].astype("int64") - 1
+            target = pointers[:, 2].astype("int64") - 1
+            kind = pointers[:, 1]
+        else:
+            grid = target = np.empty(0, dtype="int64")
+            kind = np.empty(0, dtype="str")
+        hierarchy["parent"], hierarchy["level"] = \
+            _pointer_tree(n, grid, kind, target)
+        return hierarchy
+
+    _hierarchy_cache_version = 1
+
+    @property
+    def hierarchy_cache_filename(self):
+        """
+        The file the parsed hierarchy is cached in, next to the output
+        itself.  This is None if caching is turned off.
+        """
+        if not ytcfg.getboolean("yt", "cache_enzo_hierarchy"):
+            return None
+        return "%s.yt_hierarchy.npz" % self.dataset.parameter_filename
+
+    def _hierarchy_cache_key(self):
+        # The hierarchy file is written once along with the rest of the
+        # output, so its size and modification time tell us whether it has
+        # changed.
+        st = os.stat(self.index_filename)
+        key = (self._hierarchy_cache_version, self.num_grids,
+               st.st_size, int(st.st_mtime),
+               list(self.parameters.get("AppendActiveParticleType", [])))
+        return hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+    def _load_hierarchy_cache(self):
+        """
+        Read the parsed hierarchy back from the cache file, returning None
+        if it does not exist or is stale.
+        """
+        fn = self.hierarchy_cache_filename
+        if fn is None or not os.path.exists(fn):
+            return None
+        try:
+            with np.load(fn) as f:
+                hierarchy = dict((k, f[k]) for k in f.files)
+        except (IOError, ValueError, zipfile.BadZipfile) as e:
+            mylog.info("Could not read hierarchy cache %s (%s), ignoring it.",
+                       fn, e)
+            return None
+        if str(hierarchy.pop("key", None)) != self._hierarchy_cache_key():
+            mylog.info("Hierarchy cache %s is out of date, ignoring it.", fn)
+            return None
+        filenames = np.empty(self.num_grids, dtype="object")
+        has_file = hierarchy.pop("has_filename")
+        filenames[has_file] = [str(f) for f in hierarchy["filename"][has_file]]
+        hierarchy["filename"] = filenames
+        mylog.debug("Read the hierarchy from %s", fn)
+        return hierarchy
+
+    def _save_hierarchy_cache(self, hierarchy):
+        fn = self.hierarchy_cache_filename
+        if fn is None or self.comm.rank not in (0, None):
+            return
+        arrays = dict(hierarchy)
+        arrays["key"] = np.array(self._hierarchy_cache_key())
+        has_file = np.array([f is not None for f in hierarchy["filename"]],
+                            dtype="bool")
+        arrays["has_filename"] = has_file
+        arrays["filename"] = np.array(
+            [f if f is not None else "" for f in hierarchy["filename"]],
+            dtype="str")
+        try:
+            np.savez(fn, **arrays)
+        except (IOError, OSError) as e:
+            mylog.info("Could not write hierarchy cache %s (%s).", fn, e)
 
     def _initialize_grid_arrays(self):
         super(EnzoHierarchy, self)._initialize_grid_arrays()
@@ -317,26 +468,6 @@ class EnzoHierarchy(GridIndex):
             for ptype in nap:
                 self.grid_active_particle_count[ptype].flat[:] = nap[ptype]
 
-    def __pointer_handler(self, m):
-        sgi = int(m[2])-1
-        if sgi == -1: return # if it's 0, then we're done with that lineage
-        # Okay, so, we have a pointer.  We make a new grid, with an id of the length+1
-        # (recall, Enzo grids are 1-indexed)
-        self.grids.append(self.grid(len(self.grids)+1, self))
-        # We'll just go ahead and make a weakref to cache
-        second_grid = self.grids[sgi] # zero-indexed already
-        first_grid = self.grids[int(m[0])-1]
-        if m[1] == "Next":
-            first_grid._children_ids.append(second_grid.id)
-            second_grid._parent_id = first_grid.id
-            second_grid.Level = first_grid.Level + 1
-        elif m[1] == "This":
-            if first_grid.Parent is not None:
-                first_grid.Parent._children_ids.append(second_grid.id)
-                second_grid._parent_id = first_grid._parent_id
-            second_grid.Level = first_grid.Level
-        self.grid_levels[sgi] = second_grid.Level
-
     def _rebuild_top_grids(self, level = 0):
         mylog.info("Rebuilding grids on level %s", level)
         cmask = (self.grid_levels.flat == (level + 1))
@@ -357,12 +488,84 @@ class EnzoHierarchy(GridIndex):
         mylog.info("Finished rebuilding")
 
     def _populate_grid_objects(self):
-        for g,f in izip(self.grids, self.filenames):
-            g._prepare_grid()
-            g._setup_dx()
-            g.set_filename(f[0])
-        del self.filenames # No longer needed.
+        # Rather than having each grid copy its edges from the index and work
+        # out its cell widths, we do it for all the grids of a level at once.
+        # The grid objects themselves are only made once they are asked for.
+        n = self.num_grids
+        levels = self.grid_levels[:, 0]
+        parent = self._parent_index
+        LE = self.grid_left_edge.d
+        RE = self.grid_right_edge.d
+        dds = np.empty((n, 3), dtype="float64")
         self.max_level = self.grid_levels.max()
+        for level in range(self.max_level + 1):
+            ind = np.where(levels == level)[0]
+            if level == 0:
+                dds[ind] = (RE[ind] - LE[ind]) / self.grid_dimensions[ind]
+                continue
+            p = parent[ind]
+            pdds = dds[p]
+            if RECONSTRUCT_INDEX:
+                # clamp grid edges to an integer multiple of the parent cell
+                # width
+                for edge in (LE, RE):
+                    edge[ind] = np.rint((edge[ind] - edge[p]) / pdds) * \
+                      pdds + edge[p]
+            dds[ind] = pdds / self.ds.refine_by
+        if self.ds.dimensionality < 3:
+            dds[:, 2] = self.ds.domain_right_edge[2] - \
+              self.ds.domain_left_edge[2]
+        self._grid_dds = self.ds.arr(dds, self.grid_left_edge.units)
+        # The children of each grid, in order
+        order = np.argsort(parent, kind="mergesort")
+        counts = np.bincount(parent[parent > -1], minlength=n)
+        self._child_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._child_index = order[order.size - counts.sum():]
+
+    _grids = None
+
+    @property
+    def grids(self):
+        if self._grids is None:
+            mylog.debug("Creating %s grid objects", self.num_grids)
+            grids = np.empty(self.num_grids, dtype="object")
+            for i in range(self.num_grids):
+                grids[i] = self._make_grid(i)
+            self._grids = grids
+        return self._grids
+
+    @grids.setter
+    def grids(self, grids):
+        self._grids = grids
+
+    @grids.deleter
+    def grids(self):
+        self._grids = None
+
+    def _make_grid(self, i):
+        # The grid object of the grid at index i, set up from the arrays of
+        # the index
+        g = self.grid(i + 1, self)
+        g.Level = int(self.grid_levels[i, 0])
+        if self._parent_index[i] > -1:
+            g._parent_id = int(self._parent_index[i]) + 1
+        children = self._child_index[
+            self._child_offsets[i]:self._child_offsets[i + 1]]
+        g._children_ids = (children + 1).tolist()
+        g.ActiveDimensions = self.grid_dimensions[i]
+        g.LeftEdge = self.grid_left_edge[i]
+        g.RightEdge = self.grid_right_edge[i]
+        g.dds = self._grid_dds[i]
+        g.NumberOfParticles = self.grid_particle_count[i, 0]
+        g.set_filename(self.filenames[i])
+        return g
+
+    def _get_grid(self, i):
+        # The grid at index i, without making all the others if they have
+        # not been made yet
+        if self._grids is not None:
+            return self._grids[i]
+        return self._make_grid(i)
 
     def _detect_active_particle_fields(self):
         ap_list = self.dataset["AppendActiveParticleType"]
@@ -376,8 +579,7 @@ class EnzoHierarchy(GridIndex):
                 self.dataset.particle_types = new_ptypes
                 self.dataset.particle_types_raw = new_ptypes
                 continue
-            gs = self.grids[select_grids > 0]
-            g = gs[0]
+            g = self._get_grid(np.where(select_grids > 0)[0][0])
             handle = h5py.File(g.filename, "r")
             node = handle["/Grid%08i/Particles/" % g.id]
             for ptype in (str(p) for p in node):
@@ -443,7 +645,7 @@ class EnzoHierarchy(GridIndex):
     def _generate_random_grids(self):
         if self.num_grids > 40:
             starter = np.random.randint(0, 20)
-            random_sample = np.mgrid[starter:len(self.grids)-1:20j].astype("int32")
+            random_sample = np.mgrid[starter:self.num_grids-1:20j].astype("int32")
             # We also add in a bit to make sure that some of the grids have
             # particles
             gwp = self.grid_particle_count > 0
@@ -455,8 +657,8 @@ class EnzoHierarchy(GridIndex):
                 mylog.debug("Added additional grid %s", first_grid)
             mylog.debug("Checking grids: %s", random_sample.tolist())
         else:
-            random_sample = np.mgrid[0:max(len(self.grids),1)].astype("int32")
-        return self.grids[(random_sample,)]
+            random_sample = np.mgrid[0:max(self.num_grids,1)].astype("int32")
+        return [self._get_grid(i) for i in random_sample]
 
     def _get_particle_type_counts(self):
         try:
@@ -576,6 +778,14 @@ class EnzoHierarchyInMemory(EnzoHierarchy):
         EnzoHierarchy._initialize_grid_arrays(self)
         self.grid_procs = np.zeros((self.num_grids,1),'int32')
 
+    def _populate_grid_objects(self):
+        for g,f in izip(self.grids, self.filenames):
+            g._prepare_grid()
+            g._setup_dx()
+            g.set_filename(f[0])
+        del self.filenames # No longer needed.
+        self.max_level = self.grid_levels.max()
+
     def _copy_index_structure(self):
         # Dimensions are important!
         self.grid_dimensions[:] = self.enzo.hierarchy_information["GridEndIndices"][:]
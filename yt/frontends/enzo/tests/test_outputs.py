@@ -32,6 +32,7 @@ from yt.utilities.answer_testing.framework import \
 from yt.visualization.plot_window import \
     SlicePlot
 from yt.frontends.enzo.api import EnzoDataset
+from yt.frontends.enzo.data_structures import _pointer_tree
 from yt.frontends.enzo.fields import NODAL_FLAGS
 
 _fields = ("temperature", "density", "velocity_magnitude",
@@ -219,3 +220,44 @@ def test_deeply_nested_zoom():
     assert_allclose_units(c, c_actual)
 
     assert_equal(max([g['density'].max() for g in ds.index.grids]), v)
+
+def test_pointer_tree():
+    # Root grids 1 and 2, grids 3 and 4 inside grid 1 and grid 5 inside
+    # grid 3, as the pointers of a hierarchy file give them
+    grid = np.array([0, 0, 1, 1, 2, 2, 3, 3, 4, 4])
+    kind = np.array(["This", "Next"] * 5)
+    target = np.array([1, 2, -1, -1, 3, 4, -1, -1, -1, -1])
+    parent, level = _pointer_tree(5, grid, kind, target)
+    assert_equal(parent, [-1, -1, 0, 0, 2])
+    assert_equal(level, [0, 0, 1, 1, 2])
+
+@requires_file(enzotiny)
+def test_hierarchy_cache():
+    ds = data_dir_load(enzotiny)
+    index = ds.index
+    hierarchy = index._read_hierarchy(False)
+    index._save_hierarchy_cache(hierarchy)
+    cached = index._load_hierarchy_cache()
+    assert_equal(sorted(cached), sorted(hierarchy))
+    for key in hierarchy:
+        assert_equal(cached[key], hierarchy[key])
+    # The grids made from the arrays fit inside their parents
+    for g in index.grids:
+        assert_equal(g.Level, index.grid_levels[g.id - g._id_offset, 0])
+        for c in g.Children:
+            assert c.Parent is g
+            assert_equal(c.Level, g.Level + 1)
+            assert_array_equal(c.dds, g.dds / ds.refine_by)
+            assert (c.LeftEdge >= g.LeftEdge).all()
+            assert (c.RightEdge <= g.RightEdge).all()
+
+@requires_file(enzotiny)
+def test_lazy_grid_particles():
+    ds = data_dir_load(enzotiny)
+    index = ds.index
+    for g in index.grids:
+        assert_equal(g.NumberOfParticles,
+                     index.grid_particle_count[g.id - g._id_offset, 0])
+    ad = ds.all_data()
+    assert_equal(ad["all", "particle_mass"].size,
+                 index.grid_particle_count.sum())
@@ -246,6 +246,7 @@ class IOHandlerGadgetBinary(BaseIOHandler):
         # gadget format 1 original, 2 with block name
         self._format = gformat[0]
         self._endian = gformat[1]
+        self._float_type = ds._validate_header(ds.parameter_filename)[1]
         super(IOHandlerGadgetBinary, self).__init__(ds, *args, **kwargs)
 
     @property
@@ -16,12 +16,16 @@ from __future__ import print_function, absolute_import
 #-----------------------------------------------------------------------------
 
 import glob
+import hashlib
+import multiprocessing
 import os
 import numpy as np
 import stat
+import sys
 import weakref
-from io import BytesIO
+import zipfile
 
+from yt.config import ytcfg
 from yt.extern.six import string_types
 from yt.funcs import \
     mylog, \
@@ -47,26 +51,141 @@ from yt.arraytypes import blankRecordArray
 from yt.utilities.lib.cosmology_time import \
     friedman
 
+def _domain_basename(ds, domain_id):
+    num = os.path.basename(ds.parameter_filename).split("."
+            )[0].split("_")[1]
+    return "%s/%%s_%s.out%05i" % (
+        os.path.abspath(
+          os.path.dirname(ds.parameter_filename)),
+        num, domain_id)
+
+def _read_hydro_offsets(hydro_fn, domain_id, min_level):
+    """
+    Walk the level-by-level headers of a hydro file, returning the number of
+    hydro variables along with the offset and the number of octs of each
+    level's block belonging to *domain_id*.
+    """
+    f = open(hydro_fn, "rb")
+    hydro_header = ( ('ncpu', 1, 'i'),
+                     ('nvar', 1, 'i'),
+                     ('ndim', 1, 'i'),
+                     ('nlevelmax', 1, 'i'),
+                     ('nboundary', 1, 'i'),
+                     ('gamma', 1, 'd')
+                     )
+    hvals = fpu.read_attrs(f, hydro_header)
+    nvar = hvals['nvar']
+    # It goes: level, CPU, 8-variable
+    n_levels = hvals['nlevelmax'] - min_level
+    hydro_offset = np.zeros(n_levels, dtype='int64')
+    hydro_offset -= 1
+    level_count = np.zeros(n_levels, dtype='int64')
+    skipped = []
+    for level in range(hvals['nlevelmax']):
+        for cpu in range(hvals['nboundary'] + hvals['ncpu']):
+            header = ( ('file_ilevel', 1, 'I'),
+                       ('file_ncache', 1, 'I') )
+            try:
+                lvals = fpu.read_attrs(f, header, "=")
+            except AssertionError:
+                print("You are running with the wrong number of fields.")
+                print("If you specified these in the load command, check the array length.")
+                print("In this file there are %s hydro fields." % skipped)
+                #print"The last set of field sizes was: %s" % skipped
+                raise
+            if lvals['file_ncache'] == 0: continue
+            assert(lvals['file_ilevel'] == level+1)
+            if cpu + 1 == domain_id and level >= min_level:
+                hydro_offset[level - min_level] = f.tell()
+                level_count[level - min_level] = lvals['file_ncache']
+            skipped = fpu.skip(f, 8 * nvar)
+    f.close()
+    return nvar, hydro_offset, level_count
+
+def _read_particle_offsets(part_fn, extra_particle_fields):
+    """
+    Read the header of a particle file and find the offset of each particle
+    field's record.  Returns the header values and dicts of the offsets and
+    types of the fields, keyed by field tuple.
+    """
+    f = open(part_fn, "rb")
+    f.seek(0, os.SEEK_END)
+    flen = f.tell()
+    f.seek(0)
+    hvals = {}
+    attrs = ( ('ncpu', 1, 'I'),
+              ('ndim', 1, 'I'),
+              ('npart', 1, 'I') )
+    hvals.update(fpu.read_attrs(f, attrs))
+    fpu.read_vector(f, 'I')
+
+    attrs = ( ('nstar_tot', 1, 'I'),
+              ('mstar_tot', 1, 'd'),
+              ('mstar_lost', 1, 'd'),
+              ('nsink', 1, 'I') )
+    hvals.update(fpu.read_attrs(f, attrs))
+
+    particle_fields = [
+            ("particle_position_x", "d"),
+            ("particle_position_y", "d"),
+            ("particle_position_z", "d"),
+            ("particle_velocity_x", "d"),
+            ("particle_velocity_y", "d"),
+            ("particle_velocity_z", "d"),
+            ("particle_mass", "d"),
+            ("particle_identifier", "i"),
+            ("particle_refinement_level", "I")]
+    if hvals["nstar_tot"] > 0:
+        particle_fields += [("particle_age", "d"),
+                            ("particle_metallicity", "d")]
+    if extra_particle_fields is not None:
+        particle_fields += extra_particle_fields
+
+    field_offsets = {}
+    _pfields = {}
+    for field, vtype in particle_fields:
+        if f.tell() >= flen: break
+        field_offsets["io", field] = f.tell()
+        _pfields["io", field] = vtype
+        fpu.skip(f, 1)
+    f.close()
+    return hvals, field_offsets, _pfields
+
+def _read_domain_offsets(args):
+    """
+    Compute the hydro and particle offset tables of a single domain.  This
+    only takes picklable arguments so that it can be mapped over a process
+    pool.
+    """
+    domain_id, hydro_fn, part_fn, min_level, extra_particle_fields = args
+    offsets = {}
+    if os.path.exists(hydro_fn):
+        offsets["nvar"], offsets["hydro_offset"], offsets["level_count"] = \
+            _read_hydro_offsets(hydro_fn, domain_id, min_level)
+    if os.path.exists(part_fn):
+        offsets["particle_header"], offsets["particle_field_offsets"], \
+            offsets["particle_field_types"] = \
+            _read_particle_offsets(part_fn, extra_particle_fields)
+    return offsets
+
 class RAMSESDomainFile(object):
     _last_mask = None
     _last_selector_id = None
 
-    def __init__(self, ds, domain_id):
+    def __init__(self, ds, domain_id, offsets = None):
         self.ds = ds
         self.domain_id = domain_id
         self.nvar = 0 # Set this later!
 
-        num = os.path.basename(ds.parameter_filename).split("."
-                )[0].split("_")[1]
-        basename = "%s/%%s_%s.out%05i" % (
-            os.path.abspath(
-              os.path.dirname(ds.parameter_filename)),
-            num, domain_id)
+        basename = _domain_basename(ds, domain_id)
         for t in ['grav', 'hydro', 'part', 'amr']:
             setattr(self, "%s_fn" % t, basename % t)
         self._read_amr_header()
-        self._read_hydro_header()
-        self._read_particle_header()
+        if offsets is None:
+            self._read_hydro_header()
+            self._read_particle_header()
+        else:
+            self._set_offsets(offsets)
         self._read_amr()
 
     _hydro_offset = None
@@ -91,38 +210,28 @@ class RAMSESDomainFile(object):
     def hydro_offset(self):
         if self._hydro_offset is not None: return self._hydro_offset
         # We now have to open the file and calculate it
-        f = open(self.hydro_fn, "rb")
-        fpu.skip(f, 6)
-        # It goes: level, CPU, 8-variable
-        min_level = self.ds.min_level
-        n_levels = self.amr_header['nlevelmax'] - min_level
-        hydro_offset = np.zeros(n_levels, dtype='int64')
-        hydro_offset -= 1
-        level_count = np.zeros(n_levels, dtype='int64')
-        skipped = []
-        for level in range(self.amr_header['nlevelmax']):
-            for cpu in range(self.amr_header['nboundary'] +
-                             self.amr_header['ncpu']):
-                header = ( ('file_ilevel', 1, 'I'),
-                           ('file_ncache', 1, 'I') )
-                try:
-                    hvals = fpu.read_attrs(f, header, "=")
-                except AssertionError:
-                    print("You are running with the wrong number of fields.")
-                    print("If you specified these in the load command, check the array length.")
-                    print("In this file there are %s hydro fields." % skipped)
-                    #print"The last set of field sizes was: %s" % skipped
-                    raise
-                if hvals['file_ncache'] == 0: continue
-                assert(hvals['file_ilevel'] == level+1)
-                if cpu + 1 == self.domain_id and level >= min_level:
-                    hydro_offset[level - min_level] = f.tell()
-                    level_count[level - min_level] = hvals['file_ncache']
-                skipped = fpu.skip(f, 8 * self.nvar)
-        self._hydro_offset = hydro_offset
-        self._level_count = level_count
+        self.nvar, self._hydro_offset, self._level_count = \
+            _read_hydro_offsets(self.hydro_fn, self.domain_id,
+                                self.ds.min_level)
         return self._hydro_offset
 
+    def _set_offsets(self, offsets):
+        """
+        Fill in the hydro and particle offset tables from a dict as returned
+        by _read_domain_offsets, rather than reading the headers.
+        """
+        if "nvar" in offsets:
+            self.nvar = offsets["nvar"]
+            self._hydro_offset = offsets["hydro_offset"]
+            self._level_count = offsets["level_count"]
+        if "particle_header" in offsets:
+            self._set_particle_header(offsets["particle_header"],
+                                      offsets["particle_field_offsets"],
+                                      offsets["particle_field_types"])
+        else:
+            self.local_particle_count = 0
+            self.particle_field_offsets = {}
+
     def _read_hydro_header(self):
         # If no hydro file is found, return
         if not self._is_hydro():
@@ -138,50 +247,14 @@ class RAMSESDomainFile(object):
             self.local_particle_count = 0
             self.particle_field_offsets = {}
             return
-        f = open(self.part_fn, "rb")
-        f.seek(0, os.SEEK_END)
-        flen = f.tell()
-        f.seek(0)
-        hvals = {}
-        attrs = ( ('ncpu', 1, 'I'),
-                  ('ndim', 1, 'I'),
-                  ('npart', 1, 'I') )
-        hvals.update(fpu.read_attrs(f, attrs))
-        fpu.read_vector(f, 'I')
-
-        attrs = ( ('nstar_tot', 1, 'I'),
-                  ('mstar_tot', 1, 'd'),
-                  ('mstar_lost', 1, 'd'),
-                  ('nsink', 1, 'I') )
-        hvals.update(fpu.read_attrs(f, attrs))
+        self._set_particle_header(*_read_particle_offsets(
+            self.part_fn, self.ds._extra_particle_fields))
+
+    def _set_particle_header(self, hvals, field_offsets, field_types):
         self.particle_header = hvals
         self.local_particle_count = hvals['npart']
-
-        particle_fields = [
-                ("particle_position_x", "d"),
-                ("particle_position_y", "d"),
-                ("particle_position_z", "d"),
-                ("particle_velocity_x", "d"),
-                ("particle_velocity_y", "d"),
-                ("particle_velocity_z", "d"),
-                ("particle_mass", "d"),
-                ("particle_identifier", "i"),
-                ("particle_refinement_level", "I")]
-        if hvals["nstar_tot"] > 0:
-            particle_fields += [("particle_age", "d"),
-                                ("particle_metallicity", "d")]
-        if self.ds._extra_particle_fields is not None:
-            particle_fields += self.ds._extra_particle_fields
-
-        field_offsets = {}
-        _pfields = {}
-        for field, vtype in particle_fields:
-            if f.tell() >= flen: break
-            field_offsets["io", field] = f.tell()
-            _pfields["io", field] = vtype
-            fpu.skip(f, 1)
         self.particle_field_offsets = field_offsets
-        self.particle_field_types = _pfields
+        self.particle_field_types = field_types
         self.particle_types = self.particle_types_raw = ("io",)
 
     def _read_amr_header(self):
@@ -219,11 +292,6 @@ class RAMSESDomainFile(object):
                 self.ds.domain_left_edge, self.ds.domain_right_edge)
         root_nodes = self.amr_header['numbl'][self.ds.min_level,:].sum()
         self.oct_handler.allocate_domains(self.total_oct_count, root_nodes)
-        fb = open(self.amr_fn, "rb")
-        fb.seek(self.amr_offset)
-        f = BytesIO()
-        f.write(fb.read())
-        f.seek(0)
         mylog.debug("Reading domain AMR % 4i (%0.3e, %0.3e)",
             self.domain_id, self.total_oct_count.sum(), self.ngridbound.sum())
         def _ng(c, l):
@@ -240,40 +308,44 @@ class RAMSESDomainFile(object):
         # So we initially assume that.
         max_level = 0
         nx, ny, nz = (((i-1.0)/2.0) for i in self.amr_header['nx'])
-        for level in range(self.amr_header['nlevelmax']):
-            # Easier if do this 1-indexed
-            for cpu in range(self.amr_header['nboundary'] + self.amr_header['ncpu']):
-                #ng is the number of octs on this level on this domain
-                ng = _ng(cpu, level)
-                if ng == 0: continue
-                ind = fpu.read_vector(f, "I").astype("int64")  # NOQA
-                fpu.skip(f, 2)
-                pos = np.empty((ng, 3), dtype='float64')
-                pos[:,0] = fpu.read_vector(f, "d") - nx
-                pos[:,1] = fpu.read_vector(f, "d") - ny
-                pos[:,2] = fpu.read_vector(f, "d") - nz
-                #pos *= self.ds.domain_width
-                #pos += self.dataset.domain_left_edge
-                fpu.skip(f, 31)
-                #parents = fpu.read_vector(f, "I")
-                #fpu.skip(f, 6)
-                #children = np.empty((ng, 8), dtype='int64')
-                #for i in range(8):
-                #    children[:,i] = fpu.read_vector(f, "I")
-                #cpu_map = np.empty((ng, 8), dtype="int64")
-                #for i in range(8):
-                #    cpu_map[:,i] = fpu.read_vector(f, "I")
-                #rmap = np.empty((ng, 8), dtype="int64")
-                #for i in range(8):
-                #    rmap[:,i] = fpu.read_vector(f, "I")
-                # We don't want duplicate grids.
-                # Note that we're adding *grids*, not individual cells.
-                if level >= min_level:
-                    assert(pos.shape[0] == ng)
-                    n = self.oct_handler.add(cpu + 1, level - min_level, pos,
-                                count_boundary = 1)
-                    self._error_check(cpu, level, pos, n, ng, (nx, ny, nz))
-                    if n > 0: max_level = max(level - min_level, max_level)
+        # We only need the positions out of each level/CPU block, so rather
+        # than reading the whole file into memory we seek past the rest.
+        with open(self.amr_fn, "rb") as f:
+            f.seek(self.amr_offset)
+            for level in range(self.amr_header['nlevelmax']):
+                # Easier if do this 1-indexed
+                for cpu in range(self.amr_header['nboundary'] + self.amr_header['ncpu']):
+                    #ng is the number of octs on this level on this domain
+                    ng = _ng(cpu, level)
+                    if ng == 0: continue
+                    ind = fpu.read_vector(f, "I").astype("int64")  # NOQA
+                    fpu.skip(f, 2)
+                    pos = np.empty((ng, 3), dtype='float64')
+                    pos[:,0] = fpu.read_vector(f, "d") - nx
+                    pos[:,1] = fpu.read_vector(f, "d") - ny
+                    pos[:,2] = fpu.read_vector(f, "d") - nz
+                    #pos *= self.ds.domain_width
+                    #pos += self.dataset.domain_left_edge
+                    fpu.skip(f, 31)
+                    #parents = fpu.read_vector(f, "I")
+                    #fpu.skip(f, 6)
+                    #children = np.empty((ng, 8), dtype='int64')
+                    #for i in range(8):
+                    #    children[:,i] = fpu.read_vector(f, "I")
+                    #cpu_map = np.empty((ng, 8), dtype="int64")
+                    #for i in range(8):
+                    #    cpu_map[:,i] = fpu.read_vector(f, "I")
+                    #rmap = np.empty((ng, 8), dtype="int64")
+                    #for i in range(8):
+                    #    rmap[:,i] = fpu.read_vector(f, "I")
+                    # We don't want duplicate grids.
+                    # Note that we're adding *grids*, not individual cells.
+                    if level >= min_level:
+                        assert(pos.shape[0] == ng)
+                        n = self.oct_handler.add(cpu + 1, level - min_level, pos,
+                                    count_boundary = 1)
+                        self._error_check(cpu, level, pos, n, ng, (nx, ny, nz))
+                        if n > 0: max_level = max(level - min_level, max_level)
         self.max_level = max_level
         self.oct_handler.finalize()
 
@@ -316,30 +388,35 @@ class RAMSESDomainSubset(OctreeSubset):
     _block_reorder = "F"
 
     def fill(self, content, fields, selector):
-        # Here we get a copy of the file, which we skip through and read the
-        # bits we want.
+        # Here we get a handle on the hydro file (either an open file or a
+        # memory map of it).  The records are laid out level by level, and
+        # within a level as 8 cells times nvar variables, each record holding
+        # level_count values; we seek straight to the ones we want.
         oct_handler = self.oct_handler
         all_fields = self.domain.ds.index.fluid_field_list
         fields = [f for ft, f in fields]
+        nvar = self.domain.nvar
         tr = {}
         cell_count = selector.count_oct_cells(self.oct_handler, self.domain_id)
         levels, cell_inds, file_inds = self.oct_handler.file_index_octs(
             selector, self.domain_id, cell_count)
         for field in fields:
             tr[field] = np.zeros(cell_count, 'float64')
+        field_inds = sorted((all_fields.index(field), field)
+                            for field in fields)
+        selected_levels = set(np.unique(levels))
         for level, offset in enumerate(self.domain.hydro_offset):
-            if offset == -1: continue
-            content.seek(offset)
+            if offset == -1 or level not in selected_levels: continue
             nc = self.domain.level_count[level]
+            # Each record is nc doubles plus two four-byte markers
+            record_size = 8 * nc + 8
             temp = {}
-            for field in all_fields:
+            for field in fields:
                 temp[field] = np.empty((nc, 8), dtype="float64")
             for i in range(8):
-                for field in all_fields:
-                    if field not in fields:
-                        fpu.skip(content)
-                    else:
-                        temp[field][:,i] = fpu.read_vector(content, 'd') # cell 1
+                for j, field in field_inds:
+                    content.seek(offset + (i * nvar + j) * record_size)
+                    temp[field][:,i] = fpu.read_vector(content, 'd') # cell 1
             oct_handler.fill_level(level, levels, cell_inds, file_inds, tr, temp)
         return tr
 
@@ -357,13 +434,171 @@ class RAMSESIndex(OctreeIndex):
         super(RAMSESIndex, self).__init__(ds, dataset_type)
 
     def _initialize_oct_handler(self):
-        self.domains = [RAMSESDomainFile(self.dataset, i + 1)
+        offsets = self._load_offset_cache()
+        if offsets is None:
+            offsets = self._read_offsets()
+            self._save_offset_cache(offsets)
+        self.domains = [RAMSESDomainFile(self.dataset, i + 1, offsets[i])
                         for i in range(self.dataset['ncpu'])]
         total_octs = sum(dom.local_oct_count #+ dom.ngridbound.sum()
                          for dom in self.domains)
         self.max_level = max(dom.max_level for dom in self.domains)
         self.num_grids = total_octs
 
+    def _read_offsets(self):
+        """
+        Compute the hydro and particle offset tables of every domain.  The
+        domains are split between MPI ranks and, within a rank, over
+        ``ramses_offset_nprocs`` local processes.
+        """
+        ds = self.dataset
+        ncpu = ds['ncpu']
+        args = []
+        for i in range(ncpu):
+            if i % self.comm.size != self.comm.rank: continue
+            basename = _domain_basename(ds, i + 1)
+            args.append((i + 1, basename % "hydro", basename % "part",
+                         ds.min_level, ds._extra_particle_fields))
+        nprocs = ytcfg.getint("yt", "ramses_offset_nprocs")
+        if nprocs < 1:
+            nprocs = multiprocessing.cpu_count()
+        nprocs = min(nprocs, len(args))
+        if nprocs > 1 and not sys.platform.startswith("win"):
+            pool = multiprocessing.Pool(nprocs)
+            try:
+                results = pool.map(_read_domain_offsets, args)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_read_domain_offsets(a) for a in args]
+        results = [(a[0], r) for a, r in zip(args, results)]
+        if self.comm.size > 1:
+            results = self.comm.par_combine_object(
+                results, datatype = "list", op = "cat")
+        return [r for _, r in sorted(results, key = lambda a: a[0])]
+
+    _offset_cache_version = 1
+
+    @property
+    def offset_cache_filename(self):
+        """
+        The file the domain offset tables are cached in, next to the output
+        itself.  This is None if caching is turned off.
+        """
+        if not ytcfg.getboolean("yt", "cache_ramses_offsets"):
+            return None
+        num = os.path.basename(self.dataset.parameter_filename).split("."
+                )[0].split("_")[1]
+        return os.path.join(os.path.abspath(self.directory),
+                            "yt_offsets_%s.npz" % num)
+
+    def _offset_cache_key(self):
+        # The offsets only depend on the layout of the output files, which
+        # are not rewritten once the info file is, and on any extra particle
+        # fields the user has told us about.
+        st = os.stat(self.dataset.parameter_filename)
+        key = (self._offset_cache_version, self.dataset['ncpu'],
+               self.dataset.min_level, st.st_size, int(st.st_mtime),
+               self.dataset._extra_particle_fields)
+        return hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+    def _load_offset_cache(self):
+        """
+        Read the offset tables of all the domains back from the cache file,
+        returning None if it does not exist or is stale.
+        """
+        fn = self.offset_cache_filename
+        if fn is None or not os.path.exists(fn):
+            return None
+        try:
+            with np.load(fn) as f:
+                # Each lookup in an npz file reads the array back out of it,
+                # so pull everything out at once.
+                cache = dict((k, f[k]) for k in f.files)
+        except (IOError, ValueError, zipfile.BadZipfile) as e:
+            mylog.info("Could not read offset cache %s (%s), ignoring it.",
+                       fn, e)
+            return None
+        if str(cache.get("key")) != self._offset_cache_key():
+            mylog.info("Offset cache %s is out of date, ignoring it.", fn)
+            return None
+        header_keys = [str(k) for k in cache["particle_header_keys"]]
+        field_names = [str(f) for f in cache["particle_field_names"]]
+        field_types = [str(t) for t in cache["particle_field_types"]]
+        offsets = [{} for i in range(self.dataset['ncpu'])]
+        for i, dom in enumerate(offsets):
+            if cache["has_hydro"][i]:
+                dom["nvar"] = int(cache["nvar"][i])
+                dom["hydro_offset"] = cache["hydro_offset"][i]
+                dom["level_count"] = cache["level_count"][i]
+            if not cache["has_particles"][i]: continue
+            dom["particle_header"] = dict(
+                (k, cache["particle_header_%s" % k][i].item())
+                for k in header_keys)
+            foffsets = cache["particle_field_offsets"][i]
+            dom["particle_field_offsets"] = dict(
+                (("io", f), int(o)) for f, o in zip(field_names, foffsets)
+                if o >= 0)
+            dom["particle_field_types"] = dict(
+                (("io", f), t) for f, t, o in
+                zip(field_names, field_types, foffsets) if o >= 0)
+        mylog.debug("Read domain offsets from %s", fn)
+        return offsets
+
+    def _save_offset_cache(self, offsets):
+        fn = self.offset_cache_filename
+        if fn is None or self.comm.rank != 0:
+            return
+        ncpu = len(offsets)
+        has_hydro = np.array(["nvar" in dom for dom in offsets])
+        has_particles = np.array(["particle_header" in dom
+                                  for dom in offsets])
+        n_levels = max([dom["hydro_offset"].size for dom in offsets
+                        if "nvar" in dom] + [0])
+        arrays = dict(key = np.array(self._offset_cache_key()),
+                      has_hydro = has_hydro, has_particles = has_particles,
+                      nvar = np.zeros(ncpu, dtype="int64"),
+                      hydro_offset = -np.ones((ncpu, n_levels), dtype="int64"),
+                      level_count = np.zeros((ncpu, n_levels), dtype="int64"))
+        # Every domain lists its particle fields in the same order, but ones
+        # at the end may be missing, so we store the longest list and mark
+        # missing fields with an offset of -1.
+        field_names = []
+        field_types = []
+        header_keys = []
+        for dom in offsets:
+            if "particle_header" not in dom: continue
+            header_keys = sorted(dom["particle_header"])
+            fields = sorted(dom["particle_field_offsets"],
+                            key = lambda f: dom["particle_field_offsets"][f])
+            if len(fields) > len(field_names):
+                field_names = [f for ft, f in fields]
+                field_types = [dom["particle_field_types"][f] for f in fields]
+        foffsets = -np.ones((ncpu, len(field_names)), dtype="int64")
+        for k in header_keys:
+            arrays["particle_header_%s" % k] = np.array(
+                [dom["particle_header"][k] if "particle_header" in dom else 0
+                 for dom in offsets])
+        for i, dom in enumerate(offsets):
+            if "nvar" in dom:
+                arrays["nvar"][i] = dom["nvar"]
+                arrays["hydro_offset"][i,:] = dom["hydro_offset"]
+                arrays["level_count"][i,:] = dom["level_count"]
+            for j, f in enumerate(field_names):
+                foffsets[i, j] = dom.get("particle_field_offsets", {}).get(
+                    ("io", f), -1)
+        arrays["particle_field_offsets"] = foffsets
+        arrays["particle_field_names"] = np.array(field_names, dtype="str")
+        arrays["particle_field_types"] = np.array(field_types, dtype="str")
+        arrays["particle_header_keys"] = np.array(header_keys, dtype="str")
+        try:
+            np.savez(fn, **arrays)
+        except (IOError, OSError) as e:
+            mylog.info("Could not write offset cache %s (%s).", fn, e)
+            return
+        mylog.debug("Wrote domain offsets to %s", fn)
+
     def _detect_output_fields(self):
         # Do we want to attempt to figure out what the fields are in the file?
         dsl = set([])
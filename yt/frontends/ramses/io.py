@@ -14,8 +14,10 @@ RAMSES-specific IO
 #-----------------------------------------------------------------------------
 
 from collections import defaultdict
+import mmap
 import numpy as np
 
+from yt.config import ytcfg
 from yt.utilities.io_handler import \
     BaseIOHandler
 from yt.utilities.logger import ytLogger as mylog
@@ -23,12 +25,6 @@ from yt.utilities.physical_ratios import cm_per_km, cm_per_mpc
 import yt.utilities.fortran_utils as fpu
 from yt.utilities.lib.cosmology_time import \
     get_ramses_ages
-from yt.extern.six import PY3
-
-if PY3:
-    from io import BytesIO as IO
-else:
-    from cStringIO import StringIO as IO
 
 class IOHandlerRAMSES(BaseIOHandler):
     _dataset_type = "ramses"
@@ -38,14 +34,20 @@ class IOHandlerRAMSES(BaseIOHandler):
         # Each domain subset will contain a hydro_offset array, which gives
         # pointers to level-by-level hydro information
         tr = defaultdict(list)
+        use_mmap = ytcfg.getboolean("yt", "ramses_use_mmap")
         for chunk in chunks:
             for subset in chunk.objs:
-                # Now we read the entire thing
-                f = open(subset.domain.hydro_fn, "rb")
-                # This contains the boundary information, so we skim through
-                # and pick off the right vectors
-                content = IO(f.read())
-                rv = subset.fill(content, fields, selector)
+                # We only read the records for the requested fields, seeking
+                # to them through the hydro_offset table.
+                with open(subset.domain.hydro_fn, "rb") as f:
+                    if use_mmap:
+                        content = mmap.mmap(f.fileno(), 0,
+                                            access=mmap.ACCESS_READ)
+                    else:
+                        content = f
+                    rv = subset.fill(content, fields, selector)
+                    if use_mmap:
+                        content.close()
                 for ft, f in fields:
                     d = rv.pop(f)
                     mylog.debug("Filling %s with %s (%0.3e %0.3e) (%s zones)",
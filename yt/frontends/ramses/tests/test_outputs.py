@@ -14,6 +14,10 @@ RAMSES frontend tests
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
+from io import BytesIO
+import numpy as np
+
+from yt.config import ytcfg
 from yt.testing import \
     assert_equal, \
     requires_file, \
@@ -154,3 +158,82 @@ def test_ramses_rt():
     for field in special_fields:
         assert(field in ds.derived_field_list)
         ad[field]
+
+@requires_file(ramsesCosmo)
+def test_offset_cache():
+    ds = yt.load(ramsesCosmo)
+    index = ds.index
+    offsets = index._read_offsets()
+    for dom, dom_offsets in zip(index.domains, offsets):
+        assert_equal(dom.hydro_offset, dom_offsets["hydro_offset"])
+        assert_equal(dom.level_count, dom_offsets["level_count"])
+        assert_equal(dom.particle_field_offsets,
+                     dom_offsets["particle_field_offsets"])
+    if not os.access(index.directory, os.W_OK):
+        return
+    index._save_offset_cache(offsets)
+    cached = index._load_offset_cache()
+    for dom_offsets, dom_cached in zip(offsets, cached):
+        assert_equal(sorted(dom_offsets), sorted(dom_cached))
+        assert_equal(dom_offsets["hydro_offset"], dom_cached["hydro_offset"])
+        assert_equal(dom_offsets["particle_header"],
+                     dom_cached["particle_header"])
+        assert_equal(dom_offsets["particle_field_types"],
+                     dom_cached["particle_field_types"])
+
+def _sequential_fill(subset, content, fields, selector):
+    # The reader as it was before it seeked to the requested records: every
+    # record of every level is read or skipped in turn.
+    import yt.utilities.fortran_utils as fpu
+    oct_handler = subset.oct_handler
+    all_fields = subset.domain.ds.index.fluid_field_list
+    fields = [f for ft, f in fields]
+    tr = {}
+    cell_count = selector.count_oct_cells(oct_handler, subset.domain_id)
+    levels, cell_inds, file_inds = oct_handler.file_index_octs(
+        selector, subset.domain_id, cell_count)
+    for field in fields:
+        tr[field] = np.zeros(cell_count, 'float64')
+    for level, offset in enumerate(subset.domain.hydro_offset):
+        if offset == -1: continue
+        content.seek(offset)
+        nc = subset.domain.level_count[level]
+        temp = {}
+        for field in all_fields:
+            temp[field] = np.empty((nc, 8), dtype="float64")
+        for i in range(8):
+            for field in all_fields:
+                if field not in fields:
+                    fpu.skip(content)
+                else:
+                    temp[field][:,i] = fpu.read_vector(content, 'd')
+        oct_handler.fill_level(level, levels, cell_inds, file_inds, tr, temp)
+    return tr
+
+@requires_file(output_00080)
+def test_hydro_reads():
+    ds = yt.load(output_00080)
+    fields = [("ramses", "Density"), ("ramses", "Pressure"),
+              ("ramses", "x-velocity")]
+    sp = ds.sphere("c", (1.0, "Mpc"))
+    ds.index._identify_base_chunk(sp)
+    old_mmap = ytcfg.get("yt", "ramses_use_mmap")
+    try:
+        values = {}
+        for use_mmap in ("False", "True"):
+            ytcfg["yt", "ramses_use_mmap"] = use_mmap
+            sp.clear_data()
+            values[use_mmap] = [sp[field].copy() for field in fields]
+    finally:
+        ytcfg["yt", "ramses_use_mmap"] = old_mmap
+    for a, b in zip(values["False"], values["True"]):
+        assert_equal(a, b)
+    # The records found by seeking match those found by reading through
+    # the whole hydro file
+    for subset in sp._chunk_info:
+        with open(subset.domain.hydro_fn, "rb") as f:
+            content = BytesIO(f.read())
+        seek = subset.fill(content, fields, sp.selector)
+        sequential = _sequential_fill(subset, content, fields, sp.selector)
+        for ft, f in fields:
+            assert_equal(seek[f], sequential[f])
@@ -94,10 +94,13 @@ class IOHandlerTipsyBinary(BaseIOHandler):
                 rv[field][:] = vals[field][mask]
             if field == "Coordinates":
                 eps = np.finfo(rv[field].dtype).eps
+                # The particle index may have been loaded from its on-disk
+                # cache, so we cannot rely on _initialize_index having run.
+                DLE = self.ds.domain_left_edge.in_units("code_length").d
+                DRE = self.ds.domain_right_edge.in_units("code_length").d
                 for i in range(3):
                     rv[field][:, i] = np.clip(rv[field][:, i],
-                                              self.domain_left_edge[i] + eps,
-                                              self.domain_right_edge[i] - eps)
+                                              DLE[i] + eps, DRE[i] - eps)
         return rv
 
     def _read_particle_coords(self, chunks, ptf):
@@ -21,12 +21,15 @@ from .coordinate_handler import \
     _get_vert_fields, \
     cartesian_to_cylindrical, \
     cylindrical_to_cartesian
-from yt.funcs import mylog
+from yt.config import ytcfg
+from yt.funcs import mylog, get_num_threads
 from yt.units.yt_array import uvstack, YTArray
+from yt.utilities.exceptions import YTFieldNotFound
 from yt.utilities.lib.pixelization_routines import \
     pixelize_element_mesh, pixelize_off_axis_cartesian, \
     pixelize_cartesian, pixelize_cartesian_nodal, \
-    pixelize_element_mesh_line
+    pixelize_element_mesh_line, pixelize_sph_kernel_projection, \
+    pixelize_sph_kernel_slice
 from yt.data_objects.unstructured_mesh import SemiStructuredMesh
 from yt.utilities.nodal_data_utils import get_nodal_data
 
@@ -65,6 +68,39 @@ def _sample_ray(ray, npoints, field):
     x = np.arange(npoints)/(npoints-1)*(dr*npoints)
     return x, field_values
 
+def _get_smoothed_source(ds, field):
+    # The particle fields a mesh field is smoothed from, following aliases,
+    # or None if it is not smoothed from SPH particles.
+    seen = set()
+    while field is not None and field not in seen:
+        seen.add(field)
+        try:
+            finfo = ds._get_field_info(*field)
+        except YTFieldNotFound:
+            return None
+        if hasattr(finfo._function, "smoothed_from"):
+            return finfo._function.smoothed_from
+        field = getattr(finfo._function, "alias_name", None)
+    return None
+
+def _sph_images(px, py, hsml, bounds, period, periodic):
+    # The indices and positions of the particles whose kernels reach into the
+    # image, along with those of their periodic images that do.
+    ind, xs, ys = [], [], []
+    xshifts = [0.0, -period[0], period[0]] if periodic[0] else [0.0]
+    yshifts = [0.0, -period[1], period[1]] if periodic[1] else [0.0]
+    for sx in xshifts:
+        x = px + sx
+        in_x = (x + hsml > bounds[0]) & (x - hsml < bounds[1])
+        for sy in yshifts:
+            y = py + sy
+            hit = np.where(in_x & (y + hsml > bounds[2]) &
+                           (y - hsml < bounds[3]))[0]
+            ind.append(hit)
+            xs.append(x[hit])
+            ys.append(y[hit])
+    return np.concatenate(ind), np.concatenate(xs), np.concatenate(ys)
+
 class CartesianCoordinateHandler(CoordinateHandler):
     name = "cartesian"
 
@@ -154,6 +190,10 @@ class CartesianCoordinateHandler(CoordinateHandler):
             return np.squeeze(np.transpose(img, (yax, xax, ax)))
 
         elif self.axis_id.get(dimension, dimension) < 3:
+            buff = self._sph_pixelize(data_source, field, bounds, size,
+                                      dimension, periodic)
+            if buff is not None:
+                return buff
             return self._ortho_pixelize(data_source, field, bounds, size,
                                         antialias, dimension, periodic)
         else:
@@ -240,6 +280,97 @@ class CartesianCoordinateHandler(CoordinateHandler):
                                period, int(periodic))
         return buff
 
+    def _sph_pixelize(self, data_source, field, bounds, size, dim, periodic):
+        # Slices and projections of fields smoothed from SPH particles, made
+        # by adding up the kernel of each particle at every pixel rather than
+        # from the octree the fields are deposited onto.  Returns None for
+        # any other image, which is then pixelized from the cells.
+        if not ytcfg.getboolean("yt", "sph_kernel_pixelization"):
+            return None
+        ds = self.ds
+        field = data_source._determine_fields(field)[0]
+        source = _get_smoothed_source(ds, field)
+        if source is None:
+            return None
+        ptype = source["ptype"]
+        weight = None
+        if data_source._type_name == "proj":
+            if data_source.method != "integrate":
+                return None
+            if data_source.weight_field is not None:
+                weight = _get_smoothed_source(ds, data_source.weight_field)
+                if weight is None or weight["ptype"] != ptype:
+                    return None
+            container = data_source.data_source
+            out_units = data_source._projected_units[field]
+        elif data_source._type_name == "slice":
+            container = data_source._data_source
+            if container is None:
+                container = ds.all_data()
+            coord = data_source.coord
+            if hasattr(coord, "in_units"):
+                coord = coord.in_units("code_length").d
+            coord = float(coord)
+            out_units = ds._get_field_info(*field).units
+        else:
+            return None
+        kernel_name = source["kernel_name"]
+        xax = self.x_axis[dim]
+        yax = self.y_axis[dim]
+        period = self.period.in_units("code_length").d
+        wrap = [periodic and ds.periodicity[ax] for ax in (xax, yax, dim)]
+        bounds = [float(b) for b in bounds]
+        num_threads = max(int(get_num_threads()), 1)
+        buff = np.zeros((size[1], size[0]), dtype="f8")
+        wbuff = np.zeros((size[1], size[0]), dtype="f8")
+
+        for chunk in container.chunks([], "io"):
+            pos = chunk[ptype, source["position"]].in_units("code_length").d
+            if pos.shape[0] == 0:
+                continue
+            hsml = chunk[ptype, source["smoothing_length"]]
+            hsml = hsml.in_units("code_length").d
+            if data_source._type_name == "slice":
+                dz = pos[:, dim] - coord
+                if wrap[2]:
+                    dz -= period[dim] * np.rint(dz / period[dim])
+                near = np.where(np.abs(dz) < hsml)[0]
+                pos = pos[near]
+                hsml = hsml[near]
+            ind, px, py = _sph_images(pos[:, xax], pos[:, yax], hsml, bounds,
+                                      period[[xax, yax]], wrap)
+            if ind.size == 0:
+                continue
+            h = hsml[ind]
+            vol = chunk[ptype, source["mass"]] / chunk[ptype, source["density"]]
+            vol = vol.in_units("code_length**3").d
+            quan = chunk[ptype, source["field"]].d
+            if data_source._type_name == "slice":
+                ind = near[ind]
+                pixelize_sph_kernel_slice(buff, px, py, dz[ind], h,
+                                          vol[ind] * quan[ind], bounds,
+                                          kernel_name, num_threads)
+            elif weight is None:
+                pixelize_sph_kernel_projection(buff, px, py, h,
+                                               vol[ind] * quan[ind], bounds,
+                                               kernel_name, num_threads)
+            else:
+                w = vol[ind] * chunk[ptype, weight["field"]].d[ind]
+                pixelize_sph_kernel_projection(buff, px, py, h,
+                                               w * quan[ind], bounds,
+                                               kernel_name, num_threads)
+                pixelize_sph_kernel_projection(wbuff, px, py, h, w, bounds,
+                                               kernel_name, num_threads)
+
+        if weight is not None:
+            np.divide(buff, wbuff, out=buff, where=wbuff > 0)
+            buff[wbuff <= 0] = 0.0
+        units = ds._get_field_info(ptype, source["field"]).units
+        buff = ds.arr(buff, units)
+        if data_source._type_name == "proj" and weight is None:
+            buff = buff * ds.quan(1.0, "code_length")
+        return buff.in_units(out_units)
+
     def _oblique_pixelize(self, data_source, field, bounds, size, antialias):
         indices = np.argsort(data_source['pdx'])[::-1].astype(np.int_)
         buff = np.zeros((size[1], size[0]), dtype="f8")
@@ -292,7 +292,7 @@ class YTDataChunk(object):
         # costly getattr functions, but this allows us to generalize.
         mname = "select_%s" % method
         arrs = []
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             f = getattr(obj, mname)
             arrs.append(f(self.dobj))
         if method == "dtcoords":
@@ -316,7 +316,7 @@ class YTDataChunk(object):
                      registry = self.dobj.ds.unit_registry)
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_fcoords(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -332,7 +332,7 @@ class YTDataChunk(object):
         ci = np.empty((self.data_size, 3), dtype='int64')
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_icoords(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -352,7 +352,7 @@ class YTDataChunk(object):
                      registry = self.dobj.ds.unit_registry)
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_fwidth(self.dobj)
             if c.shape[0] == 0: continue
             ci[ind:ind+c.shape[0], :] = c
@@ -368,7 +368,7 @@ class YTDataChunk(object):
         ci = np.empty(self.data_size, dtype='int64')
         if self.data_size == 0: return ci
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             c = obj.select_ires(self.dobj)
             if c.shape == 0: continue
             ci[ind:ind+c.size] = c
@@ -387,7 +387,7 @@ class YTDataChunk(object):
         self._tcoords = ct # Se this for tcoords
         if self.data_size == 0: return cdt
         ind = 0
-        for obj in self._fast_index or self.objs:
+        for obj in self.objs:
             gdt, gt = obj.select_tcoords(self.dobj)
             if gt.size == 0: continue
             ct[ind:ind+gt.size] = gt
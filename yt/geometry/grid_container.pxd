@@ -32,6 +32,7 @@ cdef class GridTree:
     cdef int num_root_grids
     cdef int num_leaf_grids
     cdef public bitarray mask
+    cdef public int refine_by
     cdef void setup_data(self, GridVisitorData *data)
     cdef void visit_grids(self, GridVisitorData *data,
                           grid_visitor_function *func,
@@ -43,6 +44,20 @@ cdef class GridTree:
                           GridTreeNode *grid,
                           np.uint8_t *buf = ?)
 
+cdef class GridTreeSelection:
+    cdef public GridTree tree
+    cdef public bitarray mask
+    cdef public np.int64_t size
+    cdef public np.ndarray grid_ind
+    cdef public np.ndarray offsets
+    cdef public np.ndarray counts
+    cdef public np.ndarray positions
+    cdef public np.ndarray order
+    cdef object __weakref__
+    cdef void visit_selected(self, GridVisitorData *data,
+                             grid_visitor_function *func,
+                             SelectorObject selector)
+
 cdef class MatchPointsToGrids:
 
     cdef int num_points
@@ -16,7 +16,7 @@ Matching points on the grid to specific grids
 import numpy as np
 cimport numpy as np
 cimport cython
-from yt.utilities.lib.bitarray cimport bitarray
+from yt.utilities.lib.bitarray cimport bitarray, ba_get_value
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -59,16 +59,19 @@ cdef class GridTree:
                   np.ndarray[np.int32_t, ndim=2] dimensions,
                   np.ndarray[np.int64_t, ndim=1] parent_ind,
                   np.ndarray[np.int64_t, ndim=1] level,
-                  np.ndarray[np.int64_t, ndim=1] num_children):
+                  np.ndarray[np.int64_t, ndim=1] num_children,
+                  start_index = None, int refine_by = 2):
 
         cdef int i, j, k
         cdef np.ndarray[np.int_t, ndim=1] child_ptr
+        cdef np.ndarray[np.int64_t, ndim=2] sind
 
         child_ptr = np.zeros(num_grids, dtype='int')
 
         self.num_grids = num_grids
         self.num_root_grids = 0
         self.num_leaf_grids = 0
+        self.refine_by = refine_by
         
         self.grids = <GridTreeNode *> malloc(
                 sizeof(GridTreeNode) * num_grids)
@@ -79,7 +82,7 @@ cdef class GridTree:
                                             dimensions[i,:],
                                             num_children[i],
                                             level[i], i)
-            if level[i] == 0:
+            if parent_ind[i] < 0:
                 self.num_root_grids += 1
             if num_children[i] == 0:
                 self.num_leaf_grids += 1
@@ -97,6 +100,17 @@ cdef class GridTree:
                     raise RuntimeError
                 self.root_grids[k] = self.grids[i] 
                 k = k + 1
+        if start_index is not None:
+            # The start indices computed from the left edges alone are only
+            # right if the domain starts at the origin.
+            sind = np.asarray(start_index, dtype="int64").reshape(num_grids, 3)
+            for i in range(num_grids):
+                for j in range(3):
+                    self.grids[i].start_index[j] = sind[i, j]
+            for i in range(self.num_root_grids):
+                j = self.root_grids[i].index
+                for k in range(3):
+                    self.root_grids[i].start_index[k] = sind[j, k]
 
     def __init__(self, *args, **kwargs):
         self.mask = None
@@ -155,7 +169,7 @@ cdef class GridTree:
         data.n_tuples = 0
         data.child_tuples = NULL
         data.array = NULL
-        data.ref_factor = 2 #### FIX THIS
+        data.ref_factor = self.refine_by
 
     cdef void visit_grids(self, GridVisitorData *data,
                           grid_visitor_function *func,
@@ -268,6 +282,175 @@ cdef class GridTree:
         self.visit_grids(&data, grid_visitors.fwidth_cells, selector)
         return fwidth
     
+cdef class GridTreeSelection:
+    # The cells of a list of grids of a GridTree that a selector selects,
+    # found in a single pass over the grids and kept as one bitarray.  The
+    # grids are visited in the order they are listed, which is the order the
+    # cells of a data object are read in, so coordinates filled from here line
+    # up with field values read grid by grid.  Subsets of the grids, such as
+    # io chunks, share the mask of the selection they were made from.
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    def __init__(self, GridTree tree, SelectorObject selector,
+                 np.ndarray[np.int64_t, ndim=1] grid_ind):
+        cdef GridVisitorData data
+        cdef GridTreeNode *grid
+        cdef np.int64_t i, gi, n = grid_ind.shape[0]
+        cdef np.uint64_t total = 0
+        cdef np.ndarray[np.int64_t, ndim=1] offsets, counts, positions
+        offsets = np.empty(n, dtype="int64")
+        counts = np.zeros(n, dtype="int64")
+        positions = np.zeros(tree.num_grids, dtype="int64") - 1
+        for i in range(n):
+            gi = grid_ind[i]
+            if gi < 0 or gi >= tree.num_grids or positions[gi] >= 0:
+                raise RuntimeError("Grid %s is not in the grid tree, or is "
+                                   "listed twice." % gi)
+            positions[gi] = i
+            offsets[i] = total
+            grid = &tree.grids[gi]
+            total += grid.dims[0] * grid.dims[1] * grid.dims[2]
+        cdef bitarray mask = bitarray(total)
+        tree.setup_data(&data)
+        data.array = <void*> mask.buf
+        for i in range(n):
+            grid = &tree.grids[grid_ind[i]]
+            if selector.select_grid(grid.left_edge, grid.right_edge,
+                                    grid.level) == 0:
+                continue
+            data.grid = grid
+            data.index = 0
+            data.global_index = offsets[i]
+            grid_visitors.setup_tuples(&data)
+            selector.visit_grid_cells(&data, grid_visitors.mask_cells)
+            counts[i] = data.index
+        grid_visitors.free_tuples(&data)
+        self.tree = tree
+        self.mask = mask
+        self.grid_ind = grid_ind
+        self.offsets = offsets
+        self.counts = counts
+        self.positions = positions
+        self.order = np.arange(n, dtype="int64")
+        self.size = counts.sum()
+
+    def subset(self, grid_ind):
+        """
+        The part of this selection in the grids with indices *grid_ind*, in
+        that order.
+        """
+        cdef GridTreeSelection sub = GridTreeSelection.__new__(
+            GridTreeSelection)
+        order = self.positions[np.asarray(grid_ind, dtype="int64")]
+        if np.any(order < 0):
+            raise RuntimeError("Not all of the grids are in this selection.")
+        sub.tree = self.tree
+        sub.mask = self.mask
+        sub.grid_ind = self.grid_ind
+        sub.offsets = self.offsets
+        sub.counts = self.counts
+        sub.positions = self.positions
+        sub.order = order
+        sub.size = self.counts[order].sum()
+        return sub
+
+    def count(self, SelectorObject selector):
+        return self.size
+
+    def contains(self, np.int64_t gi):
+        """
+        Whether grid *gi* of the tree is in the selection.
+        """
+        return gi >= 0 and gi < self.positions.shape[0] and \
+            self.positions[gi] >= 0
+
+    def grid_count(self, np.int64_t gi):
+        """
+        The number of cells of grid *gi* that are selected.
+        """
+        if not self.contains(gi):
+            raise RuntimeError("Grid %s is not in this selection." % gi)
+        return self.counts[self.positions[gi]]
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    def grid_mask(self, np.int64_t gi):
+        """
+        The mask of the cells of grid *gi* that are selected, in the same form
+        as ``SelectorObject.fill_mask`` returns it.
+        """
+        cdef int i, j, k
+        cdef np.uint64_t ind
+        cdef GridTreeNode *grid
+        cdef np.ndarray[np.uint8_t, ndim=3] mask
+        if self.grid_count(gi) == 0:
+            return None
+        grid = &self.tree.grids[gi]
+        ind = self.offsets[self.positions[gi]]
+        mask = np.zeros((grid.dims[0], grid.dims[1], grid.dims[2]),
+                        dtype="uint8")
+        for i in range(grid.dims[0]):
+            for j in range(grid.dims[1]):
+                for k in range(grid.dims[2]):
+                    mask[i, j, k] = ba_get_value(self.mask.buf, ind)
+                    ind += 1
+        return mask.astype("bool")
+
+    cdef void visit_selected(self, GridVisitorData *data,
+                             grid_visitor_function *func,
+                             SelectorObject selector):
+        # Visit the cells of our grids, in order, with the cached mask.
+        cdef np.int64_t i, p
+        cdef np.ndarray[np.int64_t, ndim=1] order = self.order
+        cdef np.ndarray[np.int64_t, ndim=1] grid_ind = self.grid_ind
+        cdef np.ndarray[np.int64_t, ndim=1] offsets = self.offsets
+        cdef np.ndarray[np.int64_t, ndim=1] counts = self.counts
+        for i in range(order.shape[0]):
+            p = order[i]
+            if counts[p] == 0: continue
+            data.grid = &self.tree.grids[grid_ind[p]]
+            data.global_index = offsets[p]
+            selector.visit_grid_cells(data, func, self.mask.buf)
+
+    def select_icoords(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        self.tree.setup_data(&data)
+        cdef np.ndarray[np.int64_t, ndim=2] icoords
+        icoords = np.empty((self.size, 3), dtype="int64")
+        data.array = icoords.data
+        self.visit_selected(&data, grid_visitors.icoords_cells, selector)
+        return icoords
+
+    def select_ires(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        self.tree.setup_data(&data)
+        cdef np.ndarray[np.int64_t, ndim=1] ires
+        ires = np.empty(self.size, dtype="int64")
+        data.array = ires.data
+        self.visit_selected(&data, grid_visitors.ires_cells, selector)
+        return ires
+
+    def select_fcoords(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        self.tree.setup_data(&data)
+        cdef np.ndarray[np.float64_t, ndim=2] fcoords
+        fcoords = np.empty((self.size, 3), dtype="float64")
+        data.array = fcoords.data
+        self.visit_selected(&data, grid_visitors.fcoords_cells, selector)
+        return fcoords
+
+    def select_fwidth(self, SelectorObject selector, np.int64_t size = -1):
+        cdef GridVisitorData data
+        self.tree.setup_data(&data)
+        cdef np.ndarray[np.float64_t, ndim=2] fwidth
+        fwidth = np.empty((self.size, 3), dtype="float64")
+        data.array = fwidth.data
+        self.visit_selected(&data, grid_visitors.fwidth_cells, selector)
+        return fwidth
+
 cdef class MatchPointsToGrids:
 
     @cython.boundscheck(False)
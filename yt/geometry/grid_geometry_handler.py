@@ -18,7 +18,7 @@ from yt.utilities.on_demand_imports import _h5py as h5py
 import numpy as np
 import weakref
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 
 from yt.arraytypes import blankRecordArray
 from yt.config import ytcfg
@@ -28,14 +28,54 @@ from yt.geometry.geometry_handler import \
     Index, YTDataChunk, ChunkDataCache
 from yt.utilities.definitions import MAXLEVEL
 from yt.utilities.logger import ytLogger as mylog
+from yt.utilities.point_sampling import \
+    PointSampler
+from yt.geometry.selection_routines import \
+    SelectorObject
 from .grid_container import \
-    GridTree, MatchPointsToGrids
-
+    GridTree, GridTreeSelection, MatchPointsToGrids
+
+
+class GhostZoneCache(object):
+    """
+    A least-recently-used cache of grid arrays, both as read and padded with
+    ghost zones, that holds at most *max_bytes* of data.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        arr = self._data.pop(key, None)
+        if arr is not None:
+            self._data[key] = arr
+        return arr
+
+    def set(self, key, arr):
+        if arr.nbytes > self.max_bytes: return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._data[key] = arr
+        self.nbytes += arr.nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._data.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
 
 class GridIndex(Index):
     """The index class for patch and block AMR datasets. """
     float_type = 'float64'
     _preload_implemented = False
+    _ghost_zone_cache = None
+    _level_bounds = None
+    _grid_tree = None
+    _grid_tree_selectable = False
+    _tree_selections = None
     _index_properties = ("grid_left_edge", "grid_right_edge",
                          "grid_levels", "grid_particle_count",
                          "grid_dimensions")
@@ -112,6 +152,53 @@ class GridIndex(Index):
         """
         for g in self.grids: g.clear_data()
         self.io.queue.clear()
+        if self._ghost_zone_cache is not None:
+            self._ghost_zone_cache.clear()
+
+    @property
+    def ghost_zone_cache(self):
+        """
+        The cache of grid data used when filling in ghost zones, limited in
+        size by the ``ghost_zone_cache_size`` option.
+        """
+        if self._ghost_zone_cache is None:
+            size = ytcfg.getint("yt", "ghost_zone_cache_size")
+            self._ghost_zone_cache = GhostZoneCache(size * 1024**2)
+        return self._ghost_zone_cache
+
+    def _level_index_bounds(self, level):
+        # The extents of the grids on *level*, in integer cells of that level.
+        if self._level_bounds is None:
+            self._level_bounds = {}
+        if level not in self._level_bounds:
+            ind = np.where(self.grid_levels.flat == level)[0]
+            dims = self.ds.domain_dimensions * \
+                self.ds.relative_refinement(0, level)
+            dds = self.ds.domain_width.d / dims
+            dle = self.ds.domain_left_edge.d
+            start = np.rint((self.grid_left_edge.d[ind] - dle) / dds)
+            end = np.rint((self.grid_right_edge.d[ind] - dle) / dds)
+            self._level_bounds[level] = (ind, start.astype("int64"),
+                                         end.astype("int64"))
+        return self._level_bounds[level]
+
+    def _same_level_neighbors(self, level, start, end):
+        """
+        Return the grids on *level* that overlap the cells from *start* up to
+        *end*, each with its own start index and the overlapping range, or
+        None if they do not cover all of those cells.
+        """
+        ind, gstart, gend = self._level_index_bounds(level)
+        lo = np.maximum(gstart, start)
+        hi = np.minimum(gend, end)
+        overlap = np.all(hi > lo, axis=1)
+        # Grids on the same level never overlap each other, so their volumes
+        # add up to that of the box only if they cover it.
+        covered = np.prod(hi[overlap] - lo[overlap], axis=1).sum()
+        if covered != np.prod(np.asarray(end) - np.asarray(start)):
+            return None
+        return [(self.grids[i], gs, l, h) for i, gs, l, h in
+                zip(ind[overlap], gstart[overlap], lo[overlap], hi[overlap])]
 
     def get_smallest_dx(self):
         """
@@ -205,36 +292,10 @@ class GridIndex(Index):
         Returns the values [field1, field2,...] of the fields at the given
         (x, y, z) points. Returns a numpy array of field values cross coords
         """
-        coords = self.ds.arr(ensure_numpy_array(coords), 'code_length')
-        grids = self._find_points(coords[:, 0], coords[:, 1], coords[:, 2])[0]
-        fields = ensure_list(fields)
-        mark = np.zeros(3, dtype=np.int)
-        out = []
-
-        # create point -> grid mapping
-        grid_index = {}
-        for coord_index, grid in enumerate(grids):
-            if grid not in grid_index:
-                grid_index[grid] = []
-            grid_index[grid].append(coord_index)
-
-        out = []
-        for field in fields:
-            funit = self.ds._get_field_info(field).units
-            out.append(self.ds.arr(np.empty((len(coords))), funit))
-
-        for grid in grid_index:
-            cellwidth = (grid.RightEdge - grid.LeftEdge) / grid.ActiveDimensions
-            for field_index, field in enumerate(fields):
-                for coord_index in grid_index[grid]:
-                    mark = ((coords[coord_index, :] - grid.LeftEdge) / cellwidth)
-                    mark = np.array(mark, dtype='int64')
-                    out[field_index][coord_index] = \
-                        grid[field][mark[0], mark[1], mark[2]]
-        if len(fields) == 1:
-            return out[0]
-        return out
-
+        values = PointSampler(self.ds, method="nearest").sample(fields, coords)
+        if len(ensure_list(fields)) == 1:
+            return values[0]
+        return values
 
     def _find_points(self, x, y, z) :
         """
@@ -252,30 +313,80 @@ class GridIndex(Index):
         return self.grids[ind], ind
 
     def _get_grid_tree(self):
-
-        left_edge = self.ds.arr(np.zeros((self.num_grids, 3)),
-                               'code_length')
-        right_edge = self.ds.arr(np.zeros((self.num_grids, 3)),
-                                'code_length')
-        level = np.zeros((self.num_grids), dtype='int64')
-        parent_ind = np.zeros((self.num_grids), dtype='int64')
-        num_children = np.zeros((self.num_grids), dtype='int64')
-        dimensions = np.zeros((self.num_grids, 3), dtype="int32")
-
-        for i, grid in enumerate(self.grids) :
-
-            left_edge[i,:] = grid.LeftEdge
-            right_edge[i,:] = grid.RightEdge
-            level[i] = grid.Level
-            if grid.Parent is None :
-                parent_ind[i] = -1
-            else :
-                parent_ind[i] = grid.Parent.id - grid.Parent._id_offset
-            num_children[i] = np.int64(len(grid.Children))
-            dimensions[i,:] = grid.ActiveDimensions
-
+        if self._grid_tree is None:
+            self._grid_tree = self._build_grid_tree()
+        return self._grid_tree
+
+    def _build_grid_tree(self):
+        # The edges, levels and dimensions come straight from the index
+        # arrays; only the links between grids need the grid objects.
+        left_edge = self.grid_left_edge.d.astype("float64")
+        right_edge = self.grid_right_edge.d.astype("float64")
+        dimensions = self.grid_dimensions.astype("int32")
+        level = self.grid_levels[:,0].astype("int64")
+        parent_ind = np.zeros(self.num_grids, dtype='int64') - 1
+        # The tree can only select cells for us if it masks the same cells
+        # by child grids as each grid's child_mask does.
+        selectable = True
+        children = []
+        for i, grid in enumerate(self.grids):
+            if grid.id - grid._id_offset != i or grid.OverlappingSiblings:
+                selectable = False
+            parent = grid.Parent
+            if isinstance(parent, list):
+                if len(parent) > 1:
+                    selectable = False
+                parent = parent[0] if len(parent) > 0 else None
+            if parent is not None:
+                parent_ind[i] = parent.id - parent._id_offset
+            children.append([c.id - c._id_offset for c in grid.Children])
+        num_children = np.bincount(parent_ind[parent_ind >= 0],
+                                   minlength=self.num_grids).astype("int64")
+        for i, ci in enumerate(children):
+            if len(ci) != num_children[i] or np.any(parent_ind[ci] != i):
+                selectable = False
+        dds = (right_edge - left_edge) / dimensions
+        start_index = np.rint(
+            (left_edge - self.ds.domain_left_edge.d) / dds).astype("int64")
+        refine_by = np.unique(np.asarray(self.ds.refine_by))
+        if refine_by.size != 1:
+            selectable = False
+        refine_by = int(refine_by[0])
+        has_parent = parent_ind >= 0
+        nd = self.ds.dimensionality
+        ratio = dds[parent_ind[has_parent], :nd] / dds[has_parent, :nd]
+        if not np.allclose(ratio, refine_by):
+            selectable = False
+        self._grid_tree_selectable = selectable
         return GridTree(self.num_grids, left_edge, right_edge, dimensions,
-                        parent_ind, level, num_children)
+                        parent_ind, level, num_children,
+                        start_index = start_index, refine_by = refine_by)
+
+    def _get_tree_selection(self, dobj):
+        # The cells of all of the grids of dobj that its selector selects,
+        # found in a single pass over the grid tree.  Selectors with a
+        # fill_mask of their own pick cells differently from the tree
+        # visitors, so each of their grids keeps building its own mask.
+        if not ytcfg.getboolean("yt", "grid_tree_selection"):
+            return None
+        selector = dobj.selector
+        if selector is None or \
+           type(selector).fill_mask is not SelectorObject.fill_mask:
+            return None
+        tree = self._get_grid_tree()
+        if not self._grid_tree_selectable:
+            return None
+        if self._tree_selections is None:
+            self._tree_selections = weakref.WeakValueDictionary()
+        grid_ind = np.array([g.id - g._id_offset for g in dobj._chunk_info],
+                            dtype="int64")
+        key = hash(selector)
+        selection = self._tree_selections.get(key)
+        if selection is None or \
+           not np.array_equal(selection.grid_ind, grid_ind):
+            selection = GridTreeSelection(tree, selector, grid_ind)
+            self._tree_selections[key] = selection
+        return selection
 
     def convert(self, unit):
         return self.dataset.conversion_factors[unit]
@@ -297,9 +408,8 @@ class GridIndex(Index):
             dobj._chunk_info = np.empty(len(grids), dtype='object')
             for i, g in enumerate(grids):
                 dobj._chunk_info[i] = g
-        # These next two lines, when uncommented, turn "on" the fast index.
-        #if dobj._type_name != "grid":
-        #    fast_index = self._get_grid_tree()
+        if dobj._type_name != "grid":
+            fast_index = self._get_tree_selection(dobj)
         if getattr(dobj, "size", None) is None:
             dobj.size = self._count_selection(dobj, fast_index = fast_index)
         if getattr(dobj, "shape", None) is None:
@@ -379,9 +489,13 @@ class GridIndex(Index):
             gs = gfiles[fn]
             for grids in (gs[pos:pos + size] for pos
                           in range(0, len(gs), size)):
+                chunk_index = None
+                if fast_index is not None:
+                    chunk_index = fast_index.subset(
+                        [g.id - g._id_offset for g in grids])
                 dc = YTDataChunk(dobj, "io", grids,
-                        self._count_selection(dobj, grids),
-                        cache = cache, fast_index = fast_index)
+                        self._count_selection(dobj, grids, chunk_index),
+                        cache = cache, fast_index = chunk_index)
                 # We allow four full chunks to be included.
                 with self.io.preload(dc, preload_fields, 
                             4.0 * size):
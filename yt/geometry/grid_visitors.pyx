@@ -53,7 +53,10 @@ cdef void setup_tuples(GridVisitorData *data) nogil:
         # Now we fill them in
         for j in range(3):
             si = (c.start_index[j] / data.ref_factor) - g.start_index[j]
-            ei = si + c.dims[j]/data.ref_factor - 1
+            ei = (c.start_index[j] + c.dims[j]) / data.ref_factor \
+               - g.start_index[j] - 1
+            # A child smaller than one of our cells still covers that cell.
+            if ei < si: ei = si
             data.child_tuples[i][j*2+0] = iclip(si, 0, g.dims[j] - 1)
             data.child_tuples[i][j*2+1] = iclip(ei, 0, g.dims[j] - 1)
     data.n_tuples = g.num_children
@@ -97,7 +100,8 @@ cdef void mask_cells(GridVisitorData *data, np.uint8_t selected) nogil:
     if selected == 0: return
     cdef np.uint8_t *mask = <np.uint8_t*> data.array
     ba_set_value(mask, data.global_index, 1)
-    # No need to increment anything.
+    # We keep count of the cells we have set, too.
+    data.index += 1
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
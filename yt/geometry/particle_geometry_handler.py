@@ -15,20 +15,75 @@ Particle-only geometry handler
 #-----------------------------------------------------------------------------
 
 import collections
+import hashlib
+import multiprocessing
 import numpy as np
 import os
+import shutil
+import sys
+import tempfile
 import weakref
 
+from yt.config import ytcfg
 from yt.funcs import only_on_root
+from yt.utilities.on_demand_imports import _h5py as h5py
 from yt.utilities.logger import ytLogger as mylog
 from yt.data_objects.octree_subset import ParticleOctreeSubset
 from yt.geometry.geometry_handler import Index, YTDataChunk
 from yt.geometry.particle_oct_container import \
-    ParticleOctreeContainer, ParticleRegions
+    ParticleOctreeContainer, ParticleBitmap
+
+# The index whose files are being processed by forked Morton workers.
+_morton_index = None
+
+def _morton_worker(args, index = None):
+    file_id, spill_dir = args
+    if index is None:
+        # We are in a forked worker, so anything recorded in the bitmap here
+        # has to be sent back to the parent.
+        index = _morton_index
+    morton = index.io._initialize_index(index.data_files[file_id],
+                                        index.regions)
+    if morton is None:
+        morton = np.empty(0, dtype="uint64")
+    morton.sort()
+    keys = index.regions.file_keys(file_id)
+    if spill_dir is not None:
+        np.save(os.path.join(spill_dir, "%08i.npy" % file_id), morton)
+        morton = None
+    return file_id, keys, morton
+
+def merge_sorted_runs(runs, block_size):
+    """
+    Yield the values of several sorted one-dimensional arrays (for instance
+    memory-mapped spill files) as a sequence of sorted blocks, holding no
+    more than *block_size* values from each run in memory at a time.
+    """
+    runs = [r for r in runs if r.size > 0]
+    pos = [0] * len(runs)
+    while True:
+        active = [i for i in range(len(runs)) if pos[i] < runs[i].size]
+        if len(active) == 0:
+            return
+        blocks = [runs[i][pos[i]:pos[i] + block_size] for i in active]
+        # Nothing left in any run can be smaller than the smallest of the
+        # block maxima, so everything up to it is final.
+        cut = min(b[-1] for b in blocks)
+        out = []
+        for i, b in zip(active, blocks):
+            n = np.searchsorted(b, cut, side="right")
+            out.append(b[:n])
+            pos[i] += n
+        out = np.concatenate(out)
+        out.sort()
+        yield out
 
 class ParticleIndex(Index):
     """The Index subclass for particle datasets"""
     _global_mesh = False
+    # The Morton orders of the coarse and refined cells of the file bitmap.
+    _bitmap_order1 = 6
+    _bitmap_order2 = 3
 
     def __init__(self, ds, dataset_type):
         self.dataset_type = dataset_type
@@ -96,46 +151,206 @@ class ParticleIndex(Index):
         only_on_root(mylog.info, "Allocating for %0.3e particles "
                                  "(index particle type '%s')",
                      self.total_particles, index_ptype)
-        # No more than 256^3 in the region finder.
-        N = min(len(self.data_files), 256) 
-        self.regions = ParticleRegions(
+        self.regions = ParticleBitmap(
                 ds.domain_left_edge, ds.domain_right_edge,
-                [N, N, N], len(self.data_files))
-        self._initialize_indices()
-        self.oct_handler.finalize()
+                len(self.data_files), self._bitmap_order1,
+                self._bitmap_order2)
+        if not self._load_index_cache():
+            self._initialize_indices()
+            self.oct_handler.finalize()
+            self.regions.finalize()
+            self._save_index_cache()
         self.max_level = self.oct_handler.max_level
         self.dataset.max_level = self.max_level
         tot = sum(self.oct_handler.recursively_count().values())
         only_on_root(mylog.info, "Identified %0.3e octs", tot)
 
     def _initialize_indices(self):
-        # This will be replaced with a parallel-aware iteration step.
-        # Roughly outlined, what we will do is:
-        #   * Generate Morton indices on each set of files that belong to
-        #     an individual processor
-        #   * Create a global, accumulated histogram
-        #   * Cut based on estimated load balancing
-        #   * Pass particles to specific processors, along with NREF buffer
+        # Roughly outlined, what we do is:
+        #   * Generate sorted Morton indices for each file, spreading the
+        #     files over MPI ranks or a local process pool
+        #   * If they do not fit in memory, spill each file's indices to disk
+        #     and k-way merge them in blocks
+        #   * Add the globally sorted indices to the octree on one processor
         #   * Broadcast back a serialized octree to join
-        #
-        # For now we will do this in serial.
         index_ptype = self.index_ptype
         # Set the index_ptype attribute of self.io dynamically here, so we don't
         # need to assume that the dataset has the attribute.
         self.io.index_ptype = index_ptype
-        morton = np.empty(self.total_particles, dtype="uint64")
-        ind = 0
-        for data_file in self.data_files:
-            if index_ptype == "all":
-                npart = sum(data_file.total_particles.values())
-            else:
-                npart = data_file.total_particles[index_ptype]
-            morton[ind:ind + npart] = \
-                self.io._initialize_index(data_file, self.regions)
-            ind += npart
-        morton.sort()
-        # Now we add them all at once.
-        self.oct_handler.add(morton)
+        max_keys = ytcfg.getint("yt", "particle_index_memory") * 1024**2 // 8
+        spill = self.total_particles > max_keys
+        spill_dir = None
+        if spill:
+            spill_dir = ytcfg.get("yt", "particle_index_spill_dir") or None
+            if self.comm.rank == 0:
+                spill_dir = tempfile.mkdtemp(prefix="yt_morton_",
+                                             dir=spill_dir)
+            spill_dir = self.comm.mpi_bcast(spill_dir)
+        try:
+            runs = self._generate_morton_runs(spill_dir)
+            if not spill:
+                # Everything fits, so every processor sorts and adds all the
+                # indices at once.
+                morton = self.comm.par_combine_object(
+                    np.concatenate(runs + [np.empty(0, dtype="uint64")]),
+                    datatype = "array", op = "cat")
+                morton.sort()
+                self.oct_handler.add(morton)
+                return
+            self.comm.barrier()
+            if self.comm.rank == 0:
+                runs = [np.load(os.path.join(spill_dir, fn), mmap_mode="r")
+                        for fn in sorted(os.listdir(spill_dir))]
+                block_size = max(max_keys // max(len(runs), 1), 1)
+                n_ref = self.oct_handler.n_ref
+                context = np.empty(0, dtype="uint64")
+                for block in merge_sorted_runs(runs, block_size):
+                    self.oct_handler.add(np.concatenate([context, block]),
+                                         context.size)
+                    context = np.concatenate([context, block])[-n_ref:]
+                del runs
+        finally:
+            self.comm.barrier()
+            if spill_dir is not None and self.comm.rank == 0:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+        if self.comm.size > 1:
+            # Only the root built the octree; everybody else rebuilds it from
+            # its refinement mask.
+            header = None
+            if self.comm.rank == 0:
+                header = self.oct_handler.save_octree()
+                header["n_ref"] = self.oct_handler.n_ref
+            header = self.comm.mpi_bcast(header)
+            if self.comm.rank != 0:
+                self.oct_handler = ParticleOctreeContainer.load_octree(header)
+
+    def _generate_morton_runs(self, spill_dir = None):
+        """
+        Compute the sorted Morton indices of the particles in each data file
+        and fill in the file bitmap.  Files are split between MPI ranks and,
+        within a rank, over ``particle_index_nprocs`` local processes.  If
+        *spill_dir* is given each file's indices are written there instead
+        of being returned.
+        """
+        my_files = [i for i in range(len(self.data_files))
+                    if i % self.comm.size == self.comm.rank]
+        nprocs = ytcfg.getint("yt", "particle_index_nprocs")
+        if nprocs < 1:
+            nprocs = multiprocessing.cpu_count()
+        nprocs = min(nprocs, len(my_files))
+        global _morton_index
+        if nprocs > 1 and not sys.platform.startswith("win"):
+            # The workers are forked, so they inherit this index rather than
+            # having to pickle it.
+            _morton_index = self
+            pool = multiprocessing.Pool(nprocs)
+            try:
+                results = pool.map(_morton_worker,
+                                   [(i, spill_dir) for i in my_files])
+            finally:
+                pool.close()
+                pool.join()
+                _morton_index = None
+        else:
+            results = [_morton_worker((i, spill_dir), self)
+                       for i in my_files]
+        if self.comm.size > 1 or nprocs > 1:
+            # Each file's bitmap cells were recorded elsewhere, so gather
+            # them all here.
+            keys = self.comm.par_combine_object(
+                [(i, k) for i, k, _ in results], datatype = "list",
+                op = "cat")
+            for file_id, k in keys:
+                self.regions.set_file_keys(file_id, k)
+        return [morton for _, _, morton in results if morton is not None]
+
+    _index_cache_version = 2
+    _bitmap_arrays = ("coarse_keys", "coarse_files", "collisions",
+                      "fine_keys", "fine_files")
+
+    @property
+    def index_cache_filename(self):
+        """
+        The sidecar file the finished octree and file bitmap are cached in.
+        This is None if any of the data files does not exist on disk, as is
+        the case for in-memory and remote datasets.
+        """
+        if not ytcfg.getboolean("yt", "cache_particle_index"):
+            return None
+        if not all(os.path.isfile(df.filename) for df in self.data_files):
+            return None
+        ds = self.dataset
+        return "%s.index%s_%s.h5" % (self.index_filename, ds.n_ref,
+                                     ds.over_refine_factor)
+
+    def _index_cache_key(self):
+        # Hashing the full contents of every data file would cost more than
+        # rebuilding the index, so we fingerprint the files by name, size and
+        # modification time along with every input to the octree build.
+        ds = self.dataset
+        m = hashlib.md5()
+        key = [self._index_cache_version, ds._hash(), ds.n_ref,
+               ds.over_refine_factor, self.index_ptype, ds.filter_bbox,
+               self.regions.order1, self.regions.order2,
+               tuple(ds.domain_left_edge.in_units("code_length").d),
+               tuple(ds.domain_right_edge.in_units("code_length").d)]
+        for df in self.data_files:
+            st = os.stat(df.filename)
+            key.append((os.path.basename(df.filename), st.st_size,
+                        int(st.st_mtime)))
+        m.update(repr(key).encode("utf-8"))
+        return m.hexdigest()
+
+    def _load_index_cache(self):
+        fn = self.index_cache_filename
+        if fn is None or not os.path.isfile(fn):
+            return False
+        try:
+            f = h5py.File(fn, "r")
+        except IOError:
+            return False
+        with f:
+            key = f.attrs.get("cache_key")
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            if key != self._index_cache_key():
+                mylog.info("Particle index cache %s is out of date, "
+                           "rebuilding.", fn)
+                return False
+            header = dict((k, f.attrs[k]) for k in
+                          ("dims", "left_edge", "right_edge", "over_refine",
+                           "n_ref"))
+            header["octree"] = f["octree"][:]
+            for k in self._bitmap_arrays:
+                setattr(self.regions, k, f["bitmap"][k][:])
+        self.io.index_ptype = self.index_ptype
+        self.oct_handler = ParticleOctreeContainer.load_octree(header)
+        only_on_root(mylog.info, "Loaded particle index from %s", fn)
+        return True
+
+    def _save_index_cache(self):
+        fn = self.index_cache_filename
+        if fn is None or self.comm.rank != 0:
+            return
+        header = self.oct_handler.save_octree()
+        try:
+            f = h5py.File(fn, "w")
+        except IOError:
+            mylog.debug("Could not write particle index cache %s.", fn)
+            return
+        with f:
+            for k in ("dims", "left_edge", "right_edge", "over_refine"):
+                f.attrs[k] = header[k]
+            f.attrs["n_ref"] = self.oct_handler.n_ref
+            f.attrs["cache_key"] = self._index_cache_key()
+            f.create_dataset("octree", data=header["octree"],
+                             compression="gzip")
+            g = f.create_group("bitmap")
+            for k in self._bitmap_arrays:
+                arr = getattr(self.regions, k)
+                g.create_dataset(k, data=arr,
+                                 compression="gzip" if arr.size else None)
+        mylog.info("Saved particle index to %s", fn)
 
     def _detect_output_fields(self):
         # TODO: Add additional fields
@@ -24,6 +24,7 @@ import numpy as np
 from selection_routines cimport SelectorObject
 cimport cython
 from cython cimport floating
+from yt.utilities.lib.geometry_utils import compute_morton
 
 cdef class ParticleOctreeContainer(OctreeContainer):
     cdef Oct** oct_list
@@ -100,12 +101,66 @@ cdef class ParticleOctreeContainer(OctreeContainer):
     def allocate_domains(self, domain_counts):
         pass
 
+    @classmethod
+    def load_octree(cls, header):
+        # This rebuilds a finalized particle octree from the depth-first
+        # refinement mask written by save_octree.  Refined octs always have
+        # all eight children allocated, so the mask fully determines the
+        # structure and we do not need to re-add any particles.
+        cdef np.ndarray[np.uint8_t, ndim=1] ref_mask
+        ref_mask = np.ascontiguousarray(header['octree'], dtype="uint8")
+        cdef ParticleOctreeContainer obj = cls(header['dims'],
+                header['left_edge'], header['right_edge'],
+                over_refine = header['over_refine'])
+        obj.n_ref = header.get('n_ref', 64)
+        obj.allocate_root()
+        cdef int i, j, k
+        cdef np.int64_t pos = 0
+        cdef np.int64_t nmask = ref_mask.shape[0]
+        for i in range(obj.nn[0]):
+            for j in range(obj.nn[1]):
+                for k in range(obj.nn[2]):
+                    pos = obj.visit_load(obj.root_mesh[i][j][k],
+                            <np.uint8_t *> ref_mask.data, pos, nmask)
+        if pos != nmask:
+            raise KeyError(nmask, pos)
+        obj.finalize()
+        return obj
+
+    cdef np.int64_t visit_load(self, Oct *o, np.uint8_t *ref_mask,
+                               np.int64_t pos, np.int64_t nmask) except -1:
+        cdef int i, j, k
+        cdef Oct *noct
+        if pos >= nmask:
+            raise KeyError(nmask, pos)
+        if ref_mask[pos] == 0:
+            return pos + 1
+        pos += 1
+        o.children = <Oct **> malloc(sizeof(Oct *)*8)
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+                    noct = self.allocate_oct()
+                    noct.domain = o.domain
+                    noct.file_ind = 0
+                    o.children[cind(i,j,k)] = noct
+        # Children are stored in the same order recursively_visit_octs walks
+        # them.
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+                    pos = self.visit_load(o.children[cind(i,j,k)], ref_mask,
+                                          pos, nmask)
+        return pos
+
     def finalize(self):
         #This will sort the octs in the oct list
         #so that domains appear consecutively
         #And then find the oct index/offset for
         #every domain
         cdef int max_level = 0
+        # Finalizing twice (e.g. after load_octree) just rebuilds the list.
+        free(self.oct_list)
         self.oct_list = <Oct**> malloc(sizeof(Oct*)*self.nocts)
         cdef np.int64_t i = 0, lpos = 0
         cdef int cur_dom = -1
@@ -156,17 +211,21 @@ cdef class ParticleOctreeContainer(OctreeContainer):
     @cython.boundscheck(False)
     @cython.wraparound(False)
     @cython.cdivision(True)
-    def add(self, np.ndarray[np.uint64_t, ndim=1] indices):
+    def add(self, np.ndarray[np.uint64_t, ndim=1] indices,
+            np.int64_t ncontext = 0):
         #Add this particle to the root oct
         #Then if that oct has children, add it to them recursively
         #If the child needs to be refined because of max particles, do so
+        #The first ncontext indices were already added in a previous call;
+        #they are only used when counting particles in newly refined octs,
+        #so that adding a sorted array in blocks matches adding it at once.
         cdef np.int64_t no = indices.shape[0], p, index
         cdef int i, level
         cdef int ind[3]
         if self.root_mesh[0][0][0] == NULL: self.allocate_root()
         cdef np.uint64_t *data = <np.uint64_t *> indices.data
         cdef np.uint64_t FLAG = ~(<np.uint64_t>0)
-        for p in range(no):
+        for p in range(ncontext, no):
             # We have morton indices, which means we choose left and right by
             # looking at (MAX_ORDER - level) & with the values 1, 2, 4.
             level = 0
@@ -354,3 +413,154 @@ cdef class ParticleRegions:
                     files.append(fcheck + n * 64)
         return files
 
+
+cdef np.uint64_t _compact1 = 0x1249249249249249
+cdef np.uint64_t _compact2 = 0x10c30c30c30c30c3
+cdef np.uint64_t _compact4 = 0x100f00f00f00f00f
+cdef np.uint64_t _compact8 = 0x001f0000ff0000ff
+cdef np.uint64_t _compact16 = 0x001f00000000ffff
+cdef np.uint64_t _compact32 = 0x00000000001fffff
+
+@cython.cdivision(True)
+cdef inline np.uint64_t compact_bits(np.uint64_t x):
+    # This is the inverse of spread_bits in geometry_utils: it gathers every
+    # third bit of x back into a contiguous integer.
+    x &= _compact1
+    x = (x ^ (x >> 2)) & _compact2
+    x = (x ^ (x >> 4)) & _compact4
+    x = (x ^ (x >> 8)) & _compact8
+    x = (x ^ (x >> 16)) & _compact16
+    x = (x ^ (x >> 32)) & _compact32
+    return x
+
+cdef class ParticleBitmap:
+    # This records which data files have particles in which parts of the
+    # domain, at two levels.  Cells are identified by their Morton index.  At
+    # the coarse level (order1) we keep the sorted list of cells each file has
+    # particles in.  Coarse cells that hold particles from more than one file
+    # are collisions, and for those we also keep the sorted list of refined
+    # cells (order1 + order2) each file has particles in.  Unlike the dense
+    # masks of ParticleRegions, the size of this scales with the number of
+    # occupied cells rather than with the number of files times the mesh.
+    cdef np.float64_t left_edge[3]
+    cdef np.float64_t right_edge[3]
+    cdef public int order1
+    cdef public int order2
+    cdef public np.uint64_t nfiles
+    cdef object file_keys_list
+    cdef public object coarse_keys
+    cdef public object coarse_files
+    cdef public object collisions
+    cdef public object fine_keys
+    cdef public object fine_files
+
+    def __init__(self, left_edge, right_edge, nfiles, int order1 = 6,
+                 int order2 = 3):
+        cdef int i
+        if order1 + order2 > ORDER_MAX:
+            raise RuntimeError("order1 + order2 must be at most %s" %
+                               ORDER_MAX)
+        self.nfiles = nfiles
+        self.order1 = order1
+        self.order2 = order2
+        for i in range(3):
+            self.left_edge[i] = left_edge[i]
+            self.right_edge[i] = right_edge[i]
+        self.file_keys_list = [[] for i in range(nfiles)]
+
+    def add_data_file(self, np.ndarray pos, int file_id, int filter = 0):
+        LE = [self.left_edge[i] for i in range(3)]
+        RE = [self.right_edge[i] for i in range(3)]
+        morton = compute_morton(pos[:,0], pos[:,1], pos[:,2], LE, RE, filter)
+        self.add_morton(morton, file_id)
+
+    def add_morton(self, np.ndarray[np.uint64_t, ndim=1] morton, int file_id):
+        cdef np.uint64_t FLAG = ~(<np.uint64_t>0)
+        morton = morton[morton != FLAG]
+        shift = np.uint64(3 * (ORDER_MAX - self.order1 - self.order2))
+        self.file_keys_list[file_id].append(np.unique(morton >> shift))
+
+    def file_keys(self, int file_id):
+        """Return the sorted refined cells that a data file touches."""
+        keys = self.file_keys_list[file_id]
+        if len(keys) == 0:
+            return np.empty(0, dtype="uint64")
+        elif len(keys) > 1:
+            keys = [np.unique(np.concatenate(keys))]
+            self.file_keys_list[file_id] = keys
+        return keys[0]
+
+    def set_file_keys(self, int file_id, keys):
+        self.file_keys_list[file_id] = [keys]
+
+    def finalize(self):
+        cdef int i
+        shift = np.uint64(3 * self.order2)
+        coarse_keys, coarse_files, fine_keys, fine_files = [], [], [], []
+        for i in range(self.nfiles):
+            fine = self.file_keys(i)
+            coarse = np.unique(fine >> shift)
+            coarse_keys.append(coarse)
+            coarse_files.append(np.zeros(coarse.size, dtype="int64") + i)
+            fine_keys.append(fine)
+            fine_files.append(np.zeros(fine.size, dtype="int64") + i)
+        self.coarse_keys = np.concatenate(coarse_keys)
+        self.coarse_files = np.concatenate(coarse_files)
+        cells, counts = np.unique(self.coarse_keys, return_counts=True)
+        self.collisions = cells[counts > 1]
+        # We only need the refined cells inside collisions.
+        fine_keys = np.concatenate(fine_keys)
+        fine_files = np.concatenate(fine_files)
+        keep = np.in1d(fine_keys >> shift, self.collisions)
+        self.fine_keys = fine_keys[keep]
+        self.fine_files = fine_files[keep]
+        self.file_keys_list = None
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    @cython.cdivision(True)
+    def select_cells(self, SelectorObject selector,
+                     np.ndarray[np.uint64_t, ndim=1] keys, int order):
+        cdef np.ndarray[np.uint8_t, ndim=1] selected
+        cdef np.float64_t LE[3]
+        cdef np.float64_t RE[3]
+        cdef np.float64_t dds[3]
+        cdef np.uint64_t ind[3]
+        cdef np.uint64_t key
+        cdef np.int64_t n
+        cdef int i
+        selected = np.zeros(keys.shape[0], dtype="uint8")
+        for i in range(3):
+            dds[i] = (self.right_edge[i] - self.left_edge[i]) \
+                   / (<np.uint64_t>1 << order)
+        for n in range(keys.shape[0]):
+            key = keys[n]
+            ind[0] = compact_bits(key >> 2)
+            ind[1] = compact_bits(key >> 1)
+            ind[2] = compact_bits(key)
+            for i in range(3):
+                LE[i] = self.left_edge[i] + ind[i] * dds[i]
+                RE[i] = LE[i] + dds[i]
+            if selector.select_grid(LE, RE, 0) == 1:
+                selected[n] = 1
+        return selected.astype("bool")
+
+    def identify_data_files(self, SelectorObject selector):
+        shift = np.uint64(3 * self.order2)
+        cells, inverse = np.unique(self.coarse_keys, return_inverse=True)
+        selected = self.select_cells(selector, cells, self.order1)
+        hit = selected[inverse]
+        # Files with particles in a selected cell that no other file shares
+        # are definitely needed.
+        collides = np.in1d(self.coarse_keys, self.collisions)
+        files = set(self.coarse_files[hit & ~collides])
+        # For selected collision cells we look at the refined cells.
+        ccells = np.intersect1d(cells[selected], self.collisions)
+        if ccells.size > 0:
+            candidates = np.in1d(self.fine_keys >> shift, ccells)
+            fcells, inverse = np.unique(self.fine_keys[candidates],
+                                        return_inverse=True)
+            selected = self.select_cells(selector, fcells,
+                                         self.order1 + self.order2)
+            files.update(self.fine_files[candidates][selected[inverse]])
+        return sorted(int(f) for f in files)
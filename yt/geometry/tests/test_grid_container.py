@@ -15,8 +15,9 @@ Tests for GridTree
 import numpy as np
 import random
 
+from yt.config import ytcfg
 from yt.testing import \
-    assert_equal, assert_raises
+    assert_allclose, assert_equal, assert_raises
 from yt.frontends.stream.api import \
     load_amr_grids
 
@@ -124,3 +125,41 @@ def test_grid_arrays_view():
     assert_equal(grid_arr['right_edge'], ds.index.grid_right_edge)
     assert_equal(grid_arr['dims'], ds.index.grid_dimensions)
     assert_equal(grid_arr['level'], ds.index.grid_levels[:,0])
+
+def test_grid_tree_selection():
+    ds = setup_test_ds()
+    objs = [ds.all_data(), ds.sphere([0.4, 0.45, 0.5], 0.15),
+            ds.region([0.5, 0.5, 0.5], [0.3, 0.35, 0.4], [0.7, 0.65, 0.6])]
+    for dobj in objs:
+        ds.index._identify_base_chunk(dobj)
+        selection = dobj._current_chunk._fast_index
+        assert selection is not None
+        # Everything should match what each grid selects on its own.
+        icoords, ires, fcoords, dens = [], [], [], []
+        for g in dobj._chunk_info:
+            gi = g.id - g._id_offset
+            mask = dobj.selector.fill_mask(g)
+            assert_equal(selection.grid_mask(gi), mask)
+            if mask is None:
+                continue
+            assert_equal(selection.grid_count(gi), mask.sum())
+            ind = np.array(np.where(mask)).T
+            icoords.append(ind + g.get_global_startindex())
+            ires.append(np.zeros(ind.shape[0], dtype="int64") + g.Level)
+            fcoords.append(g.fcoords[mask.ravel()].d)
+            dens.append(g["density"][mask])
+        assert_equal(dobj.size, sum(c.shape[0] for c in icoords))
+        assert_equal(dobj.icoords, np.concatenate(icoords))
+        assert_equal(dobj.ires, np.concatenate(ires))
+        assert_allclose(dobj.fcoords.d, np.concatenate(fcoords))
+        assert_equal(dobj["density"], np.concatenate(dens))
+
+    old = ytcfg.get("yt", "grid_tree_selection")
+    try:
+        ytcfg["yt", "grid_tree_selection"] = "False"
+        sp = ds.sphere([0.4, 0.45, 0.5], 0.15)
+        ds.index._identify_base_chunk(sp)
+        assert sp._current_chunk._fast_index is None
+        assert_equal(sp.size, objs[1].size)
+    finally:
+        ytcfg["yt", "grid_tree_selection"] = old
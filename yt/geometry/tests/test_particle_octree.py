@@ -21,7 +21,9 @@ from yt.geometry.oct_container import \
     OctreeContainer
 from yt.geometry.particle_oct_container import \
     ParticleOctreeContainer, \
-    ParticleRegions
+    ParticleRegions, \
+    ParticleBitmap
+from yt.geometry.particle_geometry_handler import merge_sorted_runs
 from yt.geometry.oct_container import _ORDER_MAX
 from yt.geometry.selection_routines import RegionSelector, AlwaysSelector
 from yt.testing import \
@@ -94,6 +96,68 @@ def test_save_load_octree():
     fw2 = loaded.fwidth(always)
     assert_equal(fw1, fw2)
 
+def test_save_load_particle_octree():
+    np.random.seed(int(0x4d3d3d3))
+    pos = np.random.normal(0.5, scale=0.05, size=(NPART,3)) * (DRE-DLE) + DLE
+    octree = ParticleOctreeContainer((1, 1, 1), DLE, DRE)
+    octree.n_ref = 32
+    for i in range(3):
+        np.clip(pos[:,i], DLE[i], DRE[i], pos[:,i])
+    pos = np.floor((pos - DLE)/dx).astype("uint64")
+    morton = get_morton_indices(pos)
+    morton.sort()
+    octree.add(morton)
+    octree.finalize()
+    saved = octree.save_octree()
+    saved['n_ref'] = octree.n_ref
+    loaded = ParticleOctreeContainer.load_octree(saved)
+    assert_equal(loaded.n_ref, octree.n_ref)
+    assert_equal(loaded.nocts, octree.nocts)
+    assert_equal(loaded.max_level, octree.max_level)
+    assert_equal(loaded.recursively_count(), octree.recursively_count())
+    always = AlwaysSelector(None)
+    for attr in ('ires', 'fcoords', 'fwidth'):
+        assert_equal(getattr(octree, attr)(always),
+                     getattr(loaded, attr)(always))
+
+def test_merge_sorted_runs():
+    np.random.seed(int(0x4d3d3d3))
+    runs = [np.sort(np.random.randint(0, 2**60, size=n).astype("uint64"))
+            for n in [0, 1, 17, 1000, 4096]]
+    for block_size in [1, 7, 256, 10000]:
+        blocks = list(merge_sorted_runs(runs, block_size))
+        for block in blocks:
+            assert block.size <= block_size * len(runs)
+        assert_equal(np.concatenate(blocks), np.sort(np.concatenate(runs)))
+
+def test_add_particles_blocks():
+    np.random.seed(int(0x4d3d3d3))
+    pos = np.random.normal(0.5, scale=0.05, size=(NPART,3)) * (DRE-DLE) + DLE
+    for i in range(3):
+        np.clip(pos[:,i], DLE[i], DRE[i], pos[:,i])
+    pos = np.floor((pos - DLE)/dx).astype("uint64")
+    morton = get_morton_indices(pos)
+    morton.sort()
+    octree1 = ParticleOctreeContainer((1, 1, 1), DLE, DRE)
+    octree1.n_ref = 32
+    octree1.add(morton)
+    octree1.finalize()
+    # Blocks both larger and smaller than n_ref, as merged runs give them
+    prng = np.random.RandomState(0x4d3d3d3)
+    cuts = np.sort(prng.randint(0, morton.size, 200))
+    for blocks in (np.array_split(morton, 17),
+                   np.array_split(morton, cuts),
+                   np.array_split(morton, morton.size // 5)):
+        octree2 = ParticleOctreeContainer((1, 1, 1), DLE, DRE)
+        octree2.n_ref = 32
+        context = np.empty(0, dtype="uint64")
+        for block in blocks:
+            octree2.add(np.concatenate([context, block]), context.size)
+            context = np.concatenate([context, block])[-octree2.n_ref:]
+        octree2.finalize()
+        assert_equal(octree1.recursively_count(),
+                     octree2.recursively_count())
+
 def test_particle_octree_counts():
     np.random.seed(int(0x4d3d3d3))
     # Eight times as many!
@@ -218,6 +282,38 @@ def test_particle_regions():
             assert_equal(maxs, mins)
             assert_equal(maxs, np.unique(mask))
 
+def test_particle_bitmap():
+    np.random.seed(int(0x4d3d3d3))
+    for nfiles in [2, 31, 127, 128, 129]:
+        reg = ParticleBitmap([0.0, 0.0, 0.0],
+                             [nfiles, nfiles, nfiles], nfiles)
+        Y, Z = np.mgrid[0.1 : nfiles - 0.1 : nfiles * 1j,
+                        0.1 : nfiles - 0.1 : nfiles * 1j]
+        X = 0.5 * np.ones(Y.shape, dtype="float64")
+        pos = np.array([X.ravel(),Y.ravel(),Z.ravel()],
+            dtype="float64").transpose()
+        for i in range(nfiles):
+            reg.add_data_file(pos, i)
+            pos[:,0] += 1.0
+        reg.finalize()
+        # Every file holds particles somewhere.
+        assert_equal(np.unique(reg.coarse_files), np.arange(nfiles))
+        fr = FakeRegion(nfiles)
+        for i in range(nfiles):
+            fr.set_edges(i)
+            selector = RegionSelector(fr)
+            df = reg.identify_data_files(selector)
+            # Coarse cells that are not aligned with the files may pull in a
+            # neighbor, but never anything further away.
+            assert i in df
+            assert_equal(np.abs(np.array(df) - i) <= 1, True)
+            if nfiles == 128:
+                # Every coarse cell is shared by two files, so the refined
+                # cells have to tell them apart.
+                assert_equal(df, [i])
+        selector = AlwaysSelector(None)
+        assert_equal(reg.identify_data_files(selector), list(range(nfiles)))
+
 def test_position_location():
     np.random.seed(int(0x4d3d3d3))
     pos = np.random.normal(0.5, scale=0.05, size=(NPART,3)) * (DRE-DLE) + DLE
@@ -30,7 +30,8 @@ from yt.units import electrostatic_unit, elementary_charge
 
 # dimensions
 from yt.units.dimensions import \
-    mass, length, time, temperature, energy, magnetic_field, power, rate
+    mass, length, time, temperature, energy, magnetic_field, power, rate, \
+    velocity, angle
 # functions
 from yt.units.unit_object import get_conversion_factor
 # classes
@@ -523,3 +524,27 @@ def test_creation_from_ytarray():
     assert_equal((u1/u2).base_value, electrostatic_unit/elementary_charge)
 
     assert_raises(UnitParseError, Unit, [1, 2, 3]*elementary_charge)
+
+def test_compact_arithmetic():
+    # Products, quotients and powers of units are computed without sympy,
+    # and should agree with the same units parsed from strings
+    pairs = [
+        (Unit("g")*Unit("cm")**-3, "g/cm**3"),
+        (Unit("km")/Unit("s")*Unit("s"), "km"),
+        (Unit("erg")**0.5*Unit("cm")**0.5, "sqrt(erg*cm)"),
+        (Unit("Msun")/Unit("pc")**3, "Msun/pc**3"),
+        (Unit("m")/Unit("m"), "1"),
+        (Unit("2*m")*Unit("3*s"), "6*m*s"),
+        (Unit("cm")**(1/3.), "cm**(1/3)"),
+    ]
+    for u1, expr in pairs:
+        u2 = Unit(expr)
+        assert_equal(str(u1), str(u2))
+        assert_equal(u1.dimensions, u2.dimensions)
+        assert_true(u1.same_dimensions_as(u2))
+        assert_equal(u1.is_atomic, u2.is_atomic)
+        assert_equal(u1.is_dimensionless, u2.is_dimensionless)
+        assert_almost_equal(u1.base_value, u2.base_value)
+    # known dimensions are returned as the objects in yt.units.dimensions
+    assert_true((Unit("cm")/Unit("s")).dimensions is velocity)
+    assert_true((Unit("radian")*Unit()).dimensions is angle)
@@ -21,9 +21,11 @@ from sympy.core.numbers import One
 from sympy import sympify, latex
 from sympy.parsing.sympy_parser import \
     parse_expr, auto_number, rationalize
+from fractions import Fraction
 from keyword import iskeyword
 from yt.units.dimensions import \
-    base_dimensions, temperature, \
+    base_dimensions, derived_dimensions, \
+    mass, length, time, temperature, \
     dimensionless, current_mks, \
     angle
 from yt.units.equivalencies import \
@@ -37,6 +39,7 @@ from yt.units.unit_registry import \
 from yt.utilities.exceptions import YTUnitsNotReducible
 
 import copy
+import numbers
 import token
 
 class InvalidUnitOperation(Exception):
@@ -161,8 +164,9 @@ class Unit(Expr):
     is_number = False
 
     # Extra attributes
-    __slots__ = ["expr", "is_atomic", "base_value", "base_offset", "dimensions",
-                 "registry", "_latex_repr"]
+    __slots__ = ["_expr", "is_atomic", "base_value", "base_offset",
+                 "_dimensions", "registry", "_latex_repr", "_coeff", "_terms",
+                 "_dimension_vector", "_hash"]
 
     def __new__(cls, unit_expr=sympy_one, base_value=None, base_offset=0.0,
                 dimensions=None, registry=None, latex_repr=None, **assumptions):
@@ -278,13 +282,23 @@ class Unit(Expr):
         obj = Expr.__new__(cls, **assumptions)
 
         # Attach attributes to obj.
-        obj.expr = unit_expr
+        obj._expr = unit_expr
         obj.is_atomic = is_atomic
         obj.base_value = base_value
         obj.base_offset = base_offset
-        obj.dimensions = dimensions
+        obj._dimensions = dimensions
         obj._latex_repr = latex_repr
         obj.registry = registry
+        obj._hash = None
+
+        # Keep the compact representation used for unit arithmetic, if the
+        # unit has one.
+        terms = _expr_terms(unit_expr)
+        if terms is None:
+            obj._coeff, obj._terms = None, None
+        else:
+            obj._coeff, obj._terms = terms
+        obj._dimension_vector = _dimension_vector(dimensions)
 
         if unit_key is not None:
             registry.unit_objs[unit_key] = obj
@@ -293,6 +307,42 @@ class Unit(Expr):
 
         return obj
 
+    @classmethod
+    def _from_terms(cls, coeff, terms, base_value, base_offset,
+                    dimension_vector, registry):
+        # Create a unit from its compact representation, skipping the
+        # parsing and validation done in __new__.
+        obj = Expr.__new__(cls)
+        obj._expr = None
+        obj.is_atomic = (coeff is sympy_one and len(terms) == 1 and
+                         list(terms.values())[0] == 1)
+        obj.base_value = float(base_value)
+        obj.base_offset = base_offset
+        obj._dimensions = None
+        obj._latex_repr = None
+        obj.registry = registry
+        obj._hash = None
+        obj._coeff = coeff
+        obj._terms = terms
+        obj._dimension_vector = dimension_vector
+        return obj
+
+    @property
+    def _is_compact(self):
+        return self._terms is not None and self._dimension_vector is not None
+
+    @property
+    def expr(self):
+        if self._expr is None:
+            self._expr = _terms_expr(self._coeff, self._terms)
+        return self._expr
+
+    @property
+    def dimensions(self):
+        if self._dimensions is None:
+            self._dimensions = _dimension_expr(self._dimension_vector)
+        return self._dimensions
+
     _latex_expr = None
     @property
     def latex_repr(self):
@@ -311,7 +361,13 @@ class Unit(Expr):
                 self.registry)
 
     def __hash__(self):
-        return super(Unit, self).__hash__()
+        if self._hash is None:
+            if self._terms is None:
+                key = self.expr
+            else:
+                key = (self._coeff, tuple(sorted(self._terms.items())))
+            self._hash = hash((key, self.base_value, self.registry))
+        return self._hash
 
     def _hashable_content(self):
         return (self.expr, self.is_atomic, self.base_value, self.dimensions,
@@ -355,6 +411,15 @@ class Unit(Expr):
                 raise InvalidUnitOperation("Quantities with units of Fahrenheit "
                                            "and Celsius or angles cannot be multiplied.")
 
+        if self._is_compact and u._is_compact:
+            return Unit._from_terms(
+                _multiply_coeffs(self._coeff, u._coeff),
+                _combine_terms(self._terms, u._terms, 1),
+                self.base_value * u.base_value, base_offset,
+                _add_dimension_vectors(self._dimension_vector,
+                                       u._dimension_vector, 1),
+                self.registry)
+
         return Unit(self.expr * u.expr,
                     base_value=(self.base_value * u.base_value),
                     base_offset=base_offset,
@@ -378,6 +443,17 @@ class Unit(Expr):
                 raise InvalidUnitOperation("Quantities with units of Farhenheit "
                                            "and Celsius cannot be multiplied.")
 
+        if self._is_compact and u._is_compact:
+            coeff = self._coeff
+            if u._coeff is not sympy_one:
+                coeff = coeff / u._coeff
+            return Unit._from_terms(
+                coeff, _combine_terms(self._terms, u._terms, -1),
+                self.base_value / u.base_value, base_offset,
+                _add_dimension_vectors(self._dimension_vector,
+                                       u._dimension_vector, -1),
+                self.registry)
+
         return Unit(self.expr / u.expr,
                     base_value=(self.base_value / u.base_value),
                     base_offset=base_offset,
@@ -388,6 +464,28 @@ class Unit(Expr):
 
     def __pow__(self, p):
         """ Take Unit to power p (float). """
+        if self._is_compact:
+            try:
+                if isinstance(p, numbers.Integral):
+                    p = int(p)
+                else:
+                    p = _power(Fraction(str(p)).limit_denominator())
+            except ValueError:
+                raise InvalidUnitOperation("Tried to take a Unit object to the " \
+                                           "power '%s' (type %s). Failed to cast " \
+                                           "it to a float." % (p, type(p)) )
+            coeff = self._coeff
+            if coeff is not sympy_one:
+                coeff = coeff**_sympy_power(p)
+            terms = dict((k, _power(v*p)) for k, v in self._terms.items()
+                         if v*p != 0)
+            vector = tuple(_power(d*p) for d in self._dimension_vector)
+            if isinstance(p, int):
+                base_value = self.base_value**p
+            else:
+                base_value = self.base_value**float(p)
+            return Unit._from_terms(coeff, terms, base_value, 0.0, vector,
+                                    self.registry)
         try:
             p = Rational(str(p)).limit_denominator()
         except ValueError:
@@ -403,8 +501,12 @@ class Unit(Expr):
         """ Test unit equality. """
         if not isinstance(u, Unit):
             return False
-        return \
-          (self.base_value == u.base_value and self.dimensions == u.dimensions)
+        if self.base_value != u.base_value:
+            return False
+        if self._dimension_vector is not None and \
+           u._dimension_vector is not None:
+            return self._dimension_vector == u._dimension_vector
+        return self.dimensions == u.dimensions
 
     def __ne__(self, u):
         """ Test unit inequality. """
@@ -412,6 +514,9 @@ class Unit(Expr):
             return True
         if self.base_value != u.base_value:
             return True
+        if self._dimension_vector is not None and \
+           u._dimension_vector is not None:
+            return self._dimension_vector != u._dimension_vector
         # use 'is' comparison dimensions to avoid expensive sympy operation
         if self.dimensions is u.dimensions:
             return False
@@ -437,6 +542,9 @@ class Unit(Expr):
 
     def same_dimensions_as(self, other_unit):
         """ Test if dimensions are the same. """
+        if self._dimension_vector is not None and \
+           getattr(other_unit, "_dimension_vector", None) is not None:
+            return self._dimension_vector == other_unit._dimension_vector
         # test first for 'is' equality to avoid expensive sympy operation
         if self.dimensions is other_unit.dimensions:
             return True
@@ -444,10 +552,14 @@ class Unit(Expr):
 
     @property
     def is_dimensionless(self):
+        if self._dimension_vector is not None:
+            return not any(self._dimension_vector)
         return self.dimensions is sympy_one
 
     @property
     def is_code_unit(self):
+        if self._terms is not None:
+            return all(symbol.startswith("code") for symbol in self._terms)
         for atom in self.expr.atoms():
             if str(atom).startswith("code") or atom.is_Number:
                 pass
@@ -482,7 +594,12 @@ class Unit(Expr):
         yt_base_unit = Unit(yt_base_unit_string, base_value=1.0,
                             dimensions=self.dimensions, registry=self.registry)
         if unit_system == "cgs":
-            if current_mks in self.dimensions.free_symbols:
+            if self._dimension_vector is not None:
+                has_current_mks = self._dimension_vector[
+                    _vector_dimensions.index(current_mks)] != 0
+            else:
+                has_current_mks = current_mks in self.dimensions.free_symbols
+            if has_current_mks:
                 raise YTUnitsNotReducible(self, "cgs")
             return yt_base_unit
         else:
@@ -667,6 +784,145 @@ def _lookup_unit_symbol(symbol_str, unit_symbol_lut):
         raise UnitParseError("Could not find unit symbol '%s' in the provided " \
                              "symbols." % symbol_str)
 
+#
+# Compact unit representation
+#
+# Besides its sympy expression, a unit made only of products and rational
+# powers of unit symbols keeps a numerical coefficient, a dict of the powers
+# of its symbols and a vector of the powers of its base dimensions.  Unit
+# arithmetic on these is plain integer and fraction arithmetic; the sympy
+# expressions are only built when they are asked for, e.g. for printing.
+
+# The base dimensions, in the order of the entries of a dimension vector.
+_vector_dimensions = (mass, length, time, temperature, angle, current_mks)
+
+_dimension_vectors = {}
+_dimension_exprs = {}
+
+def _power(value):
+    # Exponents are ints where possible and Fractions otherwise.
+    if isinstance(value, int):
+        return value
+    value = Fraction(value)
+    if value.denominator == 1:
+        return int(value.numerator)
+    return value
+
+def _sympy_power(power):
+    if isinstance(power, Fraction):
+        return Rational(power.numerator, power.denominator)
+    return Integer(power)
+
+def _dimension_vector(dimensions):
+    """
+    Return the powers of the base dimensions in *dimensions* as a tuple, or
+    None if it cannot be written that way.
+    """
+    try:
+        return _dimension_vectors[dimensions]
+    except KeyError:
+        pass
+    vector = [0] * len(_vector_dimensions)
+    for base, power in sympify(dimensions).as_powers_dict().items():
+        if base == sympy_one:
+            continue
+        if base not in _vector_dimensions or not power.is_Rational:
+            return None
+        vector[_vector_dimensions.index(base)] = \
+            _power(Fraction(int(power.p), int(power.q)))
+    vector = tuple(vector)
+    _dimension_vectors[dimensions] = vector
+    _dimension_exprs.setdefault(vector, dimensions)
+    return vector
+
+def _dimension_expr(vector):
+    """
+    Return the sympy expression for the dimension vector *vector*.
+    """
+    try:
+        return _dimension_exprs[vector]
+    except KeyError:
+        pass
+    dimensions = sympy_one
+    for base, power in zip(_vector_dimensions, vector):
+        if power != 0:
+            dimensions *= base**_sympy_power(power)
+    _dimension_exprs[vector] = dimensions
+    _dimension_vectors.setdefault(dimensions, vector)
+    return dimensions
+
+# Known dimensions come back as the very objects defined in
+# yt.units.dimensions, so that identity checks against them keep working.
+for _dims in base_dimensions + derived_dimensions:
+    _dimension_vector(_dims)
+del _dims
+
+def _add_dimension_vectors(vector1, vector2, sign):
+    return tuple(_power(d1 + sign*d2) for d1, d2 in zip(vector1, vector2))
+
+def _expr_terms(unit_expr):
+    """
+    Split a unit expression into its numerical coefficient and a dict of the
+    powers of its unit symbols.  Returns None if the expression is not a
+    product of rational powers of symbols.
+    """
+    if isinstance(unit_expr, Symbol):
+        return sympy_one, {str(unit_expr): 1}
+    if isinstance(unit_expr, Number):
+        return unit_expr, {}
+    if isinstance(unit_expr, Pow):
+        base, power = unit_expr.args
+        if not power.is_Rational:
+            return None
+        base_terms = _expr_terms(base)
+        if base_terms is None:
+            return None
+        coeff, terms = base_terms
+        p = _power(Fraction(int(power.p), int(power.q)))
+        if coeff is not sympy_one:
+            coeff = coeff**power
+        return coeff, dict((k, _power(v*p)) for k, v in terms.items())
+    if isinstance(unit_expr, Mul):
+        coeff, terms = sympy_one, {}
+        for arg in unit_expr.args:
+            arg_terms = _expr_terms(arg)
+            if arg_terms is None:
+                return None
+            coeff = _multiply_coeffs(coeff, arg_terms[0])
+            terms = _combine_terms(terms, arg_terms[1], 1)
+        return coeff, terms
+    return None
+
+def _multiply_coeffs(coeff1, coeff2):
+    if coeff1 is sympy_one:
+        return coeff2
+    if coeff2 is sympy_one:
+        return coeff1
+    return coeff1 * coeff2
+
+def _combine_terms(terms1, terms2, sign):
+    terms = terms1.copy()
+    for symbol, power in terms2.items():
+        power = _power(terms.get(symbol, 0) + sign*power)
+        if power == 0:
+            terms.pop(symbol, None)
+        else:
+            terms[symbol] = power
+    return terms
+
+def _terms_expr(coeff, terms):
+    """
+    Build the sympy expression of a unit from its coefficient and the powers
+    of its symbols.
+    """
+    factors = [coeff]
+    for symbol, power in terms.items():
+        symbol = Symbol(symbol, positive=True)
+        if power != 1:
+            symbol = symbol**_sympy_power(power)
+        factors.append(symbol)
+    return Mul(*factors)
+
 def validate_dimensions(dimensions):
     if isinstance(dimensions, Mul):
         for dim in dimensions.args:
@@ -192,7 +192,7 @@ def handle_comparison_units(inps, units, ufunc, ret_class, raise_error=False):
 def handle_multiply_divide_units(unit, units, out, out_arr):
     if unit.is_dimensionless and unit.base_value != 1.0:
         if not units[0].is_dimensionless:
-            if units[0].dimensions == units[1].dimensions:
+            if units[0].same_dimensions_as(units[1]):
                 out_arr = np.multiply(out_arr.view(np.ndarray),
                                       unit.base_value, out=out)
                 unit = Unit(registry=unit.registry)
@@ -17,6 +17,9 @@ from __future__ import absolute_import
 import operator
 import numpy as np
 
+from collections import OrderedDict
+
+from yt.config import ytcfg
 from yt.funcs import \
     iterable, \
     mylog
@@ -55,6 +58,41 @@ def _apply_log(data, log_changed, log_new):
     else:
         np.power(10.0, data, data)
 
+class BrickCache(object):
+    """
+    A least-recently-used cache of the vertex-centered data of grids, from
+    which the bricks of an AMRKDTree are cut, that holds at most *max_bytes*
+    of data.  By default this is the ``brick_cache_size`` option.
+    """
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = ytcfg.getint("yt", "brick_cache_size") * 1024**2
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        data = self._data.pop(key, None)
+        if data is not None:
+            self._data[key] = data
+        return data
+
+    def set(self, key, data):
+        nbytes = sum(d.nbytes for d in data)
+        if nbytes > self.max_bytes: return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.nbytes -= sum(d.nbytes for d in old)
+        self._data[key] = data
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._data.popitem(last=False)
+            self.nbytes -= sum(d.nbytes for d in old)
+
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+
 class Tree(object):
     def __init__(self, ds, comm_rank=0, comm_size=1, left=None, right=None,
         min_level=None, max_level=None, data_source=None):
@@ -144,6 +182,12 @@ class AMRKDTree(ParallelAnalysisInterface):
 
     Not applicable to particle or octree-based datasets.
 
+    The vertex-centered data that bricks are cut from is kept in a
+    BrickCache, keyed by grid, fields, log scaling and ghost zone mode, so
+    that it is computed once for each grid however many bricks the grid is
+    split into.  A cache may be passed in as *brick_cache* to share it
+    between trees built over the same dataset.
+
     """
 
     fields = None
@@ -151,7 +195,7 @@ class AMRKDTree(ParallelAnalysisInterface):
     no_ghost = True
 
     def __init__(self, ds, min_level=None, max_level=None,
-                 data_source=None):
+                 data_source=None, brick_cache=None):
 
         if not issubclass(ds.index.__class__, GridIndex):
             raise RuntimeError("AMRKDTree does not support particle or octree-based data.")
@@ -159,8 +203,9 @@ class AMRKDTree(ParallelAnalysisInterface):
         ParallelAnalysisInterface.__init__(self)
 
         self.ds = ds
-        self.current_vcds = []
-        self.current_saved_grids = []
+        if brick_cache is None:
+            brick_cache = BrickCache()
+        self.brick_cache = brick_cache
         self.bricks = []
         self.brick_dimensions = []
         self.sdx = ds.index.get_smallest_dx()
@@ -300,9 +345,10 @@ class AMRKDTree(ParallelAnalysisInterface):
         assert(np.all(grid.LeftEdge <= nle))
         assert(np.all(grid.RightEdge >= nre))
 
-        if grid in self.current_saved_grids and not node.dirty:
-            dds = self.current_vcds[self.current_saved_grids.index(grid)]
-        else:
+        key = (grid.id, tuple(self.fields),
+               tuple(bool(l) for l in self.log_fields), self.no_ghost)
+        dds = self.brick_cache.get(key)
+        if dds is None:
             dds = []
             vcd = grid.get_vertex_centered_data(self.fields, smoothed=True,
                                                 no_ghost=self.no_ghost)
@@ -311,8 +357,7 @@ class AMRKDTree(ParallelAnalysisInterface):
                     dds.append(np.log10(vcd[field].astype('float64')))
                 else:
                     dds.append(vcd[field].astype('float64'))
-                self.current_saved_grids.append(grid)
-                self.current_vcds.append(dds)
+            self.brick_cache.set(key, dds)
 
         if self.data_source.selector is None:
             mask = np.ones(dims, dtype='uint8')
@@ -13,12 +13,14 @@ The data-file handling functions
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 import os
 from yt.utilities.on_demand_imports import _h5py as h5py
 import numpy as np
+from yt.config import ytcfg
 from yt.extern.six import add_metaclass
 from yt.utilities.lru_cache import \
     local_lru_cache, _make_key
@@ -138,7 +140,7 @@ class BaseIOHandler(object):
             else:
                 rv[field] = np.empty(size, dtype="=f8")
         ind = {field: 0 for field in fields}
-        for field, obj, data in self.io_iter(chunks, fields):
+        for field, obj, data in self._prefetch_io_iter(chunks, fields):
             if data is None:
                 continue
             if isinstance(selector, GridSelector) and field not in nodal_fields:
@@ -148,6 +150,70 @@ class BaseIOHandler(object):
                 ind[field] += obj.select(selector, data, rv[field], ind[field])
         return rv
 
+    def _prefetch_io_iter(self, chunks, fields):
+        """
+        Iterate over io_iter, reading upcoming grids in a pool of
+        ``io_prefetch_threads`` threads while the caller works on the current
+        ones.  Each chunk's grids are split into runs that share a file, so
+        every read opens a file once; results come back in the same order
+        io_iter would give them.  At most ``io_prefetch_memory`` megabytes of
+        field data are read ahead.  With no threads this is just io_iter.
+        """
+        nthreads = ytcfg.getint("yt", "io_prefetch_threads")
+        if nthreads < 1:
+            for rv in self.io_iter(chunks, fields):
+                yield rv
+            return
+        max_bytes = ytcfg.getint("yt", "io_prefetch_memory") * 1024**2
+        pool = ThreadPool(nthreads)
+        pending = deque()
+        in_flight = 0
+        try:
+            for grids, nbytes in self._prefetch_groups(
+                    chunks, fields, max_bytes // (nthreads + 1)):
+                # Hand back what we already have until the new group fits
+                # within the budget.
+                while pending and in_flight + nbytes > max_bytes:
+                    result, size = pending.popleft()
+                    in_flight -= size
+                    for rv in result.get():
+                        yield rv
+                pending.append((pool.apply_async(
+                    self._read_prefetch_group, (grids, fields)), nbytes))
+                in_flight += nbytes
+            while pending:
+                result, size = pending.popleft()
+                for rv in result.get():
+                    yield rv
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _prefetch_groups(self, chunks, fields, max_bytes):
+        # Contiguous grids in the same file are grouped, up to max_bytes of
+        # field data per group, so that the ordering is not changed.
+        for chunk in chunks:
+            grids = []
+            filename = None
+            nbytes = 0
+            for obj in chunk.objs:
+                size = 8 * len(fields) * int(np.prod(obj.ActiveDimensions))
+                if len(grids) > 0 and (obj.filename != filename or
+                                       nbytes + size > max_bytes):
+                    yield grids, nbytes
+                    grids = []
+                    nbytes = 0
+                grids.append(obj)
+                filename = obj.filename
+                nbytes += size
+            if len(grids) > 0:
+                yield grids, nbytes
+
+    def _read_prefetch_group(self, grids, fields):
+        from yt.geometry.geometry_handler import YTDataChunk
+        chunk = YTDataChunk(None, "io", grids, None, cache = False)
+        return list(self.io_iter([chunk], fields))
+
     def _read_data_slice(self, grid, field, axis, coord):
         sl = [slice(None), slice(None), slice(None)]
         sl[axis] = slice(coord, coord + 1)
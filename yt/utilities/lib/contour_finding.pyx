@@ -383,6 +383,125 @@ def link_node_contours(Node trunk, contours, ContourTree tree,
             examined, vcs, node_ids)
         examined[node_ind] = 1
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def link_node_cells(Node trunk, contours,
+                    np.ndarray[np.int64_t, ndim=1] node_ids):
+    # Like link_node_contours, but the nodes hold an index for every cell
+    # rather than contour ids, and the pairs of neighboring cells on either
+    # side of node boundaries are returned.
+    cdef int n_nodes = node_ids.shape[0]
+    cdef VolumeContainer **vcs = <VolumeContainer **> malloc(
+        sizeof(VolumeContainer*) * n_nodes)
+    cdef int i
+    cdef PartitionedGrid pg
+    for i in range(n_nodes):
+        pg = contours[node_ids[i]][2]
+        vcs[i] = pg.container
+    cdef np.ndarray[np.uint8_t] examined = np.zeros(n_nodes, "uint8")
+    joins = [np.empty((0, 2), dtype="int64")]
+    for _, cinfo in contours.items():
+        _, node_ind, pg, _ = cinfo
+        joins.append(node_boundary_joins(trunk, node_ind, examined, vcs))
+        examined[node_ind] = 1
+    free(vcs)
+    return np.concatenate(joins)
+
+cdef inline np.int64_t cell_find(np.int64_t *uf, np.int64_t i) nogil:
+    while uf[i] != i:
+        uf[i] = uf[uf[i]]
+        i = uf[i]
+    return i
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def build_join_tree(np.ndarray[np.float64_t, ndim=1] values,
+                    np.ndarray[np.int64_t, ndim=1] order,
+                    np.ndarray[np.int64_t, ndim=1] offsets,
+                    np.ndarray[np.int64_t, ndim=1] neighbors):
+    # Sweep through the cells in *order*, from the highest value to the
+    # lowest, joining each to the components its neighbors (given for cell i
+    # by neighbors[offsets[i]:offsets[i+1]]) already belong to.  A node of
+    # the tree begins at each local maximum and wherever separate components
+    # meet, becoming the parent of the nodes of those components.  Returns
+    # the node each cell joined, the parent of each node (-1 for roots) and
+    # the value at which each node began.
+    cdef np.int64_t n = values.shape[0]
+    cdef np.int64_t i, j, k, c, m, r, nroots, node, nnodes = 0
+    cdef np.int64_t max_degree = 0
+    cdef int found
+    cdef np.ndarray[np.int64_t, ndim=1] uf = np.arange(n, dtype="int64")
+    cdef np.int64_t *ufp = <np.int64_t *> uf.data
+    cdef np.ndarray[np.uint8_t, ndim=1] seen = np.zeros(n, dtype="uint8")
+    cdef np.ndarray[np.int64_t, ndim=1] comp_node = np.empty(n, dtype="int64")
+    cdef np.ndarray[np.int64_t, ndim=1] cell_node = np.empty(n, dtype="int64")
+    cdef np.ndarray[np.int64_t, ndim=1] node_parent = np.empty(n, dtype="int64")
+    cdef np.ndarray[np.float64_t, ndim=1] node_value = np.empty(n, dtype="float64")
+    cell_node[:] = -1
+    for i in range(n):
+        if offsets[i+1] - offsets[i] > max_degree:
+            max_degree = offsets[i+1] - offsets[i]
+    cdef np.ndarray[np.int64_t, ndim=1] roots = np.empty(max_degree + 1,
+                                                         dtype="int64")
+    for i in range(order.shape[0]):
+        c = order[i]
+        seen[c] = 1
+        nroots = 0
+        for j in range(offsets[c], offsets[c+1]):
+            m = neighbors[j]
+            if seen[m] == 0: continue
+            r = cell_find(ufp, m)
+            found = 0
+            for k in range(nroots):
+                if roots[k] == r:
+                    found = 1
+                    break
+            if found == 0:
+                roots[nroots] = r
+                nroots += 1
+        if nroots == 1:
+            node = comp_node[roots[0]]
+            uf[c] = roots[0]
+        else:
+            node = nnodes
+            nnodes += 1
+            node_parent[node] = -1
+            node_value[node] = values[c]
+            for k in range(nroots):
+                node_parent[comp_node[roots[k]]] = node
+                uf[roots[k]] = c
+            comp_node[c] = node
+        cell_node[c] = node
+    return cell_node, node_parent[:nnodes].copy(), node_value[:nnodes].copy()
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def order_join_tree(np.ndarray[np.int64_t, ndim=1] node_parent):
+    # Number the nodes of a join tree in preorder, so that every subtree is a
+    # contiguous range.  Parents always come after their children, as
+    # build_join_tree makes them, so one sweep forward adds up the subtree
+    # sizes and one sweep back hands out the ranges.  Returns the preorder
+    # number and the subtree size of each node.
+    cdef np.int64_t nnodes = node_parent.shape[0]
+    cdef np.int64_t n, p, pos = 0
+    cdef np.ndarray[np.int64_t, ndim=1] size = np.ones(nnodes, dtype="int64")
+    cdef np.ndarray[np.int64_t, ndim=1] pre = np.empty(nnodes, dtype="int64")
+    cdef np.ndarray[np.int64_t, ndim=1] nxt = np.empty(nnodes, dtype="int64")
+    for n in range(nnodes):
+        p = node_parent[n]
+        if p > -1:
+            size[p] += size[n]
+    for n in range(nnodes - 1, -1, -1):
+        p = node_parent[n]
+        if p == -1:
+            pre[n] = pos
+            pos += size[n]
+        else:
+            pre[n] = nxt[p]
+            nxt[p] += size[n]
+        nxt[n] = pre[n] + 1
+    return pre, size
+
 cdef inline void get_spos(VolumeContainer *vc, int i, int j, int k,
                           int axis, np.float64_t *spos):
     spos[0] = vc.left_edge[0] + i * vc.dds[0]
@@ -403,6 +522,17 @@ cdef void construct_boundary_relationships(Node trunk, ContourTree tree,
                 np.int64_t nid, np.ndarray[np.uint8_t, ndim=1] examined,
                 VolumeContainer **vcs,
                 np.ndarray[np.int64_t, ndim=1] node_ids):
+    joins = node_boundary_joins(trunk, nid, examined, vcs)
+    if joins.shape[0] == 0: return
+    new_joins = tree.cull_joins(joins)
+    tree.add_joins(new_joins)
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef np.ndarray node_boundary_joins(Node trunk, np.int64_t nid,
+                np.ndarray[np.uint8_t, ndim=1] examined,
+                VolumeContainer **vcs):
     # We only look at the boundary and find the nodes next to it.
     # Contours is a dict, keyed by the node.id.
     cdef int i, j, off_i, off_j, oi, oj, ax, ax0, ax1, n1, n2
@@ -467,9 +597,7 @@ cdef void construct_boundary_relationships(Node trunk, ContourTree tree,
                                         joins[ti,1] = c2
                                     ti += 1
 
-    if ti == 0: return
-    new_joins = tree.cull_joins(joins[:ti,:])
-    tree.add_joins(new_joins)
+    return joins[:ti,:]
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -13,6 +13,7 @@ Utilities for images
 import numpy as np
 cimport numpy as np
 cimport cython
+from cython.parallel import prange
 from yt.utilities.lib.fp_utils cimport iclip
 
 def add_points_to_greyscale_image(
@@ -32,6 +33,69 @@ def add_points_to_greyscale_image(
         buffer_mask[i, j] = 1
     return
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def splat_points_to_greyscale_image(
+        np.float64_t[:, :, :] buff,
+        np.float64_t[:, :, :] weight_buff,
+        np.int64_t[:, :, :] counts,
+        np.float64_t[:] px,
+        np.float64_t[:] py,
+        np.float64_t[:] pv,
+        pw, bounds):
+    """
+    Add up the values *pv*, weighted by *pw*, of the points at *px*, *py* in
+    the pixels of *buff* they fall in, along with the weights in
+    *weight_buff* and the number of points in *counts*.  The images run over
+    y along their second axis and over x along their third, between
+    *bounds* (x_min, x_max, y_min, y_max); points outside of them are
+    skipped.  If *pw* is None every point has a weight of one.
+
+    The first axis of the images gives one copy of them to each thread the
+    points are split between.  They are added to rather than summed here,
+    so that the same images can be passed for every chunk of points and
+    summed over their first axis once all of them have been splatted.
+    """
+    cdef np.float64_t x_min, x_max, y_min, y_max, fx, fy, w
+    cdef np.float64_t[:] weights
+    cdef np.int64_t p, start, end, npart
+    cdef int t, i, j, nx, ny, weighted, num_threads
+    npart = px.shape[0]
+    if py.shape[0] != npart or pv.shape[0] != npart:
+        raise RuntimeError("Point arrays are not of the same length.")
+    weighted = pw is not None
+    if weighted:
+        weights = pw
+        if weights.shape[0] != npart:
+            raise RuntimeError("Point arrays are not of the same length.")
+    else:
+        weights = pv
+    x_min, x_max, y_min, y_max = bounds
+    num_threads = buff.shape[0]
+    ny = buff.shape[1]
+    nx = buff.shape[2]
+    fx = nx / (x_max - x_min)
+    fy = ny / (y_max - y_min)
+    with nogil:
+        for t in prange(num_threads, num_threads=num_threads,
+                        schedule="static"):
+            start = t * npart / num_threads
+            end = (t + 1) * npart / num_threads
+            for p in range(start, end):
+                if not (x_min <= px[p] <= x_max and
+                        y_min <= py[p] <= y_max):
+                    continue
+                # points on the upper edges go in the last pixel
+                j = iclip(<int> ((px[p] - x_min) * fx), 0, nx - 1)
+                i = iclip(<int> ((py[p] - y_min) * fy), 0, ny - 1)
+                w = 1.0
+                if weighted == 1:
+                    w = weights[p]
+                buff[t, i, j] += w * pv[p]
+                weight_buff[t, i, j] += w
+                counts[t, i, j] += 1
+
 def add_points_to_image(
         np.ndarray[np.uint8_t, ndim=3] buffer,
         np.ndarray[np.float64_t, ndim=1] px,
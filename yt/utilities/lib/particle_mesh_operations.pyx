@@ -16,6 +16,7 @@ Simple integrators for the radiative transfer equation
 cimport numpy as np
 cimport cython
 import numpy as np
+from libc.math cimport floor
 from yt.utilities.lib.fp_utils cimport imax, fmax, imin, fmin, iclip, fclip
 
 @cython.boundscheck(False)
@@ -274,6 +275,65 @@ def CICSample_3(np.ndarray[np.float64_t, ndim=1] posx,
                      field[i1-1,j1  ,k1  ] * dx  * dy2 * dz2 +
                      field[i1  ,j1  ,k1  ] * dx2 * dy2 * dz2)
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def interpolate_at_positions(np.float64_t[:,:,:] field,
+                             np.float64_t[:] left_edge,
+                             np.float64_t[:] dds,
+                             np.float64_t[:,:] pos,
+                             np.float64_t[:] sample,
+                             int method):
+    # Interpolate the cell-centered values of field, whose first cell has
+    # its left edge at left_edge, to every position in pos, with nearest
+    # grid point (method 0), cloud-in-cell (1) or triangular-shaped cloud
+    # (2) weights.  For the last two the field has to extend at least one
+    # cell past every position.  Positions are clipped to the field, so
+    # nothing is read out of bounds.
+    cdef int n, i, j, k, d
+    cdef int npos = pos.shape[0]
+    cdef int dims[3]
+    cdef int ind[3]
+    cdef np.float64_t w[3][3]
+    cdef np.float64_t x, f, val
+    for d in range(3):
+        dims[d] = field.shape[d]
+    with nogil:
+        for n in range(npos):
+            for d in range(3):
+                x = (pos[n, d] - left_edge[d]) / dds[d]
+                if method == 0:
+                    ind[d] = iclip(<np.int64_t> floor(x), 0, dims[d] - 1)
+                    w[d][0] = 1.0
+                    w[d][1] = 0.0
+                    w[d][2] = 0.0
+                elif method == 1:
+                    # Between the centers of cells ind and ind + 1
+                    x = fclip(x - 0.5, 0.0, dims[d] - 1.0)
+                    ind[d] = iclip(<np.int64_t> floor(x), 0, dims[d] - 2)
+                    f = x - ind[d]
+                    w[d][0] = 1.0 - f
+                    w[d][1] = f
+                    w[d][2] = 0.0
+                else:
+                    # Around the center of cell ind + 1
+                    ind[d] = iclip(<np.int64_t> floor(x), 1, dims[d] - 2)
+                    f = fclip(x - 0.5 - ind[d], -0.5, 0.5)
+                    w[d][0] = 0.5 * (0.5 - f) * (0.5 - f)
+                    w[d][1] = 0.75 - f * f
+                    w[d][2] = 0.5 * (0.5 + f) * (0.5 + f)
+                    ind[d] -= 1
+            val = 0.0
+            for i in range(3):
+                if w[0][i] == 0.0: continue
+                for j in range(3):
+                    if w[1][j] == 0.0: continue
+                    for k in range(3):
+                        if w[2][k] == 0.0: continue
+                        val += w[0][i] * w[1][j] * w[2][k] * \
+                            field[ind[0] + i, ind[1] + j, ind[2] + k]
+            sample[n] = val
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
@@ -22,7 +22,10 @@ from yt.utilities.exceptions import \
     YTPixelizeError, \
     YTElementTypeNotRecognized
 from libc.stdlib cimport malloc, free
+from cython.parallel import prange
 from vec3_ops cimport dot, cross, subtract
+from yt.geometry.particle_deposit cimport \
+    kernel_func, get_kernel_func
 from yt.utilities.lib.element_mappings cimport \
     ElementSampler, \
     P1Sampler1D, \
@@ -966,3 +969,206 @@ def pixelize_element_mesh_line(np.ndarray[np.float64_t, ndim=2] coords,
     free(vertices)
     free(field_vals)
     return arc_length, plot_values
+
+
+# The column integrals of the SPH kernels, by kernel name
+cdef dict _column_kernel_tables = {}
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def column_kernel_table(str kernel_name, int size = 1000, int steps = 200):
+    r"""
+    The integral of the SPH kernel *kernel_name* along lines through it,
+    ``F(q) = 2 \int_0^{\sqrt{1-q^2}} W(\sqrt{q^2+s^2}) ds``, at *size* + 1
+    impact parameters q evenly spaced from 0 to 1, in units of the smoothing
+    length.  The tables are computed once per kernel.
+    """
+    cdef kernel_func kernel
+    cdef np.float64_t[:] table
+    cdef np.float64_t q2, smax, ds, s, total
+    cdef int i, j
+    key = (kernel_name, size, steps)
+    if key in _column_kernel_tables:
+        return _column_kernel_tables[key]
+    kernel = get_kernel_func(kernel_name)
+    arr = np.zeros(size + 1, dtype="float64")
+    table = arr
+    with nogil:
+        for i in range(size):
+            q2 = (<np.float64_t> i) / size
+            q2 = q2 * q2
+            smax = math.sqrt(1.0 - q2)
+            ds = smax / steps
+            # midpoint rule
+            total = 0.0
+            for j in range(steps):
+                s = (j + 0.5) * ds
+                total += kernel(math.sqrt(q2 + s * s))
+            table[i] = 2.0 * total * ds
+    _column_kernel_tables[key] = arr
+    return arr
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def pixelize_sph_kernel_projection(np.float64_t[:, :] buff,
+                                   np.float64_t[:] px,
+                                   np.float64_t[:] py,
+                                   np.float64_t[:] hsml,
+                                   np.float64_t[:] pweight,
+                                   bounds,
+                                   kernel_name = "cubic",
+                                   int num_threads = 1):
+    r"""
+    Add the kernels of SPH particles at *px*, *py* with smoothing lengths
+    *hsml*, integrated along the line of sight, to the image *buff*, whose
+    first axis runs over y and second over x between *bounds* (x_min, x_max,
+    y_min, y_max).  Each particle adds ``pweight F(b/h) / h**2`` to the
+    pixels whose centers are at a distance b < h from it, where F is the
+    column integral of the kernel, so the image integrates to the sum of the
+    weights; particles smaller than the pixel they are in put all of their
+    weight there.  Usually the weights are the particle volume times the
+    quantity projected, m / rho * A.
+
+    Rows of the image are split between *num_threads* threads, each of which
+    goes over all of the particles.
+    """
+    cdef np.float64_t x_min, x_max, y_min, y_max, dx, dy, idx, idy
+    cdef np.float64_t xp, yp, h, ih2, w, ddy2, q, f, xc, yc
+    cdef np.float64_t[:] table
+    cdef int ntab, nrows, ncols, nbands, band, y0, y1
+    cdef int lc, rc, lr, rr, xi, yi, i
+    cdef np.int64_t p, npart
+    if px.shape[0] != py.shape[0] or \
+       px.shape[0] != hsml.shape[0] or \
+       px.shape[0] != pweight.shape[0]:
+        raise YTPixelizeError("Arrays are not of correct shape.")
+    table = column_kernel_table(kernel_name)
+    ntab = table.shape[0] - 1
+    x_min, x_max, y_min, y_max = bounds
+    nrows = buff.shape[0]
+    ncols = buff.shape[1]
+    dx = (x_max - x_min) / ncols
+    dy = (y_max - y_min) / nrows
+    idx = 1.0 / dx
+    idy = 1.0 / dy
+    npart = px.shape[0]
+    num_threads = max(num_threads, 1)
+    nbands = imin(4 * num_threads, nrows)
+    with nogil:
+        for band in prange(nbands, num_threads=num_threads,
+                           schedule="dynamic"):
+            y0 = band * nrows / nbands
+            y1 = (band + 1) * nrows / nbands
+            for p in range(npart):
+                xp = px[p]
+                yp = py[p]
+                h = hsml[p]
+                w = pweight[p]
+                if h <= 0.0: continue
+                lr = <int> math.floor((yp - h - y_min) * idy)
+                rr = <int> math.floor((yp + h - y_min) * idy) + 1
+                if rr <= y0 or lr >= y1: continue
+                lc = <int> math.floor((xp - h - x_min) * idx)
+                rc = <int> math.floor((xp + h - x_min) * idx) + 1
+                if rc <= 0 or lc >= ncols: continue
+                # The center of the pixel a particle is in is the one closest
+                # to it; if that is outside its kernel, so is every other.
+                xi = <int> math.floor((xp - x_min) * idx)
+                yi = <int> math.floor((yp - y_min) * idy)
+                xc = x_min + (xi + 0.5) * dx
+                yc = y_min + (yi + 0.5) * dy
+                if (xc - xp) * (xc - xp) + (yc - yp) * (yc - yp) >= h * h:
+                    if y0 <= yi < y1 and 0 <= xi < ncols:
+                        buff[yi, xi] += w * idx * idy
+                    continue
+                lr = imax(lr, y0)
+                rr = imin(rr, y1)
+                lc = imax(lc, 0)
+                rc = imin(rc, ncols)
+                ih2 = 1.0 / (h * h)
+                for yi in range(lr, rr):
+                    yc = y_min + (yi + 0.5) * dy
+                    ddy2 = (yc - yp) * (yc - yp)
+                    for xi in range(lc, rc):
+                        xc = x_min + (xi + 0.5) * dx
+                        q = ((xc - xp) * (xc - xp) + ddy2) * ih2
+                        if q >= 1.0: continue
+                        q = math.sqrt(q) * ntab
+                        i = <int> q
+                        f = q - i
+                        buff[yi, xi] += w * ih2 * \
+                            (table[i] * (1.0 - f) + table[i + 1] * f)
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def pixelize_sph_kernel_slice(np.float64_t[:, :] buff,
+                              np.float64_t[:] px,
+                              np.float64_t[:] py,
+                              np.float64_t[:] pdz,
+                              np.float64_t[:] hsml,
+                              np.float64_t[:] pweight,
+                              bounds,
+                              kernel_name = "cubic",
+                              int num_threads = 1):
+    r"""
+    Add the kernels of SPH particles at *px*, *py*, a distance *pdz* from
+    the plane of the image, to the image *buff*, laid out as in
+    ``pixelize_sph_kernel_projection``.  Each particle adds
+    ``pweight W(r/h) / h**3`` to the pixels whose centers are at a distance
+    r < h from it, the SPH estimate of a field at those points when the
+    weights are m / rho * A.
+    """
+    cdef np.float64_t x_min, x_max, y_min, y_max, dx, dy, idx, idy
+    cdef np.float64_t xp, yp, h, h2, ih, ih3, w, ddy2, ddz2, q, xc, yc
+    cdef kernel_func kernel
+    cdef int nrows, ncols, nbands, band, y0, y1
+    cdef int lc, rc, lr, rr, xi, yi
+    cdef np.int64_t p, npart
+    if px.shape[0] != py.shape[0] or \
+       px.shape[0] != pdz.shape[0] or \
+       px.shape[0] != hsml.shape[0] or \
+       px.shape[0] != pweight.shape[0]:
+        raise YTPixelizeError("Arrays are not of correct shape.")
+    kernel = get_kernel_func(kernel_name)
+    x_min, x_max, y_min, y_max = bounds
+    nrows = buff.shape[0]
+    ncols = buff.shape[1]
+    dx = (x_max - x_min) / ncols
+    dy = (y_max - y_min) / nrows
+    idx = 1.0 / dx
+    idy = 1.0 / dy
+    npart = px.shape[0]
+    num_threads = max(num_threads, 1)
+    nbands = imin(4 * num_threads, nrows)
+    with nogil:
+        for band in prange(nbands, num_threads=num_threads,
+                           schedule="dynamic"):
+            y0 = band * nrows / nbands
+            y1 = (band + 1) * nrows / nbands
+            for p in range(npart):
+                xp = px[p]
+                yp = py[p]
+                h = hsml[p]
+                w = pweight[p]
+                h2 = h * h
+                ddz2 = pdz[p] * pdz[p]
+                if ddz2 >= h2: continue
+                lr = imax(<int> math.floor((yp - h - y_min) * idy), y0)
+                rr = imin(<int> math.floor((yp + h - y_min) * idy) + 1, y1)
+                if lr >= rr: continue
+                lc = imax(<int> math.floor((xp - h - x_min) * idx), 0)
+                rc = imin(<int> math.floor((xp + h - x_min) * idx) + 1, ncols)
+                if lc >= rc: continue
+                ih = 1.0 / h
+                ih3 = ih * ih * ih
+                for yi in range(lr, rr):
+                    yc = y_min + (yi + 0.5) * dy
+                    ddy2 = (yc - yp) * (yc - yp) + ddz2
+                    for xi in range(lc, rc):
+                        xc = x_min + (xi + 0.5) * dx
+                        q = (xc - xp) * (xc - xp) + ddy2
+                        if q >= h2: continue
+                        buff[yi, xi] += w * ih3 * kernel(math.sqrt(q) * ih)
@@ -1,7 +1,8 @@
 import numpy as np
 
 from yt.utilities.lib.particle_mesh_operations import \
-    CICSample_3
+    CICSample_3, \
+    interpolate_at_positions
 from yt.testing import assert_allclose
 
 def setup():
@@ -41,3 +42,26 @@ def test_sample() :
     assert_allclose(xp,xfield)
     assert_allclose(yp,yfield)
     assert_allclose(zp,zfield)
+
+def test_interpolate_at_positions():
+    # One cell of padding on every side of a 62**3 grid of unit cells
+    dims = (64, 64, 64)
+    inds = np.indices(dims)
+    field = 2.0 * inds[0] - 3.0 * inds[1] + 0.5 * inds[2]
+    le = -np.ones(3)
+    dds = np.ones(3)
+
+    num_particles = 1000
+    prng = np.random.RandomState(0x4d3d3d3)
+    pos = prng.uniform(low=0.0, high=62.0, size=(num_particles, 3))
+    expected = 2.0 * pos[:, 0] - 3.0 * pos[:, 1] + 0.5 * pos[:, 2] - 0.25
+    sample = np.zeros(num_particles)
+    # cic and tsc both recover a linear field exactly
+    for method in (1, 2):
+        interpolate_at_positions(field, le, dds, pos, sample, method)
+        assert_allclose(sample, expected)
+    # ngp gives the value of the cell each position is in
+    interpolate_at_positions(field, le, dds, pos, sample, 0)
+    cell = np.floor(pos) + 0.5
+    assert_allclose(sample, 2.0 * cell[:, 0] - 3.0 * cell[:, 1] +
+                    0.5 * cell[:, 2] - 0.25)
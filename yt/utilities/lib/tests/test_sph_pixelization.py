@@ -0,0 +1,54 @@
+import numpy as np
+
+from yt.testing import \
+    assert_allclose, \
+    assert_equal
+from yt.utilities.lib.pixelization_routines import \
+    pixelize_sph_kernel_projection, \
+    pixelize_sph_kernel_slice
+
+def _particles(n):
+    prng = np.random.RandomState(0x4d3d3d3)
+    px = prng.uniform(0.25, 0.75, n)
+    py = prng.uniform(0.25, 0.75, n)
+    # some of the particles are smaller than a pixel
+    hsml = prng.uniform(0.001, 0.2, n)
+    weights = prng.random_sample(n)
+    return px, py, hsml, weights
+
+def test_sph_kernel_projection():
+    px, py, hsml, weights = _particles(100)
+    bounds = (0.0, 1.0, 0.0, 1.0)
+    for kernel_name in ["cubic", "quintic", "wendland2", "wendland6"]:
+        buff = np.zeros((256, 200), dtype="float64")
+        pixelize_sph_kernel_projection(buff, px, py, hsml, weights, bounds,
+                                       kernel_name)
+        # The columns of every particle add up to its weight
+        assert_allclose(buff.sum() / buff.size, weights.sum(), rtol=1e-2)
+        threaded = np.zeros((256, 200), dtype="float64")
+        pixelize_sph_kernel_projection(threaded, px, py, hsml, weights,
+                                       bounds, kernel_name, num_threads=4)
+        assert_equal(buff, threaded)
+
+def test_sph_kernel_slice():
+    # A particle at the center of pixel (50, 20), whose kernel is 8 / pi at
+    # its center
+    px = np.array([0.205])
+    py = np.array([0.505])
+    hsml = np.array([0.1])
+    weights = np.array([2.0])
+    bounds = (0.0, 1.0, 0.0, 1.0)
+    buff = np.zeros((100, 100), dtype="float64")
+    pixelize_sph_kernel_slice(buff, px, py, np.zeros(1), hsml, weights,
+                              bounds)
+    assert_allclose(buff[50, 20], 2.0 * 8.0 / np.pi / 0.1**3)
+    assert_equal(buff[50, 31], 0.0)
+    assert (buff[50, 11:30] > 0).all()
+    assert_allclose(buff[50, 11:20], buff[50, 29:20:-1])
+    assert_allclose(buff[41:50, 20], buff[59:50:-1, 20])
+    # Particles further from the plane than their smoothing length are not
+    # in the slice
+    buff[:] = 0.0
+    pixelize_sph_kernel_slice(buff, px, py, np.array([0.1]), hsml, weights,
+                              bounds)
+    assert_equal(buff, 0.0)
@@ -20,8 +20,10 @@ import logging
 import numpy as np
 import sys
 import os
+import signal
 import traceback
 import types
+from contextlib import contextmanager
 from functools import wraps
 
 from yt.funcs import \
@@ -86,11 +88,12 @@ def default_mpi_excepthook(exception_type, exception_value, tb):
     MPI.COMM_WORLD.Abort(1)
 
 
-def enable_parallelism(suppress_logging=False, communicator=None):
+def enable_parallelism(suppress_logging=False, communicator=None,
+                       backend="mpi", nprocs=None):
     """
-    This method is used inside a script to turn on MPI parallelism, via
-    mpi4py.  More information about running yt in parallel can be found
-    here: http://yt-project.org/docs/3.0/analyzing/parallel_computation.html
+    This method is used inside a script to turn on parallelism, by default
+    via MPI using mpi4py.  More information about running yt in parallel can
+    be found here: http://yt-project.org/docs/3.0/analyzing/parallel_computation.html
 
     Parameters
     ----------
@@ -101,14 +104,34 @@ def enable_parallelism(suppress_logging=False, communicator=None):
     communicator : mpi4py.MPI.Comm
         The MPI communicator to use. This controls which processes yt can see.
         If not specified, will be set to COMM_WORLD.
+
+    backend : string
+        Either "mpi", to use mpi4py, or "processes", to fork this process into
+        *nprocs* processes on the local machine and communicate between them
+        with multiprocessing.  As under mpirun, every process runs the rest of
+        the script.  The "processes" backend does not need MPI, but is not
+        available on Windows.
+
+    nprocs : int
+        The number of processes the "processes" backend starts.  If not
+        specified, one is started per core.
     """
     global parallel_capable, MPI
-    try:
-        from mpi4py import MPI as _MPI
-    except ImportError:
-        mylog.info("mpi4py was not found. Disabling parallel computation")
-        parallel_capable = False
-        return
+    if backend == "processes":
+        from yt.utilities.parallel_tools import \
+            process_communicator as _MPI
+        if communicator is None:
+            communicator = _MPI.spawn(nprocs)
+    elif backend == "mpi":
+        try:
+            from mpi4py import MPI as _MPI
+        except ImportError:
+            mylog.info("mpi4py was not found. Disabling parallel computation")
+            parallel_capable = False
+            return
+    else:
+        raise RuntimeError("%s is an invalid value for the 'backend' "
+                           "argument." % backend)
     MPI = _MPI
     exe_name = os.path.basename(sys.executable)
 
@@ -165,6 +188,85 @@ def enable_parallelism(suppress_logging=False, communicator=None):
             mylog.addFilter(FilterAllMessages())
     return True
 
+_parallel_config = ("__global_parallel_rank", "__global_parallel_size",
+                    "__parallel")
+
+@contextmanager
+def parallel_processes(nprocs=None):
+    """
+    Run the body of a with statement in parallel on *nprocs* local processes
+    (by default one per core), forked from this one and communicating through
+    multiprocessing.  Only the original process carries on past the end of the
+    block, so unlike enable_parallelism this can be used from an interactive
+    session such as a Jupyter notebook.  Anything computed collectively in the
+    block, such as derived quantities, profiles and projections, is available
+    to it afterwards.  This is not available on Windows.
+
+    Examples
+    --------
+
+    >>> ds = yt.load("IsolatedGalaxy/galaxy0030/galaxy0030")
+    >>> with yt.parallel_processes(4):
+    ...     ad = ds.all_data()
+    ...     extrema = ad.quantities.extrema("density")
+    ...     prof = yt.create_profile(ad, "density", "cell_mass")
+    """
+    global parallel_capable, MPI
+    from yt.utilities.parallel_tools import process_communicator
+    old_state = (parallel_capable, MPI, dict(dtype_names), dict(op_names),
+                 [ytcfg.get("yt", k) for k in _parallel_config])
+    comm = process_communicator.spawn(nprocs, wait_at_exit=False)
+    MPI = process_communicator
+    parallel_capable = comm.size > 1
+    dtype_names.update(dict(
+            float32 = MPI.FLOAT,
+            float64 = MPI.DOUBLE,
+            int32   = MPI.INT,
+            int64   = MPI.LONG,
+            c       = MPI.CHAR,
+    ))
+    op_names.update(dict(
+        sum = MPI.SUM,
+        min = MPI.MIN,
+        max = MPI.MAX
+    ))
+    communication_system.push(comm)
+    ytcfg["yt","__global_parallel_rank"] = str(comm.rank)
+    ytcfg["yt","__global_parallel_size"] = str(comm.size)
+    ytcfg["yt","__parallel"] = str(parallel_capable)
+    try:
+        yield comm
+    except BaseException:
+        if comm.rank > 0:
+            # Stop the other forked processes, and interrupt the original one
+            # so that it raises rather than waiting on us forever.
+            traceback.print_exc()
+            for pid in comm._world.pids[1:]:
+                if pid != os.getpid():
+                    os.kill(pid, signal.SIGTERM)
+            os.kill(comm._world.pids[0], signal.SIGINT)
+            sys.stderr.flush()
+            os._exit(1)
+        # The other processes may be waiting on this one, so stop them.
+        for pid in comm._world.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        raise
+    finally:
+        if comm.rank > 0:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(0)
+        process_communicator.wait_for_children(comm)
+        communication_system.pop()
+        parallel_capable, MPI = old_state[:2]
+        dtype_names.update(old_state[2])
+        op_names.update(old_state[3])
+        for k, v in zip(_parallel_config, old_state[4]):
+            ytcfg["yt", k] = v
+
 # Because the dtypes will == correctly but do not hash the same, we need this
 # function for dictionary access.
 def get_mpi_type(dtype):
@@ -0,0 +1,403 @@
+"""
+A multiprocessing stand-in for mpi4py, for running yt in parallel on a single
+machine without MPI.
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+# This module mimics the small part of the mpi4py.MPI interface that the
+# Communicator in parallel_analysis_interface uses, so that it can be dropped
+# in as the "MPI" module.  Processes are forked from the one that enables
+# parallelism, and just as with mpirun every one of them runs the rest of the
+# script.  Messages go through one multiprocessing queue per process, and
+# large array reductions are done through a shared memory-mapped file.
+
+import atexit
+import functools
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+
+import numpy as np
+
+from yt.extern.six.moves import queue
+
+FLOAT = "float32"
+DOUBLE = "float64"
+INT = "int32"
+LONG = "int64"
+CHAR = "c"
+
+SUM = np.add
+MIN = np.minimum
+MAX = np.maximum
+
+ANY_SOURCE = -1
+ANY_TAG = -1
+
+# Collective operations are built out of point-to-point messages with this
+# tag, which user code should never use.
+_COLLECTIVE_TAG = -2
+
+# Arrays smaller than this are reduced by passing them around as messages
+# rather than through shared memory.
+_SHARED_REDUCE_BYTES = 1024**2
+
+COMM_WORLD = None
+
+def Compute_dims(nnodes, ndims):
+    """
+    Split *nnodes* processes into a grid of *ndims* dimensions that is as
+    close to cubical as possible, as MPI_Dims_create does.
+    """
+    nnodes = int(nnodes)
+    factors = []
+    n = nnodes
+    f = 2
+    while f * f <= n:
+        while n % f == 0:
+            factors.append(f)
+            n //= f
+        f += 1
+    if n > 1:
+        factors.append(n)
+    dims = [1] * ndims
+    for f in sorted(factors, reverse=True):
+        dims[dims.index(min(dims))] *= f
+    return sorted(dims, reverse=True)
+
+class Status(object):
+    source = None
+    tag = None
+
+    def Get_source(self):
+        return self.source
+
+    def Get_tag(self):
+        return self.tag
+
+class Request(object):
+    def __init__(self, callback=None):
+        self._callback = callback
+
+    def Wait(self, status=None):
+        if self._callback is not None:
+            self._callback()
+            self._callback = None
+
+    def Test(self, status=None):
+        self.Wait()
+        return True
+
+    @staticmethod
+    def Waitall(requests):
+        for req in requests:
+            req.Wait()
+
+    @staticmethod
+    def Waitany(requests):
+        for i, req in enumerate(requests):
+            if req._callback is not None:
+                req.Wait()
+                return i
+        return -1
+
+    @staticmethod
+    def Testall(requests):
+        Request.Waitall(requests)
+        return True
+
+class Group(object):
+    def __init__(self, ranks):
+        self.ranks = list(ranks)
+
+    def Incl(self, ids):
+        return Group([self.ranks[i] for i in ids])
+
+    def Get_size(self):
+        return len(self.ranks)
+
+def _buffer(spec):
+    # mpi4py buffers may be given as arr, [arr, type] or [arr, count, type].
+    if isinstance(spec, (list, tuple)):
+        spec = spec[0]
+    return np.asarray(spec)
+
+def _fill(dest, data):
+    data = np.asarray(data)
+    if data.dtype != dest.dtype:
+        data = np.ascontiguousarray(data).view(dest.dtype)
+    dest[...] = data.reshape(dest.shape)
+
+class _ProcessWorld(object):
+    """
+    The processes started by spawn and the queues they receive messages on.
+    """
+    def __init__(self, rank, queues, pids):
+        self.rank = rank
+        self.queues = queues
+        self.pids = pids
+        self.children = []
+        self.pending = []
+
+    def put(self, dest, context, tag, obj):
+        self.queues[dest].put((context, self.rank, tag, obj))
+
+    def get(self, context, source, tag):
+        # Messages that arrive before they are asked for are set aside until
+        # they are.
+        for i, msg in enumerate(self.pending):
+            if self._matches(msg, context, source, tag):
+                return self.pending.pop(i)
+        while True:
+            msg = self.queues[self.rank].get()
+            if self._matches(msg, context, source, tag):
+                return msg
+            self.pending.append(msg)
+
+    def _matches(self, msg, context, source, tag):
+        mcontext, msource, mtag, _ = msg
+        # ANY_TAG never matches the messages used by collectives.
+        return (mcontext == context and
+                source in (ANY_SOURCE, msource) and
+                (tag == mtag or (tag == ANY_TAG and mtag >= 0)))
+
+    def poll(self, context, source, tag):
+        """
+        Return whether a matching message is waiting, without blocking.
+        """
+        while True:
+            try:
+                self.pending.append(self.queues[self.rank].get_nowait())
+            except queue.Empty:
+                break
+        return any(self._matches(msg, context, source, tag)
+                   for msg in self.pending)
+
+class ProcessComm(object):
+    """
+    An intracommunicator over some of the processes of a _ProcessWorld,
+    implementing the parts of mpi4py.MPI.Comm used by yt.
+    """
+    def __init__(self, world, ranks):
+        self._world = world
+        self._ranks = tuple(ranks)
+        self.rank = self._ranks.index(world.rank)
+        self.size = len(self._ranks)
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return self.size
+
+    def Get_group(self):
+        return Group(self._ranks)
+
+    def Create(self, group):
+        if self._world.rank not in group.ranks:
+            return None
+        return ProcessComm(self._world, group.ranks)
+
+    def Free(self):
+        pass
+
+    def Abort(self, errorcode=0):
+        for pid in self._world.pids:
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        os._exit(errorcode)
+
+    # Point-to-point
+
+    def send(self, obj, dest, tag=0):
+        self._world.put(self._ranks[dest], self._ranks, tag, obj)
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        if source != ANY_SOURCE:
+            source = self._ranks[source]
+        _, msource, mtag, obj = self._world.get(self._ranks, source, tag)
+        if status is not None:
+            status.source = self._ranks.index(msource)
+            status.tag = mtag
+        return obj
+
+    def Send(self, buf, dest, tag=0):
+        self.send(np.array(_buffer(buf)), dest, tag)
+
+    def Recv(self, buf, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        _fill(_buffer(buf), self.recv(source=source, tag=tag, status=status))
+
+    def Isend(self, buf, dest, tag=0):
+        # Queues never block on put, so there is nothing left to wait for.
+        self.Send(buf, dest, tag)
+        return Request()
+
+    def Irecv(self, buf, source=ANY_SOURCE, tag=ANY_TAG):
+        return Request(functools.partial(self.Recv, buf, source, tag))
+
+    def Probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        if source != ANY_SOURCE:
+            source = self._ranks[source]
+        msg = self._world.get(self._ranks, source, tag)
+        self._world.pending.insert(0, msg)
+        if status is not None:
+            status.source = self._ranks.index(msg[1])
+            status.tag = msg[2]
+        return True
+
+    def Iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        world_source = source
+        if source != ANY_SOURCE:
+            world_source = self._ranks[source]
+        if not self._world.poll(self._ranks, world_source, tag):
+            return False
+        return self.Probe(source, tag, status)
+
+    # Collectives, all routed through the root
+
+    def gather(self, sendobj, root=0):
+        if self.rank != root:
+            self.send(sendobj, root, _COLLECTIVE_TAG)
+            return None
+        return [sendobj if i == root else
+                self.recv(source=i, tag=_COLLECTIVE_TAG)
+                for i in range(self.size)]
+
+    def bcast(self, obj=None, root=0):
+        if self.rank == root:
+            for i in range(self.size):
+                if i != root:
+                    self.send(obj, i, _COLLECTIVE_TAG)
+            return obj
+        return self.recv(source=root, tag=_COLLECTIVE_TAG)
+
+    def allgather(self, sendobj):
+        return self.bcast(self.gather(sendobj))
+
+    def allreduce(self, sendobj, op=SUM):
+        return functools.reduce(op, self.allgather(sendobj))
+
+    def Barrier(self):
+        self.allgather(None)
+
+    barrier = Barrier
+
+    def Bcast(self, buf, root=0):
+        data = _buffer(buf)
+        rv = self.bcast(np.array(data) if self.rank == root else None, root)
+        if self.rank != root:
+            _fill(data, rv)
+
+    def Allgather(self, sendbuf, recvbuf):
+        rv = self.allgather(np.array(_buffer(sendbuf)))
+        _fill(_buffer(recvbuf), np.concatenate([r.ravel() for r in rv]))
+
+    def Allgatherv(self, sendbuf, recvbuf):
+        send = np.array(_buffer(sendbuf)).ravel()
+        recv = np.asarray(recvbuf[0]).reshape(-1)
+        counts, displs = recvbuf[1]
+        rv = self.allgather(send)
+        for data, count, displ in zip(rv, counts, displs):
+            displ = int(displ)
+            recv[displ:displ + int(count)] = data[:int(count)]
+
+    def Allreduce(self, sendbuf, recvbuf, op=SUM):
+        send = _buffer(sendbuf)
+        recv = _buffer(recvbuf)
+        if send.nbytes < _SHARED_REDUCE_BYTES or self.size == 1:
+            _fill(recv, self.allreduce(np.array(send), op))
+            return
+        # Every process writes its array into a row of a shared file, reduces
+        # its own share of the columns into the last row, and then copies the
+        # result back out.
+        if self.rank == 0:
+            fd, fn = tempfile.mkstemp(prefix="yt_reduce_", dir=_shared_dir())
+            os.close(fd)
+            shared = np.memmap(fn, dtype=send.dtype, mode="w+",
+                               shape=(self.size + 1, send.size))
+            fn = self.bcast(fn)
+        else:
+            fn = self.bcast()
+            shared = np.memmap(fn, dtype=send.dtype, mode="r+",
+                               shape=(self.size + 1, send.size))
+        try:
+            shared[self.rank,:] = send.ravel()
+            self.Barrier()
+            cols = np.array_split(np.arange(send.size), self.size)[self.rank]
+            if cols.size > 0:
+                sl = slice(cols[0], cols[-1] + 1)
+                shared[self.size, sl] = op.reduce(shared[:self.size, sl],
+                                                  axis=0)
+            self.Barrier()
+            _fill(recv, shared[self.size,:])
+            self.Barrier()
+        finally:
+            del shared
+            if self.rank == 0:
+                os.unlink(fn)
+
+def _shared_dir():
+    # /dev/shm is a RAM-backed filesystem on Linux; elsewhere we fall back on
+    # the regular temporary directory.
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def spawn(nprocs=None, wait_at_exit=True):
+    """
+    Fork this process into *nprocs* processes (by default one per core), and
+    return the communicator connecting them.  From here on each process runs
+    the same code, as they would under mpirun.  The original process is rank
+    0 and, if *wait_at_exit* is set, waits for the others to finish before
+    exiting.
+    """
+    global COMM_WORLD
+    if sys.platform.startswith("win"):
+        raise RuntimeError("The processes backend requires os.fork, which "
+                           "is not available on Windows.")
+    if nprocs is None or nprocs < 1:
+        nprocs = multiprocessing.cpu_count()
+    queues = [multiprocessing.Queue() for i in range(nprocs)]
+    rank = 0
+    children = []
+    for i in range(1, nprocs):
+        pid = os.fork()
+        if pid == 0:
+            rank = i
+            children = []
+            break
+        children.append(pid)
+    world = _ProcessWorld(rank, queues, [])
+    world.children = children
+    COMM_WORLD = ProcessComm(world, range(nprocs))
+    world.pids = COMM_WORLD.allgather(os.getpid())
+    if wait_at_exit and rank == 0:
+        atexit.register(wait_for_children, COMM_WORLD)
+    return COMM_WORLD
+
+def wait_for_children(comm):
+    """
+    Wait for the processes forked by spawn to exit.  Only the original
+    process has any children to wait for.
+    """
+    for pid in comm._world.children:
+        try:
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+    comm._world.children = []
@@ -1,8 +1,7 @@
 import numpy as np
-from yt.utilities.lib.particle_mesh_operations import \
-    CICSample_3
 from yt.funcs import get_pbar
 from yt.units.yt_array import uconcatenate
+from yt.utilities.point_sampling import PointSampler
 from yt.extern.six import string_types
 
 class ParticleGenerator(object):
@@ -145,27 +144,14 @@ class ParticleGenerator(object):
         >>>              'temperature':'particle_temperature'}
         >>> particles.map_grid_fields_to_particles(field_map)
         """
-        pbar = get_pbar("Mapping fields to particles", self.num_grids)
-        for i, grid in enumerate(self.ds.index.grids):
-            pbar.update(i)
-            if self.NumberOfParticles[i] > 0:
-                start = self.ParticleGridIndices[i]
-                end = self.ParticleGridIndices[i+1]
-                # Note we add one ghost zone to the grid!
-                cube = grid.retrieve_ghost_zones(1, list(mapping_dict.keys()))
-                le = np.array(grid.LeftEdge).astype(np.float64)
-                dims = np.array(grid.ActiveDimensions).astype(np.int32)
-                for gfield, pfield in mapping_dict.items():
-                    self.field_units[pfield] = cube[gfield].units
-                    field_index = self.field_list.index(pfield)
-                    CICSample_3(self.particles[start:end,self.posx_index],
-                                self.particles[start:end,self.posy_index],
-                                self.particles[start:end,self.posz_index],
-                                self.particles[start:end,field_index],
-                                np.int64(self.NumberOfParticles[i]),
-                                cube[gfield], le, dims,
-                                grid.dds[0])
-        pbar.finish()
+        pos = self.particles[:, [self.posx_index, self.posy_index,
+                                 self.posz_index]]
+        sampler = PointSampler(self.ds, method="cic")
+        values = sampler.sample(list(mapping_dict.keys()), pos)
+        for pfield, v in zip(mapping_dict.values(), values):
+            self.field_units[pfield] = v.units
+            field_index = self.field_list.index(pfield)
+            self.particles[:, field_index] = v.d
 
     def apply_to_stream(self, clobber=False):
         """
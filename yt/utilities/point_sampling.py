@@ -0,0 +1,311 @@
+"""
+Interpolating fields of a dataset to arbitrary positions
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import itertools
+import numpy as np
+
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+from yt.funcs import \
+    ensure_list, \
+    get_num_threads
+from yt.utilities.lib.particle_mesh_operations import \
+    interpolate_at_positions
+
+# The kernel number of each method, and the ghost zones it needs.  Gathered
+# at a point, cloud in cell weights are those of trilinear interpolation
+# between the surrounding cell centers.
+_methods = {"ngp": (0, 0), "nearest": (0, 0),
+            "cic": (1, 1), "trilinear": (1, 1),
+            "tsc": (2, 1)}
+
+def _cell_keys(ipos, n):
+    ipos = np.clip(ipos, 0, n - 1)
+    return (ipos[:, 0] * n[1] + ipos[:, 1]) * n[2] + ipos[:, 2]
+
+def _find_cells(fcoords, fwidth, levels, pos, left_edge, right_edge):
+    # The index of the cell containing each position, or -1.  The cells of
+    # each level are looked up by their integer position on that level.
+    cells = np.zeros(pos.shape[0], dtype="int64") - 1
+    for level in np.unique(levels):
+        ind = np.where(levels == level)[0]
+        dds = fwidth[ind[0]]
+        n = np.rint((right_edge - left_edge) / dds).astype("int64")
+        keys = _cell_keys(np.floor((fcoords[ind] - left_edge) / dds).astype(
+            "int64"), n)
+        pkeys = _cell_keys(np.floor((pos - left_edge) / dds).astype(
+            "int64"), n)
+        order = np.argsort(keys)
+        j = np.minimum(np.searchsorted(keys, pkeys, sorter=order),
+                       keys.size - 1)
+        match = keys[order[j]] == pkeys
+        cells[match] = ind[order[j[match]]]
+    return cells
+
+class PointSampler(object):
+    r"""
+    Interpolates fields of a grid or octree dataset to a set of positions,
+    such as those of particles.
+
+    For grid datasets the positions are bucketed by the leaf grid they are
+    in, the data of each of those grids is read once, along with the ghost
+    zones the interpolation needs, and the values are then interpolated to
+    its positions by a pool of threads.  For octree datasets the cells
+    containing the positions are looked up in the io chunks around them, and
+    each chunk is read once.
+
+    Parameters
+    ----------
+    ds : Dataset
+        The dataset to sample.
+    method : string, optional
+        How the values of the cells around each position are weighted:
+        "nearest" (or "ngp", nearest grid point) takes the value of the cell
+        the position is in, "trilinear" (or "cic", cloud in cell)
+        interpolates linearly between the eight nearest cell centers, and
+        "tsc" (triangular shaped cloud) uses quadratic weights over the 27
+        nearest cells.  On octrees the eight cells are those of the width of
+        the cell the position is in, with the value of whichever cell holds
+        their centers where the mesh is refined or coarser; "tsc" is only
+        available for grids.  Default: "cic"
+    num_threads : int, optional
+        The number of threads interpolating grids while the next ones are
+        read.  If None, the ``numthreads`` configuration option is used.
+        Default: None
+
+    Examples
+    --------
+    >>> sampler = PointSampler(ds, method="tsc")
+    >>> dens, temp = sampler.sample(["density", "temperature"], positions)
+    """
+    def __init__(self, ds, method="cic", num_threads=None):
+        if method not in _methods:
+            raise RuntimeError("Unknown interpolation method %s; choose "
+                               "one of %s." % (method, sorted(_methods)))
+        if not self.supports(ds):
+            raise RuntimeError("PointSampler only works with grid and "
+                               "octree datasets.")
+        self.ds = ds
+        self.method = method
+        self._grids = hasattr(ds.index, "grids")
+        if not self._grids and _methods[method][0] > 1:
+            raise RuntimeError("The %s method is only available for grid "
+                               "datasets." % method)
+        if num_threads is None:
+            num_threads = int(get_num_threads())
+        self.num_threads = max(num_threads, 1)
+
+    @staticmethod
+    def supports(ds):
+        """
+        Whether the fields of *ds* can be sampled by a PointSampler.  Only
+        grid and octree meshes can; particle datasets, whose indices also
+        have an octree, cannot.
+        """
+        from yt.geometry.grid_geometry_handler import GridIndex
+        from yt.geometry.oct_geometry_handler import OctreeIndex
+        return isinstance(ds.index, (GridIndex, OctreeIndex))
+
+    def _bucket(self, pos):
+        # The index of the leaf grid each position is in, or -1
+        grid_ind = np.zeros(pos.shape[0], dtype="int64") - 1
+        ok = np.isfinite(pos).all(axis=1)
+        if ok.any():
+            grid_ind[ok] = self.ds.index._find_points(
+                pos[ok, 0], pos[ok, 1], pos[ok, 2])[1]
+        return grid_ind
+
+    def _grid_data(self, grid, fields, n_ghost):
+        # The values of fields in grid, padded by n_ghost cells, and the left
+        # edge of the padded data
+        if n_ghost > 0:
+            data = grid.retrieve_ghost_zones(n_ghost, fields)
+            left_edge = data.left_edge
+        else:
+            data = grid
+            left_edge = grid.LeftEdge
+        cached = set(grid.field_data.keys())
+        values = [data[field] for field in fields]
+        if n_ghost == 0:
+            # Don't leave the data of every grid we visit in memory.
+            for field in fields:
+                if field not in cached:
+                    grid.field_data.pop(field, None)
+        return values, left_edge.in_units("code_length").d
+
+    def sample(self, fields, positions):
+        r"""
+        Interpolate *fields* to *positions*.
+
+        Parameters
+        ----------
+        fields : field or list of fields
+            The mesh fields to sample.
+        positions : array_like
+            An (N, 3) array of positions, in code units unless it has units
+            of its own.
+
+        Returns
+        -------
+        A list of arrays of the values of each field at every position, with
+        NaN for positions that are not in any grid or cell.
+        """
+        if hasattr(positions, "units"):
+            positions = positions.in_units("code_length").d
+        pos = np.ascontiguousarray(positions, dtype="float64").reshape(-1, 3)
+        fields = self.ds.all_data()._determine_fields(ensure_list(fields))
+        if self._grids:
+            out, units = self._sample_grids(fields, pos)
+        else:
+            out, units = self._sample_cells(fields, pos)
+        return [self.ds.arr(arr, u) for arr, u in zip(out, units)]
+
+    def _sample_grids(self, fields, pos):
+        kernel, n_ghost = _methods[self.method]
+        out = [np.empty(pos.shape[0], dtype="float64") for field in fields]
+        for arr in out:
+            arr.fill(np.nan)
+        units = [self.ds._get_field_info(*field).units for field in fields]
+
+        grid_ind = self._bucket(pos)
+        order = np.argsort(grid_ind, kind="mergesort")
+        grids, starts = np.unique(grid_ind[order], return_index=True)
+        ends = list(starts[1:]) + [order.size]
+
+        def interpolate(args):
+            values, left_edge, dds, ind = args
+            my_pos = pos[ind]
+            buf = np.empty(ind.size, dtype="float64")
+            for arr, vals in zip(out, values):
+                interpolate_at_positions(vals, left_edge, dds, my_pos, buf,
+                                         kernel)
+                arr[ind] = buf
+
+        def tasks():
+            for gi, start, end in zip(grids, starts, ends):
+                if gi < 0:
+                    continue
+                grid = self.ds.index.grids[gi]
+                values, left_edge = self._grid_data(grid, fields, n_ghost)
+                for i, vals in enumerate(values):
+                    units[i] = vals.units
+                values = [np.ascontiguousarray(vals.d, dtype="float64")
+                          for vals in values]
+                yield (values, left_edge,
+                       grid.dds.in_units("code_length").d, order[start:end])
+
+        if self.num_threads == 1:
+            for args in tasks():
+                interpolate(args)
+        else:
+            # Grids are read here, one after another, while the pool
+            # interpolates the ones already read; the kernel releases the
+            # GIL.
+            pool = ThreadPool(self.num_threads)
+            pending = deque()
+            try:
+                for args in tasks():
+                    while len(pending) >= 2 * self.num_threads:
+                        pending.popleft().get()
+                    pending.append(pool.apply_async(interpolate, (args,)))
+                while pending:
+                    pending.popleft().get()
+            finally:
+                pool.terminate()
+                pool.join()
+        return out, units
+
+    def _locate(self, fields, pos):
+        # The values of fields in the cell containing each position and the
+        # width of that cell, read from the io chunks of a box around the
+        # positions.
+        ds = self.ds
+        DLE = ds.domain_left_edge.in_units("code_length").d
+        DRE = ds.domain_right_edge.in_units("code_length").d
+        values = [np.empty(pos.shape[0], dtype="float64") for field in fields]
+        width = np.empty((pos.shape[0], 3), dtype="float64")
+        for arr in values + [width]:
+            arr.fill(np.nan)
+        units = [ds._get_field_info(*field).units for field in fields]
+        todo = np.where(np.isfinite(pos).all(axis=1) &
+                        np.all((pos >= DLE) & (pos < DRE), axis=1))[0]
+        if todo.size == 0:
+            return values, width, units
+        # Cells are selected by their centers, so the box is padded by the
+        # width of the coarsest cells.
+        pad = (DRE - DLE) / ds.domain_dimensions
+        box = ds.box(np.maximum(pos[todo].min(axis=0) - pad, DLE),
+                     np.minimum(pos[todo].max(axis=0) + pad, DRE))
+        for chunk in box.chunks(fields, "io"):
+            if todo.size == 0:
+                break
+            fcoords = chunk.fcoords.in_units("code_length").d
+            if fcoords.shape[0] == 0:
+                continue
+            fwidth = chunk.fwidth.in_units("code_length").d
+            # Only the positions inside the bounding box of the chunk's
+            # cells are looked up.
+            le = (fcoords - 0.5 * fwidth).min(axis=0)
+            re = (fcoords + 0.5 * fwidth).max(axis=0)
+            near = np.all((pos[todo] >= le) & (pos[todo] < re), axis=1)
+            cells = np.zeros(todo.size, dtype="int64") - 1
+            cells[near] = _find_cells(fcoords, fwidth, chunk.ires,
+                                      pos[todo[near]], DLE, DRE)
+            hit = cells > -1
+            if not hit.any():
+                continue
+            for i, field in enumerate(fields):
+                vals = chunk[field]
+                units[i] = vals.units
+                values[i][todo[hit]] = vals.d[cells[hit]]
+            width[todo[hit]] = fwidth[cells[hit]]
+            todo = todo[~hit]
+        return values, width, units
+
+    def _sample_cells(self, fields, pos):
+        values, width, units = self._locate(fields, pos)
+        if _methods[self.method][0] == 0:
+            return values, units
+        ds = self.ds
+        DLE = ds.domain_left_edge.in_units("code_length").d
+        DRE = ds.domain_right_edge.in_units("code_length").d
+        DW = DRE - DLE
+        ind = np.where(np.isfinite(width[:, 0]))[0]
+        dds = width[ind]
+        x = (pos[ind] - DLE) / dds - 0.5
+        corner = np.floor(x)
+        frac = x - corner
+        # The centers of the eight cells around each position, wrapped into
+        # the domain where it is periodic and clamped to it where it is not
+        offsets = [np.array(o) for o in itertools.product((0, 1), repeat=3)]
+        centers = []
+        for o in offsets:
+            c = DLE + (corner + o + 0.5) * dds
+            for d in range(3):
+                if ds.periodicity[d]:
+                    c[:, d] = DLE[d] + np.mod(c[:, d] - DLE[d], DW[d])
+                else:
+                    c[:, d] = np.clip(c[:, d], DLE[d] + 0.5 * dds[:, d],
+                                      DRE[d] - 0.5 * dds[:, d])
+            centers.append(c)
+        corner_values = self._locate(fields, np.concatenate(centers))[0]
+        for i in range(len(fields)):
+            vals = np.zeros(ind.size, dtype="float64")
+            for j, o in enumerate(offsets):
+                weight = np.prod(np.where(o, frac, 1.0 - frac), axis=1)
+                vals += weight * corner_values[i][j*ind.size:(j+1)*ind.size]
+            values[i][ind] = vals
+        return values, units
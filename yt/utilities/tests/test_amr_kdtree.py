@@ -13,7 +13,7 @@ Unit test the ARMKDTree in yt.
 # The full license is in the file COPYING.txt, distributed with this software.
 #-----------------------------------------------------------------------------
 
-from yt.utilities.amr_kdtree.api import AMRKDTree
+from yt.utilities.amr_kdtree.api import AMRKDTree, BrickCache
 import yt.utilities.initial_conditions as ic
 import yt.utilities.flagging_methods as fm
 from yt.frontends.stream.api import load_uniform_grid, refine_amr
@@ -79,3 +79,36 @@ def test_amr_kdtree_set_fields():
                 else:
                     data = np.log10(block.my_data[i])
                 assert_almost_equal(gold[iblock][i], data)
+
+def test_amr_kdtree_brick_cache():
+    ds = fake_amr_ds(fields=["density", "pressure"])
+    fields = ds.field_list
+    cache = BrickCache()
+    kd = AMRKDTree(ds, brick_cache=cache)
+    kd.set_fields(fields, [True, False], False)
+    gold = [[data.copy() for data in block.my_data]
+            for block in kd.traverse()]
+    # Each grid's data is kept once, however many bricks it is split into
+    ngrids = len(set(block.parent_grid_id for block in kd.bricks))
+    assert_equal(len(cache._data), ngrids)
+    nbytes = cache.nbytes
+
+    # A new tree sharing the cache computes nothing new
+    kd2 = AMRKDTree(ds, brick_cache=cache)
+    kd2.set_fields(fields, [True, False], False)
+    assert_equal(cache.nbytes, nbytes)
+    for block, data in zip(kd2.traverse(), gold):
+        for i in range(len(fields)):
+            assert_equal(block.my_data[i], data[i])
+
+    # Other log scalings are cached separately
+    kd2.set_fields(fields, [False, False], False, force=True)
+    assert_equal(len(cache._data), 2 * ngrids)
+
+    # and the least recently used data goes first once the cache is full
+    small = BrickCache(nbytes)
+    kd3 = AMRKDTree(ds, brick_cache=small)
+    kd3.set_fields(fields, [True, False], False)
+    kd3.set_fields(fields, [False, False], False, force=True)
+    assert_equal(small.nbytes, nbytes)
+    assert all(not key[2][0] for key in small._data)
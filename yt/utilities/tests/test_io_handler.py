@@ -0,0 +1,73 @@
+"""
+Tests for the base IO handler
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+from yt.config import ytcfg
+from yt.testing import assert_equal
+from yt.utilities.io_handler import BaseIOHandler
+
+class FakeGrid(object):
+    def __init__(self, id, filename, dims):
+        self.id = id
+        self.filename = filename
+        self.ActiveDimensions = np.array(dims)
+
+class FakeChunk(object):
+    def __init__(self, objs):
+        self.objs = objs
+
+class FakeIOHandler(BaseIOHandler):
+    def __init__(self):
+        super(FakeIOHandler, self).__init__(None)
+
+    def io_iter(self, chunks, fields):
+        for chunk in chunks:
+            for obj in chunk.objs:
+                for field in fields:
+                    data = np.empty(obj.ActiveDimensions)
+                    data[:] = obj.id
+                    yield field, obj, data
+
+def _flatten(it):
+    return [(field, obj.id, data[0,0,0]) for field, obj, data in it]
+
+def test_prefetch_io_iter():
+    io = FakeIOHandler()
+    fields = [("gas", "density"), ("gas", "temperature")]
+    grids = [FakeGrid(i, "file%s" % (i // 7), (8, 8, 8)) for i in range(40)]
+    chunks = [FakeChunk(grids[:25]), FakeChunk(grids[25:])]
+    answer = _flatten(io.io_iter(chunks, fields))
+    old_threads = ytcfg.get("yt", "io_prefetch_threads")
+    old_memory = ytcfg.get("yt", "io_prefetch_memory")
+    try:
+        for nthreads in [0, 1, 4]:
+            for memory in [0, 1, 512]:
+                ytcfg["yt", "io_prefetch_threads"] = str(nthreads)
+                ytcfg["yt", "io_prefetch_memory"] = str(memory)
+                assert_equal(_flatten(io._prefetch_io_iter(chunks, fields)),
+                             answer)
+    finally:
+        ytcfg["yt", "io_prefetch_threads"] = old_threads
+        ytcfg["yt", "io_prefetch_memory"] = old_memory
+
+def test_prefetch_groups():
+    io = FakeIOHandler()
+    fields = [("gas", "density")]
+    grids = [FakeGrid(i, "file%s" % (i // 4), (4, 4, 4)) for i in range(10)]
+    groups = list(io._prefetch_groups([FakeChunk(grids)], fields, 1024))
+    assert_equal([[g.id for g in gs] for gs, _ in groups],
+                 [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]])
+    assert_equal([nbytes for _, nbytes in groups], [1024] * 5)
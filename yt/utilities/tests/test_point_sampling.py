@@ -0,0 +1,106 @@
+"""
+Tests for interpolating fields to arbitrary positions
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+
+from yt.frontends.stream.api import \
+    load_octree
+from yt.testing import \
+    assert_allclose, \
+    assert_equal, \
+    assert_raises, \
+    fake_particle_ds, \
+    fake_random_ds
+from yt.utilities.point_sampling import \
+    PointSampler
+
+def test_point_sampler():
+    # Positions spread over all eight grids, including their edges
+    ds = fake_random_ds(16, nprocs=8)
+    prng = np.random.RandomState(0x4d3d3d3)
+    pos = prng.random_sample((500, 3))
+    pos[:10] = 0.5
+    fields = [("index", "x"), ("index", "y"), ("index", "z")]
+    for method in ["cic", "tsc"]:
+        # the coordinates themselves are linear, so they come back exactly
+        values = PointSampler(ds, method=method).sample(fields, pos)
+        for i, v in enumerate(values):
+            assert_allclose(v.in_units("code_length").d, pos[:, i])
+        threaded = PointSampler(ds, method=method, num_threads=4).sample(
+            fields, pos)
+        for v1, v2 in zip(values, threaded):
+            assert_equal(v1, v2)
+    values = PointSampler(ds, method="ngp").sample(fields, pos)
+    for i, v in enumerate(values):
+        center = (np.floor(pos[:, i] * 16) + 0.5) / 16
+        assert_allclose(v.in_units("code_length").d, center)
+    # The values of a field that is not linear are the same as those of the
+    # cell each position is in
+    dens = PointSampler(ds, method="ngp").sample("density", pos)[0]
+    assert_equal(dens, ds.find_field_values_at_points("density", pos))
+
+def test_point_sampler_outside():
+    ds = fake_random_ds(16)
+    pos = np.array([[0.5, 0.5, 0.5], [1.5, 0.5, 0.5], [np.nan, 0.5, 0.5]])
+    dens = PointSampler(ds).sample("density", pos)[0]
+    assert np.isfinite(dens[0])
+    assert np.isnan(dens[1:]).all()
+
+def test_point_sampler_methods():
+    ds = fake_random_ds(16, nprocs=8)
+    prng = np.random.RandomState(0x4d3d3d3)
+    pos = prng.random_sample((100, 3))
+    fields = ["density", "velocity_x"]
+    for method, same in [("nearest", "ngp"), ("trilinear", "cic")]:
+        values = ds.find_field_values_at_points(fields, pos, method=method)
+        expected = PointSampler(ds, method=same).sample(fields, pos)
+        for v1, v2 in zip(values, expected):
+            assert_equal(v1, v2)
+
+def test_point_sampler_octree():
+    octree_mask = np.array([8, 0, 0, 0, 0, 8, 0, 0,
+                            0, 0, 0, 0, 0, 0, 0, 0,
+                            8, 0, 0, 0, 0, 0, 0, 0,
+                            0], dtype=np.uint8)
+    data = {("gas", "density"): np.arange(22, dtype="float64")[:, None]}
+    bbox = np.array([[-10., 10.], [-10., 10.], [-10., 10.]])
+    ds = load_octree(octree_mask=octree_mask, data=data, bbox=bbox,
+                     over_refine_factor=0, partial_coverage=0)
+    prng = np.random.RandomState(0x4d3d3d3)
+    pos = prng.uniform(-10, 10, size=(200, 3))
+    dens = ds.find_field_values_at_points(("gas", "density"), pos)
+    # The density of the cell each position is in, found the slow way
+    ad = ds.all_data()
+    fc = ad.fcoords.in_units("code_length").d
+    fw = ad.fwidth.in_units("code_length").d
+    expected = np.empty(pos.shape[0])
+    for i, p in enumerate(pos):
+        cell = np.all((p >= fc - 0.5 * fw) & (p < fc + 0.5 * fw), axis=1)
+        expected[i] = ad["gas", "density"].d[cell][0]
+    assert_equal(dens.d, expected)
+    # The trilinear weights add up to one
+    ones = ds.find_field_values_at_points(("index", "ones"), pos,
+                                          method="trilinear")
+    assert_allclose(ones.d, 1.0)
+    assert_raises(RuntimeError, PointSampler, ds, "tsc")
+
+def test_point_sampler_particles():
+    # Particle datasets have an octree index but no mesh to sample
+    ds = fake_particle_ds()
+    assert not PointSampler.supports(ds)
+    assert_raises(RuntimeError, PointSampler, ds)
+    pos = np.array([[0.5, 0.5, 0.5]])
+    assert_raises(RuntimeError, ds.find_field_values_at_points,
+                  ("deposit", "all_density"), pos, method="cic")
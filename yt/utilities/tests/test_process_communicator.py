@@ -0,0 +1,71 @@
+"""
+Tests for running in parallel with the multiprocessing backend
+
+
+
+"""
+
+#-----------------------------------------------------------------------------
+# Copyright (c) 2017, yt Development Team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#-----------------------------------------------------------------------------
+
+import numpy as np
+import sys
+
+from yt.testing import \
+    assert_equal, \
+    assert_rel_equal, \
+    fake_random_ds
+from yt.utilities.parallel_tools.parallel_analysis_interface import \
+    communication_system, \
+    parallel_processes
+from yt.utilities.parallel_tools.process_communicator import \
+    Compute_dims
+
+def setup():
+    from yt.config import ytcfg
+    ytcfg["yt","__withintesting"] = "True"
+
+def test_compute_dims():
+    assert_equal(Compute_dims(8, 3), [2, 2, 2])
+    assert_equal(Compute_dims(12, 3), [3, 2, 2])
+    assert_equal(Compute_dims(7, 2), [7, 1])
+
+def test_parallel_processes():
+    if sys.platform.startswith("win"):
+        return
+    with parallel_processes(3):
+        comm = communication_system.communicators[-1]
+        rank = comm.rank
+        size = comm.size
+        small = comm.mpi_allreduce(np.arange(10.0) * (rank + 1), op="sum")
+        # This one is big enough to be reduced through shared memory.
+        big = comm.mpi_allreduce(np.ones(500000) * rank, op="max")
+        cat = comm.par_combine_object(np.ones(rank + 1) * rank,
+                                      datatype="array", op="cat")
+        joined = comm.par_combine_object({rank: rank ** 2},
+                                         datatype="dict", op="join")
+        bcast = comm.mpi_bcast(np.arange(5) if rank == 0 else None)
+    assert_equal(rank, 0)
+    assert_equal(size, 3)
+    assert_equal(small, np.arange(10.0) * 6)
+    assert_equal(big, np.ones(500000) * 2)
+    assert_equal(cat, [0, 1, 1, 2, 2, 2])
+    assert_equal(joined, {0: 0, 1: 1, 2: 4})
+    assert_equal(bcast, np.arange(5))
+    assert_equal(communication_system.communicators[-1].size, 1)
+
+def test_parallel_quantities():
+    if sys.platform.startswith("win"):
+        return
+    ds = fake_random_ds(32, nprocs=8)
+    ad = ds.all_data()
+    answer = ad.quantities.weighted_average_quantity("density", "ones")
+    with parallel_processes(4):
+        ad = ds.all_data()
+        result = ad.quantities.weighted_average_quantity("density", "ones")
+    assert_rel_equal(result, answer, 12)
@@ -19,13 +19,14 @@ from yt.funcs import \
     get_output_filename, \
     mylog, \
     ensure_list, \
-    deprecate
+    deprecate, \
+    get_num_threads
 from .volume_rendering.api import off_axis_projection
 from .fixed_resolution_filters import apply_filter, filter_registry
 from yt.data_objects.image_array import ImageArray
 from yt.utilities.lib.pixelization_routines import \
     pixelize_cylinder
-from yt.utilities.lib.api import add_points_to_greyscale_image
+from yt.utilities.lib.api import splat_points_to_greyscale_image
 from yt.frontends.stream.api import load_uniform_grid
 
 import numpy as np
@@ -132,13 +133,20 @@ class FixedResolutionBuffer(object):
         buff = self.ds.coordinates.pixelize(self.data_source.axis,
             self.data_source, item, bounds, self.buff_size,
             int(self.antialias))
+        # Images made without the data of the data source come with their
+        # own units, so that data does not have to be generated for them.
+        units = getattr(buff, "units", None)
+        if units is not None:
+            buff = buff.d
+        else:
+            units = self.data_source[item].units
 
         for name, (args, kwargs) in self._filters:
             buff = filter_registry[name](*args[1:], **kwargs).apply(buff)
 
         # Need to add _period and self.periodic
         # self._period, int(self.periodic)
-        ia = ImageArray(buff, input_units=self.data_source[item].units,
+        ia = ImageArray(buff, input_units=units,
                         info=self._get_info(item))
         self.data[item] = ia
         return self.data[item]
@@ -582,55 +590,50 @@ class ParticleImageBuffer(FixedResolutionBuffer):
                 b = float(b.in_units("code_length"))
             bounds.append(b)
 
+        # The particles are read one io chunk at a time, so only a chunk's
+        # worth of them is ever in memory along with the images.
         ftype = item[0]
-        x_data = self.data_source.dd[ftype, self.x_field]
-        y_data = self.data_source.dd[ftype, self.y_field]
-        data = self.data_source.dd[item]
-
-        # convert to pixels
-        px = (x_data - self.bounds[0]) / (self.bounds[1] - self.bounds[0])
-        py = (y_data - self.bounds[2]) / (self.bounds[3] - self.bounds[2])
-
-        # select only the particles that will actually show up in the image
-        mask = np.logical_and(np.logical_and(px >= 0.0, px <= 1.0),
-                              np.logical_and(py >= 0.0, py <= 1.0))
-
         weight_field = self.data_source.weight_field
-        if weight_field is None:
-            weight_data = np.ones_like(data.v)
-        else:
-            weight_data = self.data_source.dd[weight_field]
-        splat_vals = weight_data[mask]*data[mask]
-
-        # splat particles
-        buff = np.zeros(self.buff_size)
-        buff_mask = np.zeros(self.buff_size).astype('int')
-        add_points_to_greyscale_image(buff,
-                                      buff_mask,
-                                      px[mask],
-                                      py[mask],
-                                      splat_vals)
-        # remove values in no-particle region
-        buff[buff_mask==0] = np.nan
-        ia = ImageArray(buff, input_units=data.units,
-                        info=self._get_info(item))
+        fields = [(ftype, self.x_field), (ftype, self.y_field), item]
+        if weight_field is not None:
+            fields.append(weight_field)
+        # Each thread adds to its own copy of the images, kept across the
+        # chunks and summed once they have all been splatted.
+        nx, ny = self.buff_size
+        num_threads = max(int(get_num_threads()), 1)
+        buff = np.zeros((num_threads, ny, nx), dtype="float64")
+        weight_buff = np.zeros((num_threads, ny, nx), dtype="float64")
+        counts = np.zeros((num_threads, ny, nx), dtype="int64")
+        units = None
+        for chunk in self.data_source.dd.chunks(fields, "io"):
+            data = chunk[item]
+            if data.size == 0:
+                continue
+            units = data.units
+            x_data = chunk[ftype, self.x_field].in_units("code_length")
+            y_data = chunk[ftype, self.y_field].in_units("code_length")
+            weight_data = None
+            if weight_field is not None:
+                weight_data = np.asarray(chunk[weight_field].d, dtype="float64")
+            splat_points_to_greyscale_image(
+                buff, weight_buff, counts,
+                np.asarray(x_data.d, dtype="float64"),
+                np.asarray(y_data.d, dtype="float64"),
+                np.asarray(data.d, dtype="float64"), weight_data, bounds)
+        if units is None:
+            units = self.ds._get_field_info(*item).units
+        buff = buff.sum(axis=0)
+        weight_buff = weight_buff.sum(axis=0)
+        counts = counts.sum(axis=0)
 
         # divide by the weight_field, if needed
         if weight_field is not None:
-            weight_buff = np.zeros(self.buff_size)
-            weight_buff_mask = np.zeros(self.buff_size).astype('int')
-            add_points_to_greyscale_image(weight_buff,
-                                          weight_buff_mask,
-                                          px[mask],
-                                          py[mask],
-                                          weight_data[mask])
-            weight_array = ImageArray(weight_buff,
-                                      input_units=weight_data.units,
-                                      info=self._get_info(item))
-            # remove values in no-particle region
-            weight_buff[weight_buff_mask==0] = np.nan
-            locs = np.where(weight_array > 0)
-            ia[locs] /= weight_array[locs]
+            locs = weight_buff > 0
+            buff[locs] /= weight_buff[locs]
+        # remove values in no-particle region
+        buff[counts == 0] = np.nan
+        ia = ImageArray(buff, input_units=units,
+                        info=self._get_info(item))
 
         self.data[item] = ia
         return self.data[item]
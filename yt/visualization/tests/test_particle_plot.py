@@ -29,6 +29,7 @@ from yt.testing import \
     assert_array_almost_equal, \
     requires_file, \
     assert_allclose, \
+    assert_equal, \
     assert_fname
 from yt.utilities.answer_testing.framework import \
     requires_ds, \
@@ -39,6 +40,8 @@ from yt.visualization.api import \
     ParticlePlot, \
     ParticleProjectionPlot, \
     ParticlePhasePlot
+from yt.visualization.fixed_resolution import \
+    ParticleImageBuffer
 from yt.units.yt_array import YTArray
 
 
@@ -319,3 +322,27 @@ class TestParticleProjectionPlotSave(unittest.TestCase):
             [assert_array_almost_equal(px, x, 14) for px, x in zip(plot.xlim, xlim)]
             [assert_array_almost_equal(py, y, 14) for py, y in zip(plot.ylim, ylim)]
             [assert_array_almost_equal(pw, w, 14) for pw, w in zip(plot.width, pwidth)]
+
+def test_particle_image_buffer():
+    test_ds = fake_particle_ds()
+    ad = test_ds.all_data()
+    x = ad["all", "particle_position_x"].in_units("code_length").d
+    y = ad["all", "particle_position_y"].in_units("code_length").d
+    mass = ad["all", "particle_mass"].d
+    for weight_field in [None, "particle_ones"]:
+        plot = ParticleProjectionPlot(test_ds, 2, "particle_mass",
+                                      weight_field=weight_field)
+        frb = ParticleImageBuffer(plot.data_source, plot.xlim + plot.ylim,
+                                  (32, 24))
+        image = frb["all", "particle_mass"]
+        # The same image, binned all at once; the first axis of the image
+        # runs over y
+        hist = np.histogram2d(y, x, bins=(24, 32), range=[[0, 1], [0, 1]],
+                              weights=mass)[0]
+        counts = np.histogram2d(y, x, bins=(24, 32),
+                                range=[[0, 1], [0, 1]])[0]
+        if weight_field is not None:
+            hist[counts > 0] /= counts[counts > 0]
+        hist[counts == 0] = np.nan
+        assert_equal(image.shape, (24, 32))
+        assert_allclose(image.d, hist)
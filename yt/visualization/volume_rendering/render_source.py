@@ -18,7 +18,7 @@ from yt.config import \
 from yt.funcs import mylog, ensure_numpy_array, iterable
 from yt.utilities.parallel_tools.parallel_analysis_interface import \
     ParallelAnalysisInterface
-from yt.utilities.amr_kdtree.api import AMRKDTree
+from yt.utilities.amr_kdtree.api import AMRKDTree, BrickCache
 from .transfer_function_helper import TransferFunctionHelper
 from .transfer_functions import TransferFunction, \
     ProjectionTransferFunction, ColorTransferFunction
@@ -172,6 +172,10 @@ class VolumeSource(RenderSource):
 
         # these are caches for properties, defined below
         self._volume = None
+        # The vertex-centered data of the grids outlives the volume, so that
+        # switching back to fields or settings rendered before, or building
+        # a new volume, does not compute it again.
+        self._brick_cache = BrickCache()
         self._transfer_function = None
         self._field = field
         self._log_field = self.data_source.ds.field_info[field].take_log
@@ -226,7 +230,8 @@ class VolumeSource(RenderSource):
         """
         if self._volume is None:
             mylog.info("Creating volume")
-            volume = AMRKDTree(self.data_source.ds, data_source=self.data_source)
+            volume = AMRKDTree(self.data_source.ds, data_source=self.data_source,
+                               brick_cache=self._brick_cache)
             self._volume = volume
 
         return self._volume